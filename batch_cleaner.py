@@ -1,21 +1,72 @@
 import pandas as pd #Triệu hồi" thư viện Pandas. Tưởng tượng nó là một chuyên gia làm việc với file Excel/CSV. Đọc, xóa, sửa file CSV là nhờ nó hết.
 import re 
 import json
+import gzip
 import os #Giúp script của mình "nhìn" được cây thư mục, tìm file, lấy đường dẫn.
 import argparse
+import textwrap
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from tqdm import tqdm #tạo ra thanh loading %
-import spacy
 
-#TẢI MODEL AI (spaCy)
-try:
-    nlp = spacy.load("en_core_web_sm") #Tải model AI nhỏ gọn của spaCy để xử lý ngôn ngữ tự nhiên (NLP)
-    print("[INFO] Đã tải xong model AI (spaCy). Bắt đầu xử lý...") 
-except OSError:
-    print("[LỖI] Không tìm thấy model 'en_core_web_sm' của spaCy.") #Cái try...except là để phòng hờ: Nếu mày chưa tải bộ não này (lỗi OSError), thì báo lỗi và chỉ cách tải.
-    print("Vui lòng chạy 2 lệnh sau trong terminal:")
-    print("1. pip install spacy")
-    print("2. python -m spacy download en_core_web_sm")
-    exit(1)
+from utils.ner_cache import ExtractionCache, text_hash
+from utils.gazetteer import build_gazetteer_nlp, gazetteer_fingerprint
+from utils.skill_matcher import get_skill_matcher
+from utils.parquet_store import CLEANED_FILE, CLEANED_SCHEMA, ParquetFileWriter
+from utils.url_index import SortedURLHashSet
+
+#MODEL AI (spaCy) - chỉ tải khi thật sự cần (lần đầu gọi get_nlp())
+SPACY_MODEL = "en_core_web_sm"
+# Chỉ dùng doc.ents (tok2vec + ner), nên bỏ hẳn các thành phần không cần khi tải
+SPACY_EXCLUDE = ["parser", "lemmatizer", "attribute_ruler", "tagger", "senter"]
+# Các cách tìm tên Tổ chức (ORG):
+# - 'spacy': NER thống kê của model en_core_web_sm (chính xác hơn với tên lạ, tốn CPU)
+# - 'gazetteer': so khớp danh sách tên trường/công ty trong thư mục gazetteer/ (rất nhanh)
+ENGINES = ('spacy', 'gazetteer')
+# Định dạng file kết quả: 'json' (1 mảng JSON thụt lề) hoặc 'jsonl' (mỗi dòng 1 bản ghi)
+OUTPUT_FORMATS = ('json', 'jsonl')
+OUTPUT_CHUNK_ROWS = 1000  # Số bản ghi chuyển sang JSON mỗi lần khi ghi kết quả
+_pipelines = {}  # engine -> pipeline đã tải trong tiến trình này
+
+def get_nlp(engine='spacy'):
+    """
+    Tải pipeline của engine (1 lần cho mỗi tiến trình) và trả về pipeline đã tải.
+    `--help`, thư mục rỗng hay dữ liệu đã có trong cache sẽ không phải tải model.
+    Tiến trình con tạo bằng fork dùng chung pipeline đã tải sẵn ở tiến trình cha.
+    """
+    if engine not in _pipelines:
+        start = time.perf_counter()
+        if engine == 'gazetteer':
+            _pipelines[engine] = build_gazetteer_nlp()
+        else:
+            try:
+                import spacy
+                _pipelines[engine] = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE) #Tải model AI nhỏ gọn của spaCy để xử lý ngôn ngữ tự nhiên (NLP)
+            except (ImportError, OSError):
+                print(f"[LỖI] Không tìm thấy model '{SPACY_MODEL}' của spaCy.") #Cái try...except là để phòng hờ: Nếu mày chưa tải bộ não này (lỗi OSError), thì báo lỗi và chỉ cách tải.
+                print("Vui lòng chạy 2 lệnh sau trong terminal:")
+                print("1. pip install spacy")
+                print(f"2. python -m spacy download {SPACY_MODEL}")
+                exit(1)
+        elapsed = time.perf_counter() - start
+        print(f"[INFO] Đã tải xong engine '{engine}' trong {elapsed:.2f}s "
+              f"(thành phần: {', '.join(_pipelines[engine].pipe_names) or 'không có'}). Bắt đầu xử lý...")
+    return _pipelines[engine]
+
+
+# Phiên bản logic trích xuất. TĂNG số này mỗi khi sửa các hàm trích xuất / từ khóa,
+# để kết quả cũ trong cache (data_collected/.ner_cache.sqlite) không bị dùng lại
+EXTRACTOR_VERSION = 3
+
+def extractor_version(engine='spacy'):
+    """
+    Phiên bản dùng làm khóa cache: engine + EXTRACTOR_VERSION
+    (+ dấu vân tay các file gazetteer, để sửa danh sách tên là cache cũ tự hết hiệu lực).
+    """
+    if engine == 'gazetteer':
+        return f"gazetteer-{EXTRACTOR_VERSION}-{gazetteer_fingerprint()}"
+    return f"{engine}-{EXTRACTOR_VERSION}"
 
 
 # Các từ khóa để phân biệt Trường học và Công ty
@@ -34,7 +85,12 @@ def extract_education(about_text): #nhận 1 đoạn văn bản "about_text"
     if not isinstance(about_text, str):
         return None
     
-    doc = nlp(about_text)
+    return education_from_doc(about_text, get_nlp()(about_text))
+
+def education_from_doc(about_text, doc):
+    """
+    Trích xuất HỌC VẤN từ một Doc spaCy đã phân tích sẵn (dùng chung với kinh nghiệm).
+    """
     matches = []
     
     # 1. Tìm bằng cấp (Bachelor, Master)
@@ -73,7 +129,12 @@ def extract_experience(about_text):
     if not isinstance(about_text, str):
         return None
 
-    doc = nlp(about_text)
+    return experience_from_doc(about_text, get_nlp()(about_text))
+
+def experience_from_doc(about_text, doc):
+    """
+    Trích xuất KINH NGHIỆM từ một Doc spaCy đã phân tích sẵn (dùng chung với học vấn).
+    """
     matches = []
     
     # 1. Tìm (Title @ Company) hoặc (Title tại Company) - Regex cũ vẫn tốt
@@ -111,20 +172,52 @@ def extract_experience(about_text):
     return "; ".join(sorted(list(set(matches)), key=matches.index))
 
 
+def extract_batch(about_texts, batch_size=64, n_process=1, engine='spacy'):
+    """
+    Trích xuất HỌC VẤN và KINH NGHIỆM cho cả cột About trong MỘT lượt spaCy.
+    Mỗi đoạn văn bản chỉ được phân tích 1 lần (nlp.pipe theo lô), rồi cả 2 hàm
+    trích xuất dùng chung Doc đó.
+    
+    Args:
+        about_texts: Danh sách/Series các đoạn About (giá trị không phải chuỗi trả về None)
+        batch_size: Số văn bản mỗi lô gửi vào nlp.pipe
+        n_process: Số tiến trình spaCy chạy song song
+        engine: 'spacy' hoặc 'gazetteer' (xem ENGINES)
+        
+    Returns:
+        Tuple (danh sách học vấn, danh sách kinh nghiệm), cùng thứ tự với đầu vào
+    """
+    about_texts = list(about_texts)
+    education = [None] * len(about_texts)
+    experience = [None] * len(about_texts)
+    
+    # Chỉ đưa các chuỗi hợp lệ vào spaCy, mỗi đoạn trùng nhau chỉ phân tích 1 lần
+    texts = list(dict.fromkeys(text for text in about_texts if isinstance(text, str)))
+    if not texts:
+        return education, experience
+    results = {}
+    for text, doc in zip(texts, get_nlp(engine).pipe(texts, batch_size=batch_size, n_process=n_process)):
+        results[text] = (education_from_doc(text, doc), experience_from_doc(text, doc))
+    for i, text in enumerate(about_texts):
+        if isinstance(text, str):
+            education[i], experience[i] = results[text]
+    return education, experience
+
+
 # --- HÀM XỬ LÝ (MỖI FILE) ---
 # (Hàm này giữ nguyên như cũ, chỉ thay đổi tên cột)
-def process_single_file(input_csv_path, output_json_path):
+def load_profiles(input_csv_path):
     """
-    Quy trình: Load CSV -> Clean -> Extract -> Save JSON
+    Load CSV + Bước 1 (làm sạch cơ bản). Trả về DataFrame, hoặc None nếu lỗi/thiếu file.
     """
     try:
         if not os.path.exists(input_csv_path):
-            return False
+            return None
             
         df = pd.read_csv(input_csv_path)
     except Exception as e:
         print(f"  [LỖI] Không thể đọc file CSV: {e}")
-        return False
+        return None
 
     # --- Bước 1: Làm sạch cơ bản ---
     # Tên cột đã được cập nhật theo file Excel của bạn
@@ -134,29 +227,303 @@ def process_single_file(input_csv_path, output_json_path):
     
     if url_column not in df.columns or name_column not in df.columns or about_column not in df.columns:
         print(f"  [LỖI] Thiếu các cột (URL, Name, About) trong file: {input_csv_path}")
-        return False
+        return None
 
     df = df.drop_duplicates(subset=[url_column], keep='first')
     df = df.dropna(subset=[url_column, name_column])
+    return df
 
-    # --- Bước 2: Trích xuất thông tin ---
-    # Áp dụng các hàm trích xuất AI MỚI
-    df['education_extracted'] = df[about_column].apply(extract_education)
-    df['experience_extracted'] = df[about_column].apply(extract_experience)
-    
-    # --- Bước 3: Lưu sang JSON ---
+def output_filename(output_format='json', compress=False):
+    """
+    Tên file kết quả trong mỗi thư mục ngành: cleaned_profiles.json, .jsonl hoặc .jsonl.gz.
+    """
+    name = f"cleaned_profiles.{output_format}"
+    return name + ".gz" if compress else name
+
+def open_jsonl(path, mode='wt', compress=None):
+    """
+    Mở file JSON Lines (tự nén/giải nén gzip nếu đuôi .gz, hoặc theo `compress` nếu có).
+    """
+    if path.endswith('.gz') if compress is None else compress:
+        return gzip.open(path, mode, encoding='utf-8')
+    return open(path, mode[0], encoding='utf-8')
+
+class ResultWriter:
+    """
+    Ghi kết quả ra đĩa theo từng khúc DataFrame:
+    - .json: mảng JSON, mỗi bản ghi thụt lề 4 dấu cách (file không có bản ghi nào là `[]`)
+    - .jsonl / .jsonl.gz: mỗi dòng 1 bản ghi, flush sau mỗi khúc để có thể `tail -f`
+    - `parquet`: thêm cleaned_profiles.parquet cùng thư mục, mỗi khúc 1 row group
+    Ghi vào file tạm `<tên>.tmp`, close() mới thay file cũ; lỗi giữa chừng không làm mất kết quả cũ.
+    Chỉ giới hạn được bộ nhớ khi được gọi với từng khúc (--chunk_rows hoặc --workers); chế độ
+    tuần tự mặc định truyền vào DataFrame của cả file.
+    """
+    def __init__(self, output_json_path, parquet=False):
+        self.path = output_json_path
+        self.tmp_path = output_json_path + '.tmp'
+        self.is_json = output_json_path.endswith('.json')
+        if self.is_json:
+            self.f = open(self.tmp_path, 'w', encoding='utf-8')
+            self.f.write('[')
+        else:
+            self.f = open_jsonl(self.tmp_path, compress=output_json_path.endswith('.gz'))
+        self.records = 0
+        self.parquet = None
+        if parquet:
+            self.parquet = ParquetFileWriter(os.path.join(os.path.dirname(output_json_path), CLEANED_FILE),
+                                             CLEANED_SCHEMA)
+
+    def write(self, df):
+        for start in range(0, len(df), OUTPUT_CHUNK_ROWS):
+            part = df.iloc[start:start + OUTPUT_CHUNK_ROWS]
+            if self.is_json:
+                # pandas chuyển giá trị sang JSON (NaN -> null), rồi mỗi bản ghi được thụt lề riêng
+                records = json.loads(part.to_json(orient='records', force_ascii=False))
+                self.f.write(''.join(
+                    (',\n' if self.records + i else '\n')
+                    + textwrap.indent(json.dumps(record, indent=4, ensure_ascii=False), '    ')
+                    for i, record in enumerate(records)
+                ))
+            else:
+                self.f.write(part.to_json(orient='records', lines=True, force_ascii=False))
+            self.records += len(part)
+        self.f.flush()
+        if self.parquet is not None:
+            self.parquet.write(df)
+
+    def close(self):
+        if self.is_json:
+            self.f.write('\n]' if self.records else ']')
+        self.f.close()
+        os.replace(self.tmp_path, self.path)
+        if self.parquet is not None:
+            self.parquet.close()
+
+    def abort(self):
+        """Đóng file khi gặp lỗi: xoá các file tạm dở dang, giữ file cũ."""
+        self.f.close()
+        try:
+            os.remove(self.tmp_path)
+        except FileNotFoundError:
+            pass
+        if self.parquet is not None:
+            self.parquet.abort()
+
+def save_json(df, output_json_path, parquet=False):
+    """
+    Bước 3: Lưu DataFrame sang JSON, hoặc JSON Lines nếu đuôi file là .jsonl/.jsonl.gz
+    (và cleaned_profiles.parquet cùng thư mục nếu `parquet`). Trả về True nếu thành công.
+    DataFrame đã nằm trọn trong bộ nhớ; muốn ghi dần theo khúc thì dùng process_file_chunked.
+    """
+    writer = None
     try:
-        data_json = df.to_json(orient='records', indent=4, force_ascii=False)
-        with open(output_json_path, 'w', encoding='utf-8') as f:
-            f.write(data_json)
+        writer = ResultWriter(output_json_path, parquet)
+        writer.write(df)
+        writer.close()
         return True
     except Exception as e:
-        print(f"  [LỖI] Không thể lưu file JSON: {e}")
+        print(f"  [LỖI] Không thể lưu file kết quả: {e}")
+        if writer is not None:
+            writer.abort()
+        return False
+    except KeyboardInterrupt:
+        # Ctrl-C: xoá file tạm, file kết quả cũ vẫn còn nguyên
+        if writer is not None:
+            writer.abort()
+        raise
+
+def results_by_url(records):
+    """URL -> (About, học vấn, kinh nghiệm) từ các bản ghi kết quả."""
+    return {
+        r.get('URL'): (r.get('About'), r.get('education_extracted'), r.get('experience_extracted'))
+        for r in records
+    }
+
+def load_previous_results(output_json_path):
+    """
+    Đọc file kết quả (JSON hoặc JSON Lines) của lần chạy trước: URL -> (About, học vấn, kinh nghiệm).
+    Trả về dict rỗng nếu chưa có file hoặc file hỏng.
+    """
+    try:
+        if output_json_path.endswith('.json'):
+            with open(output_json_path, 'r', encoding='utf-8') as f:
+                return results_by_url(json.load(f))
+        # Đọc từng dòng, không nạp cả file
+        with open_jsonl(output_json_path, 'rt') as f:
+            return results_by_url(json.loads(line) for line in f if line.strip())
+    except (OSError, ValueError, EOFError):
+        return {}
+
+def lookup_results(df, input_csv_path, output_json_path, cache, use_previous=True):
+    """
+    Tìm kết quả đã có cho từng dòng, để chỉ dòng mới/đã sửa phải chạy spaCy:
+    1. Dòng cùng URL và cùng About trong JSON lần trước (nếu JSON được tạo bởi cùng phiên bản trích xuất
+       và `use_previous`; chế độ chia khúc bỏ bước này để không nạp cả file kết quả cũ)
+    2. Cache theo hash của About + phiên bản trích xuất
+    
+    Returns:
+        Tuple (học vấn, kinh nghiệm, vị trí các dòng còn thiếu kết quả)
+    """
+    about_texts = df['About'].tolist()
+    education = [None] * len(about_texts)
+    experience = [None] * len(about_texts)
+    
+    previous = {}
+    if use_previous and cache.file_version(input_csv_path) == cache.version:
+        previous = load_previous_results(output_json_path)
+    
+    missing = []
+    for i, (url, text) in enumerate(zip(df['URL'].tolist(), about_texts)):
+        if not isinstance(text, str):
+            continue
+        old = previous.get(url)
+        if old is not None and old[0] == text:
+            education[i], experience[i] = old[1], old[2]
+        else:
+            missing.append(i)
+    
+    hashes = {i: text_hash(about_texts[i]) for i in missing}
+    cached = cache.get_many(hashes.values())
+    still_missing = []
+    for i in missing:
+        if hashes[i] in cached:
+            education[i], experience[i] = cached[hashes[i]]
+        else:
+            still_missing.append(i)
+    return education, experience, still_missing
+
+def extract_skills(about_text):
+    """
+    Trích xuất KỸ NĂNG theo bộ từ điển kỹ năng (gazetteer/skills.txt), dùng chung với utils/parser.
+    Không cần spaCy nên chạy lại mỗi lần, không qua cache.
+    """
+    if not isinstance(about_text, str):
+        return None
+    skills = get_skill_matcher().find(about_text)
+    return "; ".join(skills) if skills else None
+
+def store_results(df, education, experience, missing, new_education, new_experience, cache):
+    """
+    Ghép kết quả vừa trích xuất vào đúng vị trí, lưu vào cache và gán vào DataFrame
+    (cùng cột kỹ năng).
+    """
+    about_texts = df['About'].tolist()
+    for i, edu, exp in zip(missing, new_education, new_experience):
+        education[i], experience[i] = edu, exp
+    if cache is not None:
+        cache.put_many((text_hash(about_texts[i]), education[i], experience[i]) for i in missing)
+    df['education_extracted'] = education
+    df['experience_extracted'] = experience
+    df['skills_extracted'] = [extract_skills(text) for text in about_texts]
+
+def is_unchanged(input_csv_path, output_json_path, cache, parquet=False):
+    """
+    Thư mục không cần xử lý lại: có JSON (và file Parquet nếu `parquet`), profiles.csv không đổi
+    từ lần trước (mtime + hash nội dung) và lần trước đã ghi ra đúng định dạng này
+    (tên file kết quả, Parquet) bằng cùng engine + phiên bản trích xuất.
+    """
+    if parquet and not os.path.exists(os.path.join(os.path.dirname(output_json_path), CLEANED_FILE)):
+        return False
+    return (cache is not None and os.path.exists(input_csv_path) and os.path.exists(output_json_path)
+            and cache.file_unchanged(input_csv_path, os.path.basename(output_json_path), parquet))
+
+def extract_into(df, input_csv_path, output_json_path, batch_size=64, n_process=1, cache=None, engine='spacy',
+                 use_previous=True):
+    """
+    Bước 2: Thêm các cột học vấn/kinh nghiệm/kỹ năng vào DataFrame.
+    Mỗi About chỉ qua spaCy 1 lần (nlp.pipe theo lô), học vấn và kinh nghiệm dùng chung kết quả;
+    có cache thì chỉ trích xuất các dòng chưa có kết quả.
+    """
+    if cache is not None:
+        education, experience, missing = lookup_results(df, input_csv_path, output_json_path, cache, use_previous)
+    else:
+        education, experience, missing = [None] * len(df), [None] * len(df), list(range(len(df)))
+    about_texts = df['About'].tolist()
+    new_education, new_experience = extract_batch([about_texts[i] for i in missing],
+                                                  batch_size=batch_size, n_process=n_process, engine=engine)
+    store_results(df, education, experience, missing, new_education, new_experience, cache)
+
+def iter_profile_chunks(input_csv_path, chunk_rows):
+    """
+    Đọc profiles.csv theo từng khúc `chunk_rows` dòng và làm sạch cơ bản giống load_profiles():
+    URL trùng được bỏ cả giữa các khúc nhờ tập hash URL gọn (~8 byte/URL), nên bộ nhớ
+    phụ thuộc kích thước khúc chứ không phụ thuộc kích thước file.
+    Các cột đọc dưới dạng chuỗi để mọi khúc có cùng kiểu dữ liệu.
+    
+    Raises:
+        ValueError: thiếu các cột URL, Name, About
+    """
+    seen_urls = SortedURLHashSet()
+    for chunk in pd.read_csv(input_csv_path, chunksize=chunk_rows, dtype=str):
+        if 'URL' not in chunk.columns or 'Name' not in chunk.columns or 'About' not in chunk.columns:
+            raise ValueError(f"Thiếu các cột (URL, Name, About) trong file: {input_csv_path}")
+        chunk = chunk.drop_duplicates(subset=['URL'], keep='first')
+        # Như drop_duplicates trên cả file: URL đã gặp ở khúc trước bị bỏ, kể cả khi dòng đầu tiên thiếu Name
+        keep = [isinstance(url, str) and url not in seen_urls for url in chunk['URL'].tolist()]
+        # Series thay vì list: list rỗng (khúc rỗng) sẽ bị hiểu là chọn 0 cột
+        chunk = chunk[pd.Series(keep, index=chunk.index, dtype=bool)]
+        seen_urls.update(chunk['URL'].tolist())
+        yield chunk.dropna(subset=['URL', 'Name'])
+
+def process_file_chunked(input_csv_path, output_json_path, chunk_rows, batch_size=64, n_process=1, cache=None,
+                         engine='spacy', parquet=False):
+    """
+    Như process_single_file nhưng đọc, trích xuất và ghi từng khúc `chunk_rows` dòng,
+    để file nhiều GB vẫn xử lý được trên máy ít RAM. Kết quả cũ chỉ lấy từ cache
+    (không nạp file kết quả của lần trước vào bộ nhớ).
+    """
+    if not os.path.exists(input_csv_path):
+        return False
+    state = cache.file_state(input_csv_path) if cache is not None else None
+    writer = None
+    try:
+        writer = ResultWriter(output_json_path, parquet)
+        for df in iter_profile_chunks(input_csv_path, chunk_rows):
+            extract_into(df, input_csv_path, output_json_path, batch_size, n_process, cache, engine,
+                         use_previous=False)
+            writer.write(df)
+        writer.close()
+    except Exception as e:
+        print(f"  [LỖI] Không thể xử lý file {input_csv_path}: {e}")
+        if writer is not None:
+            writer.abort()
         return False
+    except KeyboardInterrupt:
+        # Ctrl-C: xoá file tạm, file kết quả cũ vẫn còn nguyên
+        if writer is not None:
+            writer.abort()
+        raise
+    if state is not None:
+        cache.record_file(input_csv_path, state, os.path.basename(output_json_path), parquet)
+    return True
+
+def process_single_file(input_csv_path, output_json_path, batch_size=64, n_process=1, cache=None, engine='spacy',
+                        parquet=False):
+    """
+    Quy trình: Load CSV -> Clean -> Extract -> Save JSON
+    Có cache: chỉ trích xuất các dòng mới/đã sửa, phần còn lại lấy từ JSON cũ hoặc cache.
+    Nạp cả file vào bộ nhớ; file rất lớn thì dùng process_file_chunked (--chunk_rows).
+    """
+    state = cache.file_state(input_csv_path) if cache is not None and os.path.exists(input_csv_path) else None
+    df = load_profiles(input_csv_path)
+    if df is None:
+        return False
+
+    # --- Bước 2: Trích xuất thông tin ---
+    extract_into(df, input_csv_path, output_json_path, batch_size, n_process, cache, engine)
+    
+    # --- Bước 3: Lưu sang JSON ---
+    if not save_json(df, output_json_path, parquet):
+        return False
+    if state is not None:
+        cache.record_file(input_csv_path, state, os.path.basename(output_json_path), parquet)
+    return True
 
 # --- HÀM CHÍNH (QUÉT THƯ MỤC) ---
 # (Hàm này giữ nguyên như cũ)
-def batch_process_all(base_directory):
+def batch_process_all(base_directory, batch_size=64, n_process=1, workers=1, shard_rows=2000, incremental=True,
+                      engine='spacy', parquet=False, output_format='json', compress=False, chunk_rows=0):
+    output_name = output_filename(output_format, compress)
     print(f"🚀 Bắt đầu quét hàng loạt từ thư mục: {base_directory}")
     print("=" * 60)
     
@@ -170,32 +537,267 @@ def batch_process_all(base_directory):
         print("[LỖI] Không tìm thấy thư mục ngành nghề nào trong 'data_collected'.")
         return
 
-    success_count = 0
-    fail_count = 0
-
-    for industry_name in tqdm(all_industries, desc="Xử lý các ngành", unit="folder"):
+    # Cache kết quả trích xuất (theo hash About + phiên bản) và trạng thái các file đã xử lý
+    cache = None
+    if incremental:
+        cache = ExtractionCache(os.path.join(base_directory, ".ner_cache.sqlite"), extractor_version(engine))
+    
+    # Bỏ qua các thư mục không thay đổi kể từ lần chạy trước
+    pending_industries = []
+    unchanged_count = 0
+    for industry_name in all_industries:
         industry_path = os.path.join(base_directory, industry_name)
-        input_csv = os.path.join(industry_path, "profiles.csv")
-        output_json = os.path.join(industry_path, f"cleaned_profiles.json")
-        
-        if process_single_file(input_csv, output_json):
-            success_count += 1
+        if is_unchanged(os.path.join(industry_path, "profiles.csv"),
+                        os.path.join(industry_path, output_name), cache, parquet):
+            unchanged_count += 1
+        else:
+            pending_industries.append(industry_name)
+
+    try:
+        if workers > 1:
+            success_count, fail_count = _process_parallel(base_directory, pending_industries, batch_size,
+                                                          workers, shard_rows, cache, engine, parquet,
+                                                          output_name, chunk_rows)
         else:
-            fail_count += 1
+            success_count = 0
+            fail_count = 0
+
+            for industry_name in tqdm(pending_industries, desc="Xử lý các ngành", unit="folder"):
+                industry_path = os.path.join(base_directory, industry_name)
+                input_csv = os.path.join(industry_path, "profiles.csv")
+                output_json = os.path.join(industry_path, output_name)
+                
+                if chunk_rows:
+                    ok = process_file_chunked(input_csv, output_json, chunk_rows, batch_size=batch_size,
+                                              n_process=n_process, cache=cache, engine=engine, parquet=parquet)
+                else:
+                    ok = process_single_file(input_csv, output_json, batch_size=batch_size, n_process=n_process,
+                                             cache=cache, engine=engine, parquet=parquet)
+                if ok:
+                    success_count += 1
+                else:
+                    fail_count += 1
+    finally:
+        if cache is not None:
+            cache.close()
             
     print("\n" + "=" * 60)
     print("✅ Xử lý hàng loạt hoàn tất!")
     print(f"  - {success_count} thư mục đã được xử lý thành công.")
+    if cache is not None:
+        print(f"  - {unchanged_count} thư mục không thay đổi (bỏ qua).")
+        print(f"  - {cache.hits} đoạn About lấy kết quả từ cache, {cache.misses} đoạn phải trích xuất mới.")
     print(f"  - {fail_count} thư mục bị bỏ qua (lỗi hoặc thiếu file 'profiles.csv').")
     print("=" * 60)
 
+def _process_parallel(base_directory, all_industries, batch_size, workers, shard_rows, cache=None, engine='spacy',
+                      parquet=False, output_name="cleaned_profiles.json", chunk_rows=0):
+    """
+    Chế độ song song: nhiều tiến trình cùng trích xuất.
+    - Ngành có file lớn nhất được xếp lịch trước (tránh 1 file to chạy một mình ở cuối).
+    - Mỗi file được đọc theo khúc `chunk_rows` dòng (mặc định bằng `shard_rows`) bằng iter_profile_chunks,
+      mỗi khúc cắt thành các mảnh (shard) `shard_rows` dòng chạy song song, rồi được ghi dần ra đĩa
+      đúng thứ tự ban đầu.
+    - Chỉ tối đa `workers` + 1 khúc đang chờ kết quả nằm trong bộ nhớ, nên bộ nhớ không phụ thuộc
+      số ngành hay kích thước file.
+    - Model spaCy chỉ tải 1 lần ở tiến trình cha rồi chia sẻ cho tiến trình con (fork), và chỉ khi có dòng cần trích xuất.
+    - Có cache: chỉ các dòng chưa có kết quả mới được gửi lên pool (như process_file_chunked,
+      không nạp file kết quả của lần trước).
+    
+    Returns:
+        Tuple (số ngành thành công, số ngành bị bỏ qua)
+    """
+    def csv_size(industry_name):
+        input_csv = os.path.join(base_directory, industry_name, "profiles.csv")
+        return os.path.getsize(input_csv) if os.path.exists(input_csv) else -1
+
+    chunk_rows = chunk_rows or shard_rows
+    success_count = 0
+    fail_count = 0
+    # Các khúc đang chờ, theo thứ tự đọc: (ngành, khúc DataFrame, học vấn, kinh nghiệm, vị trí cần trích xuất,
+    # future theo thứ tự mảnh). Khúc None đánh dấu hết file của ngành đó.
+    pending = deque()
+    open_jobs = []  # Ngành đã mở file kết quả tạm nhưng chưa chốt
+    progress = tqdm(total=len(all_industries), desc="Xử lý các ngành", unit="folder")
+
+    def drain_oldest():
+        """Chờ kết quả của khúc cũ nhất và ghi ra file; hết file thì chốt kết quả của ngành."""
+        nonlocal success_count, fail_count
+        job, df, education, experience, missing, futures = pending.popleft()
+        if df is None:
+            open_jobs.remove(job)
+            progress.update(1)
+            if not job['failed']:
+                try:
+                    job['writer'].close()
+                except Exception as e:
+                    print(f"  [LỖI] Không thể lưu file kết quả cho ngành '{job['name']}': {e}")
+                    job['failed'] = True
+            if job['failed']:
+                if job['writer'] is not None:
+                    job['writer'].abort()
+                fail_count += 1
+                return
+            if job['state'] is not None:
+                cache.record_file(job['input'], job['state'], output_name, parquet)
+            success_count += 1
+            return
+        if job['failed']:
+            return
+        try:
+            new_education, new_experience = [], []
+            for future in futures:
+                shard_education, shard_experience = future.result()
+                new_education.extend(shard_education)
+                new_experience.extend(shard_experience)
+            store_results(df, education, experience, missing, new_education, new_experience, cache)
+            job['writer'].write(df)
+        except Exception as e:
+            print(f"  [LỖI] Trích xuất thất bại cho ngành '{job['name']}': {e}")
+            job['failed'] = True
+
+    executor = None
+    try:
+        # Ngành lớn nhất trước; đọc khúc mới khi số khúc đang chờ còn dưới giới hạn
+        for industry_name in sorted(all_industries, key=csv_size, reverse=True):
+            input_csv = os.path.join(base_directory, industry_name, "profiles.csv")
+            output_json = os.path.join(base_directory, industry_name, output_name)
+            if not os.path.exists(input_csv):
+                fail_count += 1
+                progress.update(1)
+                continue
+            job = {'name': industry_name, 'input': input_csv, 'writer': None, 'failed': False,
+                   'state': cache.file_state(input_csv) if cache is not None else None}
+            open_jobs.append(job)
+            try:
+                job['writer'] = ResultWriter(output_json, parquet)
+                for df in iter_profile_chunks(input_csv, chunk_rows):
+                    if cache is not None:
+                        education, experience, missing = lookup_results(df, input_csv, output_json, cache,
+                                                                        use_previous=False)
+                    else:
+                        education, experience, missing = [None] * len(df), [None] * len(df), list(range(len(df)))
+                    about_texts = df['About'].tolist()
+                    missing_texts = [about_texts[i] for i in missing]
+                    if missing_texts and executor is None:
+                        # Tải model ở tiến trình cha trước khi tạo pool: tiến trình con (fork) dùng chung luôn,
+                        # còn với spawn thì initializer tải 1 lần cho mỗi tiến trình con
+                        get_nlp(engine)
+                        executor = ProcessPoolExecutor(max_workers=workers, initializer=get_nlp, initargs=(engine,))
+                    futures = [
+                        executor.submit(extract_batch, missing_texts[i:i + shard_rows], batch_size, 1, engine)
+                        for i in range(0, len(missing_texts), shard_rows)
+                    ]
+                    pending.append((job, df, education, experience, missing, futures))
+                    while len(pending) > workers:
+                        drain_oldest()
+            except Exception as e:
+                print(f"  [LỖI] Không thể xử lý file {input_csv}: {e}")
+                job['failed'] = True
+            pending.append((job, None, None, None, None, None))
+
+        while pending:
+            drain_oldest()
+    finally:
+        # Lỗi bất ngờ hoặc Ctrl-C: xoá file tạm của các ngành chưa chốt, file kết quả cũ vẫn còn nguyên
+        for job in open_jobs:
+            if job['writer'] is not None:
+                job['writer'].abort()
+        progress.close()
+        if executor is not None:
+            executor.shutdown()
+
+    return success_count, fail_count
+
+# --- SO SÁNH 2 ENGINE ---
+def _split_items(value):
+    """Tách kết quả 'a; b; c' thành tập hợp các mục."""
+    return set(value.split("; ")) if isinstance(value, str) else set()
+
+def compare_engines(base_directory, batch_size=64):
+    """
+    Chạy cả 'spacy' và 'gazetteer' trên cột About của mọi ngành (không ghi JSON) và báo cáo:
+    - thời gian xử lý của mỗi engine
+    - tỉ lệ dòng có kết quả giống hệt nhau, cho học vấn và kinh nghiệm
+    - độ trùng khớp trung bình (Jaccard) giữa các mục tìm được
+    """
+    try:
+        all_industries = sorted(d for d in os.listdir(base_directory) if os.path.isdir(os.path.join(base_directory, d)))
+    except FileNotFoundError:
+        print(f"[LỖI] Không tìm thấy thư mục: {base_directory}")
+        return
+
+    about_texts = []
+    for industry_name in all_industries:
+        df = load_profiles(os.path.join(base_directory, industry_name, "profiles.csv"))
+        if df is not None:
+            about_texts.extend(text for text in df['About'].tolist() if isinstance(text, str))
+    if not about_texts:
+        print("[LỖI] Không có đoạn About nào để so sánh.")
+        return
+
+    results = {}
+    timings = {}
+    for engine in ENGINES:
+        get_nlp(engine)  # Không tính thời gian tải model
+        start = time.perf_counter()
+        results[engine] = extract_batch(about_texts, batch_size=batch_size, engine=engine)
+        timings[engine] = time.perf_counter() - start
+
+    print("\n" + "=" * 60)
+    print(f"📊 So sánh engine trên {len(about_texts)} đoạn About ({len(all_industries)} ngành)")
+    for engine in ENGINES:
+        per_doc = timings[engine] / len(about_texts) * 1000
+        print(f"  - {engine:10s}: {timings[engine]:.2f}s ({per_doc:.2f} ms/đoạn)")
+    for column, label in ((0, "Học vấn"), (1, "Kinh nghiệm")):
+        reference, candidate = results['spacy'][column], results['gazetteer'][column]
+        exact = sum(a == b for a, b in zip(reference, candidate))
+        jaccards = []
+        for a, b in zip(reference, candidate):
+            items_a, items_b = _split_items(a), _split_items(b)
+            union = items_a | items_b
+            jaccards.append(len(items_a & items_b) / len(union) if union else 1.0)
+        print(f"  - {label}: {exact / len(about_texts) * 100:.1f}% dòng giống hệt, "
+              f"Jaccard trung bình {sum(jaccards) / len(jaccards):.2f}")
+    print("=" * 60)
+
 # --- ĐIỂM VÀO SCRIPT ---
 # (Giữ nguyên như cũ)
 if __name__ == "__main__":
     parser = argparse.ArgumentParser(description="Làm sạch HÀNG LOẠT và chuyển đổi CSV sang JSON (Phiên bản AI).")
     parser.add_argument('--dir', type=str, default='data_collected', help="Thư mục cơ sở (mặc định: 'data_collected')")
+    parser.add_argument('--batch_size', type=int, default=64, help="Số văn bản mỗi lô gửi vào spaCy nlp.pipe (mặc định: 64)")
+    parser.add_argument('--n_process', type=int, default=1, help="Số tiến trình spaCy chạy song song (mặc định: 1)")
+    parser.add_argument('--workers', type=int, default=1, help="Số tiến trình xử lý song song các ngành/mảnh file (mặc định: 1 = tuần tự)")
+    parser.add_argument('--engine', choices=list(ENGINES) + ['compare'], default='spacy',
+                        help="Cách tìm tên trường/công ty: 'spacy' (NER, mặc định), 'gazetteer' (danh sách tên trong gazetteer/, nhanh hơn nhiều) "
+                             "hoặc 'compare' (chạy cả 2, báo cáo tốc độ và độ trùng khớp, không ghi JSON)")
+    parser.add_argument('--full', action='store_true', help="Xử lý lại toàn bộ, không dùng cache và không bỏ qua thư mục không đổi")
+    parser.add_argument('--format', choices=OUTPUT_FORMATS, default='json',
+                        help="Định dạng kết quả: 'json' (cleaned_profiles.json, mặc định) hoặc 'jsonl' "
+                             "(cleaned_profiles.jsonl, mỗi dòng 1 bản ghi, đọc được theo luồng; ghi dần ra đĩa khi dùng --chunk_rows hoặc --workers)")
+    parser.add_argument('--gzip', action='store_true', help="Chế độ --format jsonl: nén gzip (cleaned_profiles.jsonl.gz)")
+    parser.add_argument('--parquet', action='store_true',
+                        help="Ghi thêm cleaned_profiles.parquet (cột có kiểu, học vấn/kinh nghiệm/kỹ năng dạng danh sách, nén zstd) vào mỗi thư mục ngành")
+    parser.add_argument('--chunk_rows', type=int, default=0,
+                        help="Đọc, trích xuất và ghi mỗi profiles.csv theo từng khúc N dòng: bộ nhớ giới hạn theo N thay vì "
+                             "theo kích thước file. Khi chạy tuần tự, chỉ chế độ này ghi kết quả dần ra đĩa "
+                             "(mặc định: 0 = nạp và trích xuất cả file rồi mới ghi; với --workers: bằng --shard_rows)")
+    parser.add_argument('--shard_rows', type=int, default=2000, help="Chế độ --workers: số dòng mỗi mảnh gửi lên pool; file luôn được đọc và ghi theo khúc (mặc định: 2000)")
     args = parser.parse_args()
     
+    if args.batch_size <= 0 or args.n_process <= 0 or args.workers <= 0 or args.shard_rows <= 0:
+        print("[LỖI] --batch_size, --n_process, --workers và --shard_rows phải lớn hơn 0.")
+        exit(1)
+    
+    if args.chunk_rows < 0:
+        print("[LỖI] --chunk_rows không được âm.")
+        exit(1)
+    
+    if args.gzip and args.format != 'jsonl':
+        print("[LỖI] --gzip chỉ dùng với --format jsonl.")
+        exit(1)
+    
     try:
         import pandas as pd
         from tqdm import tqdm
@@ -203,4 +805,10 @@ if __name__ == "__main__":
         print("[LỖI] Thiếu thư viện. Vui lòng chạy: pip install pandas tqdm")
         exit(1)
         
-    batch_process_all(args.dir)
\ No newline at end of file
+    if args.engine == 'compare':
+        compare_engines(args.dir, batch_size=args.batch_size)
+    else:
+        batch_process_all(args.dir, batch_size=args.batch_size, n_process=args.n_process,
+                          workers=args.workers, shard_rows=args.shard_rows, incremental=not args.full,
+                          engine=args.engine, parquet=args.parquet, output_format=args.format,
+                          compress=args.gzip, chunk_rows=args.chunk_rows)
\ No newline at end of file
@@ -0,0 +1,432 @@
+"""
+Local stand-in for the Custom Search JSON API (customsearch/v1).
+
+Serves deterministic synthetic result pages over HTTP, with configurable
+latency, per-key rate and daily limits, invalid CXs and injected faults
+(429s, connection resets), so the collector and key rotation can be
+load-tested without spending quota. Like Google, it honours the `fields`
+(partial response) and `prettyPrint` parameters and gzips responses for
+clients that accept it. Point the collector at it with
+`--api_endpoint http://127.0.0.1:<port>/` or CSE_API_ENDPOINT.
+
+Usage:
+    python -m benchmarks.cse_emulator --port 8765 --latency 0.2 --key_qps 1 --daily_limit 100
+"""
+import argparse
+import gzip
+import json
+import random
+import socket
+import struct
+import threading
+import time
+from collections import Counter, OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.synthetic import SyntheticProfiles
+
+
+PAGE_SIZE_MAX = 10
+RESULTS_MAX = 100  # Custom Search never returns results past start=91
+
+
+class EmulatorConfig:
+    """Behaviour of the emulator (all faults off by default)."""
+
+    def __init__(self, seed: int = 42, pool_size: int = 20000, min_results: int = 30,
+                 max_results: int = RESULTS_MAX, latency: float = 0.0, jitter: float = 0.0,
+                 key_qps: float = 0.0, key_burst: float = 1.0, daily_limit: int = 0,
+                 valid_cxs: Optional[List[str]] = None, bad_cxs: Optional[List[str]] = None,
+                 error_rate: float = 0.0, reset_rate: float = 0.0, retry_after: Optional[float] = 1.0):
+        """
+        Args:
+            seed: Seed of the profile pool, the result lists and the injected faults
+            pool_size: Distinct profiles the results are drawn from (queries overlap)
+            min_results: Fewest results of a query
+            max_results: Most results of a query (at most 100)
+            latency: Mean response time in seconds
+            jitter: Uniform +/- jitter added to the latency, in seconds
+            key_qps: Per-key requests per second before 429s (0 = unlimited)
+            key_burst: Requests a key may send at once
+            daily_limit: Requests per key before 403 daily limit errors (0 = unlimited)
+            valid_cxs: Only these CXs exist (None = every CX not in bad_cxs)
+            bad_cxs: CXs answered with 404 not found
+            error_rate: Share of requests answered with a random 429
+            reset_rate: Share of requests answered by resetting the connection
+            retry_after: Retry-After seconds sent with rate-limit 429s (None = no header)
+        """
+        self.seed = seed
+        self.pool_size = pool_size
+        self.min_results = min(min_results, max_results)
+        self.max_results = min(max_results, RESULTS_MAX)
+        self.latency = latency
+        self.jitter = jitter
+        self.key_qps = key_qps
+        self.key_burst = key_burst
+        self.daily_limit = daily_limit
+        self.valid_cxs = set(valid_cxs) if valid_cxs is not None else None
+        self.bad_cxs = set(bad_cxs or ())
+        self.error_rate = error_rate
+        self.reset_rate = reset_rate
+        self.retry_after = retry_after
+
+    def to_dict(self) -> Dict:
+        data = dict(vars(self))
+        for name in ('valid_cxs', 'bad_cxs'):
+            data[name] = sorted(data[name]) if data[name] is not None else None
+        return data
+
+
+def error_body(code: int, message: str, reason: str, status: str, domain: str = "global") -> bytes:
+    """JSON error payload in the format of Google APIs."""
+    return json.dumps({"error": {"code": code, "message": message,
+                                 "errors": [{"message": message, "domain": domain, "reason": reason}],
+                                 "status": status}}).encode('utf-8')
+
+
+RATE_LIMIT_BODY = error_body(
+    429, "Quota exceeded for quota metric 'Queries' and limit 'Queries per minute per user' of service "
+         "'customsearch.googleapis.com'. Rate Limit Exceeded", "rateLimitExceeded", "RESOURCE_EXHAUSTED",
+    "usageLimits")
+DAILY_LIMIT_BODY = error_body(
+    403, "Quota exceeded for quota metric 'Queries' and limit 'Queries per day' of service "
+         "'customsearch.googleapis.com'. Daily Limit Exceeded", "dailyLimitExceeded", "PERMISSION_DENIED",
+    "usageLimits")
+BAD_CX_BODY = error_body(404, "Requested entity was not found.", "notFound", "NOT_FOUND")
+MISSING_PARAM_BODY = error_body(400, "Request contains an invalid argument.", "badRequest", "INVALID_ARGUMENT")
+
+
+def parse_fields(fields: str) -> Dict:
+    """
+    Parse a partial-response selector such as "items(title,link),searchInformation/totalResults".
+
+    Returns:
+        Nested dict of the selected names (None = the whole value)
+
+    Raises:
+        ValueError: For unbalanced parentheses
+    """
+    def parse(pos: int, depth: int) -> tuple:
+        tree = {}
+        while pos < len(fields):
+            end = pos
+            while end < len(fields) and fields[end] not in ',()':
+                end += 1
+            path = [name.strip() for name in fields[pos:end].split('/')]
+            pos, sub = end, None
+            if pos < len(fields) and fields[pos] == '(':
+                sub, pos = parse(pos + 1, depth + 1)
+                if pos >= len(fields) or fields[pos] != ')':
+                    raise ValueError(f"Unbalanced parentheses in fields: {fields}")
+                pos += 1
+            node = tree
+            for name in path[:-1]:
+                node = node.setdefault(name, {})
+                if node is None:
+                    break
+            if node is not None and path[-1]:
+                node[path[-1]] = sub
+            if pos < len(fields) and fields[pos] == ')':
+                if depth == 0:
+                    raise ValueError(f"Unbalanced parentheses in fields: {fields}")
+                return tree, pos
+            pos += 1
+        return tree, pos
+
+    return parse(0, 0)[0]
+
+
+def select_fields(value, tree: Optional[Dict]):
+    """Keep only the parts of a response selected by a parse_fields() tree."""
+    if tree is None:
+        return value
+    if isinstance(value, list):
+        return [select_fields(item, tree) for item in value]
+    if not isinstance(value, dict):
+        return value
+    return {name: select_fields(value[name], sub) for name, sub in tree.items() if name in value}
+
+
+class CustomSearchEmulator:
+    """
+    Request handling state shared by all server threads: the synthetic profile
+    pool, per-query result lists, per-key buckets and usage, and counters.
+    """
+
+    def __init__(self, config: EmulatorConfig):
+        """
+        Args:
+            config: Emulator behaviour
+        """
+        self.config = config
+        self.pool = SyntheticProfiles(seed=config.seed, duplicate_rate=0.0).items(config.pool_size)
+        self.stats = Counter()
+        self.key_usage = Counter()
+        self.served_links = set()
+        self._buckets: Dict[str, List[float]] = {}  # key -> [tokens, updated]
+        self._results: "OrderedDict[str, List[int]]" = OrderedDict()
+        self._fault_rng = random.Random(config.seed)
+        self._lock = threading.Lock()
+
+    def result_ids(self, query: str) -> List[int]:
+        """Pool indices of all results of a query, the same on every run."""
+        with self._lock:
+            ids = self._results.get(query)
+            if ids is not None:
+                self._results.move_to_end(query)
+                return ids
+        rng = random.Random(f"{self.config.seed}:{query}")
+        total = rng.randint(self.config.min_results, self.config.max_results)
+        ids = rng.sample(range(len(self.pool)), min(total, len(self.pool)))
+        with self._lock:
+            self._results[query] = ids
+            if len(self._results) > 10000:
+                self._results.popitem(last=False)
+        return ids
+
+    def page(self, query: str, cx: str, start: int, num: int) -> Dict:
+        """Response body of one result page."""
+        ids = self.result_ids(query)
+        items = []
+        for index in ids[start - 1:start - 1 + num]:
+            profile = self.pool[index]
+            items.append({"kind": "customsearch#result", "title": profile['title'],
+                          "htmlTitle": profile['title'], "link": profile['link'],
+                          "displayLink": urlparse(profile['link']).netloc,
+                          "snippet": profile['snippet'], "htmlSnippet": profile['snippet']})
+        request = {"title": "Google Custom Search - " + query, "totalResults": str(len(ids)),
+                   "searchTerms": query, "count": len(items), "startIndex": start, "cx": cx}
+        body = {"kind": "customsearch#search", "queries": {"request": [request]},
+                "searchInformation": {"totalResults": str(len(ids))}}
+        if start - 1 + num < len(ids):
+            body["queries"]["nextPage"] = [dict(request, startIndex=start + num)]
+        if items:
+            body["items"] = items
+            with self._lock:
+                self.served_links.update(item['link'] for item in items)
+        return body
+
+    def _take_token(self, key: str) -> bool:
+        """Per-key token bucket (lock held)."""
+        now = time.monotonic()
+        tokens, updated = self._buckets.get(key, (self.config.key_burst, now))
+        tokens = min(self.config.key_burst, tokens + (now - updated) * self.config.key_qps)
+        allowed = tokens >= 1
+        self._buckets[key] = [tokens - 1 if allowed else tokens, now]
+        return allowed
+
+    def decide(self, params: Dict[str, str]) -> tuple:
+        """
+        Decide the outcome of a request.
+
+        Args:
+            params: Query string parameters (first value of each)
+
+        Returns:
+            ('reset', None, None) or (HTTP status, body bytes, extra headers)
+        """
+        config = self.config
+        key, cx, query = params.get('key'), params.get('cx'), params.get('q')
+        with self._lock:
+            self.stats['requests'] += 1
+            if config.reset_rate and self._fault_rng.random() < config.reset_rate:
+                self.stats['resets'] += 1
+                return 'reset', None, None
+            if not key or not cx or not query:
+                self.stats['400'] += 1
+                return 400, MISSING_PARAM_BODY, {}
+            if cx in config.bad_cxs or (config.valid_cxs is not None and cx not in config.valid_cxs):
+                self.stats['404_bad_cx'] += 1
+                return 404, BAD_CX_BODY, {}
+            if config.daily_limit and self.key_usage[key] >= config.daily_limit:
+                self.stats['403_daily_limit'] += 1
+                return 403, DAILY_LIMIT_BODY, {}
+            rate_limited = config.key_qps > 0 and not self._take_token(key)
+            if rate_limited or (config.error_rate and self._fault_rng.random() < config.error_rate):
+                self.stats['429_rate_limit' if rate_limited else '429_injected'] += 1
+                headers = {'Retry-After': f"{config.retry_after:g}"} if config.retry_after is not None else {}
+                return 429, RATE_LIMIT_BODY, headers
+            # Only answered requests count towards the daily quota, as with Google
+            self.key_usage[key] += 1
+            self.stats['200'] += 1
+        try:
+            start = max(1, int(params.get('start', 1)))
+            num = min(max(1, int(params.get('num', PAGE_SIZE_MAX))), PAGE_SIZE_MAX)
+        except ValueError:
+            return 400, MISSING_PARAM_BODY, {}
+        if start + num - 1 > RESULTS_MAX:
+            return 400, MISSING_PARAM_BODY, {}
+        body = self.page(query, cx, start, num)
+        try:
+            if params.get('fields'):
+                body = select_fields(body, parse_fields(params['fields']))
+        except ValueError:
+            return 400, MISSING_PARAM_BODY, {}
+        # Google pretty-prints JSON unless asked not to
+        indent = None if params.get('prettyPrint', 'true').lower() == 'false' else 2
+        return 200, json.dumps(body, indent=indent).encode('utf-8'), {}
+
+    def latency(self) -> float:
+        """Response delay of one request."""
+        if not self.config.latency and not self.config.jitter:
+            return 0.0
+        with self._lock:
+            jitter = self._fault_rng.uniform(-self.config.jitter, self.config.jitter)
+        return max(0.0, self.config.latency + jitter)
+
+    def count(self, name: str, amount: int = 1) -> None:
+        """Increment a counter."""
+        with self._lock:
+            self.stats[name] += amount
+
+    def snapshot(self) -> Dict:
+        """Counters for /__stats."""
+        with self._lock:
+            return {'stats': dict(self.stats), 'key_usage': dict(self.key_usage),
+                    'unique_links_served': len(self.served_links), 'config': self.config.to_dict()}
+
+
+class EmulatorHandler(BaseHTTPRequestHandler):
+    """HTTP/1.1 (keep-alive) handler for /customsearch/v1 and /__stats."""
+
+    protocol_version = "HTTP/1.1"
+    emulator: CustomSearchEmulator = None  # Set on the per-server subclass
+
+    def log_message(self, format, *args):
+        pass
+
+    def setup(self):
+        super().setup()
+        # Headers and body are separate writes: without this, Nagle + delayed ACK add ~40 ms per response
+        self.connection.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        # One per TCP connection: requests / connections shows how well clients keep connections alive
+        self.emulator.count('connections')
+
+    def _send(self, status: int, body: bytes, headers: Optional[Dict[str, str]] = None) -> None:
+        headers = dict(headers or {})
+        if 'gzip' in self.headers.get('Accept-Encoding', ''):
+            body = gzip.compress(body, compresslevel=6)
+            headers['Content-Encoding'] = 'gzip'
+        if not self.path.startswith('/__stats'):
+            self.emulator.count('response_bytes', len(body))
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=UTF-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers.items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _reset(self) -> None:
+        """Drop the connection with a TCP RST (as a flaky network or proxy would)."""
+        self.connection.setsockopt(socket.SOL_SOCKET, socket.SO_LINGER, struct.pack('ii', 1, 0))
+        self.close_connection = True
+        self.connection.close()
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        if url.path == '/__stats':
+            self._send(200, json.dumps(self.emulator.snapshot()).encode('utf-8'))
+            return
+        if not url.path.rstrip('/').endswith('customsearch/v1'):
+            self._send(404, error_body(404, "Not Found", "notFound", "NOT_FOUND"))
+            return
+        params = {name: values[0] for name, values in parse_qs(url.query).items()}
+        delay = self.emulator.latency()
+        if delay:
+            time.sleep(delay)
+        status, body, headers = self.emulator.decide(params)
+        if status == 'reset':
+            self._reset()
+            return
+        self._send(status, body, headers)
+
+    def finish(self):
+        try:
+            super().finish()
+        except OSError:
+            pass  # Connection already reset
+
+
+class EmulatorServer(ThreadingHTTPServer):
+    """Threaded HTTP server; connection errors of clients are not printed."""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        pass
+
+
+def create_server(config: EmulatorConfig, host: str = "127.0.0.1", port: int = 0) -> EmulatorServer:
+    """
+    Create (but do not start) an emulator server.
+
+    Args:
+        config: Emulator behaviour
+        host: Address to listen on
+        port: Port to listen on (0 = any free port, see server.server_address)
+
+    Returns:
+        EmulatorServer; call serve_forever(), e.g. in a thread
+    """
+    handler = type('BoundEmulatorHandler', (EmulatorHandler,), {'emulator': CustomSearchEmulator(config)})
+    return EmulatorServer((host, port), handler)
+
+
+def endpoint_url(server: EmulatorServer) -> str:
+    """Base URL to pass as --api_endpoint / CSE_API_ENDPOINT."""
+    host, port = server.server_address[:2]
+    return f"http://{host}:{port}/"
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """Add the EmulatorConfig options to a command line parser."""
+    parser.add_argument('--seed', type=int, default=42, help='Seed of results and faults (default: 42)')
+    parser.add_argument('--pool_size', type=int, default=20000,
+                        help='Distinct profiles results are drawn from (default: 20000)')
+    parser.add_argument('--min_results', type=int, default=30, help='Fewest results per query (default: 30)')
+    parser.add_argument('--max_results', type=int, default=RESULTS_MAX, help='Most results per query (default: 100)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Mean response time in seconds (default: 0)')
+    parser.add_argument('--jitter', type=float, default=0.0, help='Uniform +/- latency jitter in seconds (default: 0)')
+    parser.add_argument('--key_qps', type=float, default=0.0,
+                        help='Per-key requests per second before 429s (default: 0 = unlimited)')
+    parser.add_argument('--key_burst', type=float, default=1.0, help='Per-key burst size (default: 1)')
+    parser.add_argument('--daily_limit', type=int, default=0,
+                        help='Requests per key before 403 daily limit errors (default: 0 = unlimited)')
+    parser.add_argument('--bad_cxs', nargs='*', default=[], help='CXs answered with 404 not found')
+    parser.add_argument('--error_rate', type=float, default=0.0, help='Share of requests answered with a 429')
+    parser.add_argument('--reset_rate', type=float, default=0.0, help='Share of connections reset')
+    parser.add_argument('--retry_after', type=float, default=1.0,
+                        help='Retry-After seconds sent with 429s (negative = no header; default: 1)')
+
+
+def config_from_args(args: argparse.Namespace) -> EmulatorConfig:
+    """Build an EmulatorConfig from add_config_arguments() options."""
+    return EmulatorConfig(seed=args.seed, pool_size=args.pool_size, min_results=args.min_results,
+                          max_results=args.max_results, latency=args.latency, jitter=args.jitter,
+                          key_qps=args.key_qps, key_burst=args.key_burst, daily_limit=args.daily_limit,
+                          bad_cxs=args.bad_cxs, error_rate=args.error_rate, reset_rate=args.reset_rate,
+                          retry_after=args.retry_after if args.retry_after >= 0 else None)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Local Custom Search API emulator for load tests')
+    parser.add_argument('--host', default='127.0.0.1', help='Address to listen on (default: 127.0.0.1)')
+    parser.add_argument('--port', type=int, default=8765, help='Port to listen on (default: 8765)')
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    server = create_server(config_from_args(args), args.host, args.port)
+    print(f"[INFO] Custom Search emulator listening on {endpoint_url(server)} (counters at /__stats)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[INFO] Stopped.")
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
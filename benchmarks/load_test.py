@@ -0,0 +1,263 @@
+"""
+Load test of the search stage against the Custom Search emulator.
+
+Runs iter_search_pages (or iter_search_pages_concurrent) with an APIManager
+of fake keys and the collector's adaptive RateLimiter, against an emulator
+started in a child process (or an already running one), and reports profiles
+per second, emulator requests per unique profile and the time the client
+spent waiting, split into backoff and pacing.
+
+Usage:
+    python -m benchmarks.load_test --count 500 --keys 4 --concurrent --latency 0.1 --key_qps 2
+    python -m benchmarks.load_test --count 200 --reset_rate 0.02 --error_rate 0.05 --bad_cx_keys 1
+    python -m benchmarks.load_test --count 500 --transport rest
+"""
+import argparse
+import contextlib
+import io
+import json
+import multiprocessing
+import os
+import sys
+import threading
+import time
+import urllib.request
+from collections import defaultdict
+from typing import Dict, List, Optional
+
+from benchmarks.cse_emulator import add_config_arguments, config_from_args, create_server, endpoint_url
+from utils import search_google
+from utils.multi_api_key import APIManager
+from utils.rate_limiter import RateLimiter
+
+
+class WaitRecorder:
+    """
+    Records every time.sleep and threading.Event.wait of the process (the
+    collector's backoffs and pacing, and the API client's retry sleeps), by the
+    name of the calling function. Waits still happen in full.
+    """
+
+    def __init__(self):
+        self.seconds: Dict[str, float] = defaultdict(float)
+        self.calls: Dict[str, int] = defaultdict(int)
+        self._lock = threading.Lock()
+        self._sleep = time.sleep
+        self._event_wait = threading.Event.wait
+
+    def _record(self, caller: str, seconds: float) -> None:
+        with self._lock:
+            self.seconds[caller] += seconds
+            self.calls[caller] += 1
+
+    def __enter__(self):
+        recorder = self
+
+        def sleep(seconds):
+            start = time.perf_counter()
+            try:
+                recorder._sleep(seconds)
+            finally:
+                recorder._record(sys._getframe(1).f_code.co_name, time.perf_counter() - start)
+
+        def event_wait(event, timeout=None):
+            if timeout is None:
+                # Untimed waits are thread hand-offs (e.g. Thread.start), not pacing or backoff
+                return recorder._event_wait(event, timeout)
+            start = time.perf_counter()
+            try:
+                return recorder._event_wait(event, timeout)
+            finally:
+                recorder._record(sys._getframe(1).f_code.co_name, time.perf_counter() - start)
+
+        time.sleep = sleep
+        threading.Event.wait = event_wait
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        time.sleep = self._sleep
+        threading.Event.wait = self._event_wait
+
+
+class RecordingRateLimiter(RateLimiter):
+    """RateLimiter that adds up the cooldowns it imposes after rate limits."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cooldown_seconds = 0.0
+        self.rate_limits = 0
+
+    def on_rate_limited(self, key_index: int, retry_after: Optional[float] = None) -> float:
+        cooldown = super().on_rate_limited(key_index, retry_after)
+        self.cooldown_seconds += cooldown
+        self.rate_limits += 1
+        return cooldown
+
+
+def bad_cxs(count: int) -> List[str]:
+    """CXs of the first `count` keys, which the emulator must answer with 404."""
+    return [f"load-test-bad-cx-{i + 1}" for i in range(count)]
+
+
+def _serve(config, connection) -> None:
+    """Child process: run an emulator on a free port and send back its URL."""
+    server = create_server(config)
+    connection.send(endpoint_url(server))
+    connection.close()
+    server.serve_forever()
+
+
+def fetch_stats(endpoint: str) -> Dict:
+    """Counters of a running emulator."""
+    with urllib.request.urlopen(endpoint.rstrip('/') + '/__stats', timeout=10) as response:
+        return json.loads(response.read().decode('utf-8'))
+
+
+def run_load_test(args: argparse.Namespace, endpoint: str) -> Dict:
+    """
+    Collect `args.count` profiles from the emulator and measure the run.
+
+    Args:
+        args: Parsed command line options
+        endpoint: Emulator base URL
+
+    Returns:
+        Result dictionary
+    """
+    keys = [f"load-test-key-{i + 1}" for i in range(args.keys)]
+    cxs = [f"load-test-cx-{i + 1}" for i in range(args.bad_cx_keys, args.keys)]
+    cxs = bad_cxs(args.bad_cx_keys) + cxs
+    limiter = RecordingRateLimiter(initial_rate=(1.0 / args.delay) if args.delay > 0 else args.max_qps,
+                                   max_rate=args.max_qps)
+    api_manager = APIManager(keys, cxs, rate_limiter=limiter, daily_quota=args.daily_quota)
+    search_google.set_api_endpoint(endpoint)
+    search_google.set_transport(args.transport)
+    before = fetch_stats(endpoint)
+
+    output = sys.stdout if args.verbose else io.StringIO()
+    profiles = 0
+    start = time.perf_counter()
+    with WaitRecorder() as waits, contextlib.redirect_stdout(output):
+        if args.concurrent:
+            pages = search_google.iter_search_pages_concurrent(args.industry, args.count, api_manager,
+                                                               delay=args.delay)
+        else:
+            pages = search_google.iter_search_pages(args.industry, args.count, api_manager.get_current_key(),
+                                                    api_manager.get_current_cx(), delay=args.delay,
+                                                    api_manager=api_manager)
+        for page in pages:
+            profiles += len(page)
+    elapsed = time.perf_counter() - start
+    search_google.set_api_endpoint(None)
+    search_google.set_transport('googleapiclient')
+
+    after = fetch_stats(endpoint)
+    server = {name: count - before['stats'].get(name, 0) for name, count in after['stats'].items()}
+    requests = server.get('requests', 0)
+    limiter_waits = waits.seconds.get('acquire', 0.0)
+    # Rate limiter waits are pacing except for the cooldowns it imposed after 429s
+    backoff = sum(seconds for caller, seconds in waits.seconds.items() if caller != 'acquire')
+    backoff += min(limiter.cooldown_seconds, limiter_waits)
+    return {
+        'mode': 'concurrent' if args.concurrent else 'serial',
+        'transport': args.transport,
+        'industry': args.industry,
+        'target': args.count,
+        'keys': args.keys,
+        'bad_cx_keys': args.bad_cx_keys,
+        'unique_profiles': profiles,
+        'wall_seconds': round(elapsed, 3),
+        'profiles_per_sec': round(profiles / elapsed, 2) if elapsed > 0 else None,
+        'requests': requests,
+        'requests_per_unique_profile': round(requests / profiles, 3) if profiles else None,
+        'connections': server.get('connections', 0),
+        'response_bytes_per_request': round(server.get('response_bytes', 0) / requests) if requests else None,
+        'backoff_seconds': round(backoff, 3),
+        'pacing_seconds': round(max(limiter_waits - limiter.cooldown_seconds, 0.0), 3),
+        'rate_limit_cooldowns': limiter.rate_limits,
+        'waits_by_caller': {caller: {'seconds': round(seconds, 3), 'calls': waits.calls[caller]}
+                            for caller, seconds in sorted(waits.seconds.items())},
+        'server': server,
+        'key_usage': api_manager.get_usage_stats(),
+        'unhealthy_keys': sorted(index + 1 for index in api_manager.unhealthy),
+        'emulator': after['config'],
+    }
+
+
+def print_report(result: Dict) -> None:
+    print("=" * 60)
+    print(f"Mode: {result['mode']}, {result['transport']} transport "
+          f"({result['keys']} keys, {result['bad_cx_keys']} with a bad CX)")
+    print(f"Unique profiles: {result['unique_profiles']}/{result['target']} in {result['wall_seconds']:.1f}s "
+          f"-> {result['profiles_per_sec']} profiles/s")
+    print(f"Requests: {result['requests']} ({result['requests_per_unique_profile']} per unique profile) "
+          f"over {result['connections']} connections, {result['response_bytes_per_request']} bytes per response")
+    print(f"Time lost to backoff: {result['backoff_seconds']:.1f}s "
+          f"(pacing waits: {result['pacing_seconds']:.1f}s, {result['rate_limit_cooldowns']} rate-limit cooldowns)")
+    for caller, wait in result['waits_by_caller'].items():
+        print(f"  waited in {caller}(): {wait['seconds']:.1f}s over {wait['calls']} calls")
+    print(f"Emulator responses: {json.dumps(result['server'], sort_keys=True)}")
+    if result['unhealthy_keys']:
+        print(f"Keys taken out of rotation: {result['unhealthy_keys']}")
+    print("=" * 60)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test of the search stage against the Custom Search emulator')
+    parser.add_argument('--industry', default='Data Engineer', help='Industry to search (default: Data Engineer)')
+    parser.add_argument('--count', type=int, default=300, help='Profiles to collect (default: 300)')
+    parser.add_argument('--keys', type=int, default=3, help='Number of fake API key/CX pairs (default: 3)')
+    parser.add_argument('--bad_cx_keys', type=int, default=0,
+                        help='Pair this many keys with a CX the emulator answers with 404 (default: 0)')
+    parser.add_argument('--concurrent', action='store_true', help='Use iter_search_pages_concurrent')
+    parser.add_argument('--transport', choices=search_google.TRANSPORTS, default='googleapiclient',
+                        help='How the collector sends requests, as in main.py (default: googleapiclient)')
+    parser.add_argument('--delay', type=float, default=0.5,
+                        help='Initial delay between requests of a key, as in main.py (default: 0.5)')
+    parser.add_argument('--max_qps', type=float, default=1.5,
+                        help='Upper bound of the adaptive per-key rate, as in main.py (default: 1.5)')
+    parser.add_argument('--daily_quota', type=int, default=100, help='Client-side daily quota per key (default: 100)')
+    parser.add_argument('--endpoint', default=None,
+                        help='Use an already running emulator at this URL instead of starting one '
+                             '(start it with --bad_cxs load-test-bad-cx-1 ... to use --bad_cx_keys)')
+    parser.add_argument('--output', default=None, help='Also save the result as JSON to this path')
+    parser.add_argument('--verbose', action='store_true', help="Show the collector's own output")
+    add_config_arguments(parser)
+    args = parser.parse_args()
+
+    if args.count < 1 or args.keys < 1:
+        parser.error("--count and --keys must be positive")
+    if not 0 <= args.bad_cx_keys <= args.keys:
+        parser.error("--bad_cx_keys must be between 0 and --keys")
+
+    process = None
+    endpoint = args.endpoint
+    if endpoint is None:
+        # Separate process, so the emulator's threads do not compete with the client for the GIL
+        config = config_from_args(args)
+        config.bad_cxs.update(bad_cxs(args.bad_cx_keys))
+        receiver, sender = multiprocessing.Pipe(duplex=False)
+        process = multiprocessing.Process(target=_serve, args=(config, sender), daemon=True)
+        process.start()
+        endpoint = receiver.recv()
+    print(f"[INFO] Load testing against {endpoint}")
+    try:
+        result = run_load_test(args, endpoint)
+    finally:
+        if process is not None:
+            process.terminate()
+            process.join()
+    print_report(result)
+
+    if args.output:
+        directory = os.path.dirname(args.output)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(result, f, ensure_ascii=False, indent=2)
+        print(f"[INFO] Results saved to {args.output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
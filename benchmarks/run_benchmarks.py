@@ -0,0 +1,279 @@
+"""
+Offline CPU benchmarks of the collection and cleaning stages.
+
+Runs parse_profile, parse_profiles, detect_skills, save_to_csv (append + dedup)
+and batch_cleaner.process_single_file on synthetic profiles, and reports
+throughput, p50/p99 per-item latency and peak memory of each stage. No network
+access or spaCy model is needed.
+
+Usage:
+    python -m benchmarks.run_benchmarks --rows 1000 10000
+    python -m benchmarks.run_benchmarks --rows 100000 --compare benchmarks/results/before.json
+"""
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+import batch_cleaner
+from benchmarks.synthetic import SyntheticProfiles
+from utils.parser import detect_skills, parse_profile, parse_profiles
+from utils.writer import PROFILE_FIELDS, save_to_csv
+
+
+STAGES = ('parse_profile', 'parse_profiles', 'detect_skills', 'save_to_csv', 'process_single_file')
+RESULTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results")
+# Items per call for the batch stages (one collection flush of parsed result pages)
+BATCH_ROWS = 1000
+
+
+class Stage:
+    """
+    One benchmarked stage.
+
+    `run(items, workdir)` processes all items and returns (seconds, count) pairs:
+    one per item for per-item stages, one per call for batch stages. Per-item
+    latency of a batch call is its time divided by its item count.
+    """
+
+    def __init__(self, name: str, run: Callable, latency_basis: str):
+        """
+        Args:
+            name: Stage name
+            run: Function (items, workdir) -> list of (seconds, item count)
+            latency_basis: 'item', 'batch' or 'file' (what a single timing covers)
+        """
+        self.name = name
+        self.run = run
+        self.latency_basis = latency_basis
+
+
+def _time_each(func: Callable, values: List) -> List[tuple]:
+    timings = []
+    clock = time.perf_counter
+    for value in values:
+        start = clock()
+        func(value)
+        timings.append((clock() - start, 1))
+    return timings
+
+
+def _time_batches(func: Callable, values: List, batch_rows: int = BATCH_ROWS) -> List[tuple]:
+    timings = []
+    for i in range(0, len(values), batch_rows):
+        batch = values[i:i + batch_rows]
+        start = time.perf_counter()
+        func(batch)
+        timings.append((time.perf_counter() - start, len(batch)))
+    return timings
+
+
+def run_parse_profile(items, workdir):
+    return _time_each(parse_profile, items)
+
+
+def run_parse_profiles(items, workdir):
+    return _time_batches(parse_profiles, items)
+
+
+def run_detect_skills(items, workdir):
+    return _time_each(detect_skills, [item['snippet'] for item in items])
+
+
+def run_save_to_csv(items, workdir):
+    rows = parse_profiles(items)
+    filepath = os.path.join(workdir, "save_to_csv", "profiles.csv")
+    os.makedirs(os.path.dirname(filepath), exist_ok=True)
+    return _time_batches(lambda batch: save_to_csv(batch, filepath, append=True), rows)
+
+
+def run_process_single_file(items, workdir):
+    industry_dir = os.path.join(workdir, "process_single_file")
+    os.makedirs(industry_dir, exist_ok=True)
+    input_csv = os.path.join(industry_dir, "profiles.csv")
+    # Written directly (not timed): duplicates stay in, so the cleaner's own dedup is measured too
+    pd.DataFrame(parse_profiles(items), columns=PROFILE_FIELDS).to_csv(
+        input_csv, index=False, encoding='utf-8-sig')
+    output_json = os.path.join(industry_dir, batch_cleaner.output_filename())
+    start = time.perf_counter()
+    if not batch_cleaner.process_single_file(input_csv, output_json, engine='gazetteer'):
+        raise RuntimeError(f"process_single_file failed on {input_csv}")
+    return [(time.perf_counter() - start, len(items))]
+
+
+ALL_STAGES = {
+    'parse_profile': Stage('parse_profile', run_parse_profile, 'item'),
+    'parse_profiles': Stage('parse_profiles', run_parse_profiles, 'batch'),
+    'detect_skills': Stage('detect_skills', run_detect_skills, 'item'),
+    'save_to_csv': Stage('save_to_csv', run_save_to_csv, 'batch'),
+    'process_single_file': Stage('process_single_file', run_process_single_file, 'file'),
+}
+
+
+def summarize(stage: Stage, rows: int, timings: List[tuple], peak_bytes: Optional[int]) -> Dict:
+    """
+    Turn the timings of one stage run into a result record.
+
+    Args:
+        stage: Benchmarked stage
+        rows: Number of input items
+        timings: (seconds, item count) pairs returned by the stage
+        peak_bytes: Peak traced memory, or None if memory was not measured
+
+    Returns:
+        Result dictionary (times in seconds and microseconds, memory in MB)
+    """
+    seconds = np.array([t for t, _ in timings])
+    counts = np.array([n for _, n in timings])
+    per_item = np.repeat(seconds / counts, counts)
+    total = float(seconds.sum())
+    return {
+        'stage': stage.name,
+        'rows': rows,
+        'latency_basis': stage.latency_basis,
+        'seconds': round(total, 4),
+        'items_per_sec': round(rows / total, 1) if total > 0 else None,
+        'p50_us': round(float(np.percentile(per_item, 50)) * 1e6, 2),
+        'p99_us': round(float(np.percentile(per_item, 99)) * 1e6, 2),
+        'peak_mem_mb': round(peak_bytes / 2 ** 20, 2) if peak_bytes is not None else None,
+    }
+
+
+def run_stage(stage: Stage, items: List[Dict[str, str]], measure_memory: bool = True) -> Dict:
+    """
+    Benchmark one stage on the given items.
+
+    Timing and memory are measured in separate passes (tracemalloc slows Python
+    code down), each in a fresh temporary directory. Output printed by the stage
+    is discarded.
+
+    Args:
+        stage: Stage to run
+        items: Synthetic search result items
+        measure_memory: Also run a tracemalloc pass for peak memory
+
+    Returns:
+        Result dictionary (see summarize())
+    """
+    with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+        timings = stage.run(items, workdir)
+    peak = None
+    if measure_memory:
+        with tempfile.TemporaryDirectory() as workdir, contextlib.redirect_stdout(io.StringIO()):
+            tracemalloc.start()
+            try:
+                stage.run(items, workdir)
+                peak = tracemalloc.get_traced_memory()[1]
+            finally:
+                tracemalloc.stop()
+    return summarize(stage, len(items), timings, peak)
+
+
+def environment() -> Dict:
+    """Versions and machine details stored with the results."""
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                                timeout=5).stdout.strip() or None
+    except (OSError, subprocess.SubprocessError):
+        commit = None
+    return {
+        'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'git_commit': commit,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'cpu_count': os.cpu_count(),
+        'pandas': pd.__version__,
+        'numpy': np.__version__,
+    }
+
+
+def compare(results: List[Dict], baseline_path: str) -> None:
+    """
+    Print the throughput of each result relative to a previous run.
+
+    Args:
+        results: Result dictionaries of this run
+        baseline_path: JSON file written by an earlier run
+    """
+    with open(baseline_path, 'r', encoding='utf-8') as f:
+        baseline = {(r['stage'], r['rows']): r for r in json.load(f)['results']}
+    print(f"\nCompared with {baseline_path}:")
+    print(f"{'stage':<22}{'rows':>9}{'items/s':>13}{'before':>13}{'speedup':>9}{'p99 before -> now (us)':>30}")
+    for result in results:
+        before = baseline.get((result['stage'], result['rows']))
+        if before is None or not before.get('items_per_sec') or not result['items_per_sec']:
+            continue
+        speedup = result['items_per_sec'] / before['items_per_sec']
+        p99 = f"{before['p99_us']:.1f} -> {result['p99_us']:.1f}"
+        print(f"{result['stage']:<22}{result['rows']:>9}{result['items_per_sec']:>13.1f}"
+              f"{before['items_per_sec']:>13.1f}{speedup:>8.2f}x{p99:>30}")
+
+
+def print_result(result: Dict) -> None:
+    memory = f"{result['peak_mem_mb']:.1f}" if result['peak_mem_mb'] is not None else '-'
+    print(f"{result['stage']:<22}{result['rows']:>9}{result['items_per_sec']:>13.1f}"
+          f"{result['p50_us']:>11.1f}{result['p99_us']:>11.1f}{memory:>11}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline CPU benchmarks of the CV Collector stages')
+    parser.add_argument('--rows', type=int, nargs='+', default=[1000, 10000],
+                        help='Synthetic profile counts to benchmark (1000 to 1000000; default: 1000 10000)')
+    parser.add_argument('--stages', nargs='+', choices=STAGES, default=list(STAGES),
+                        help='Stages to run (default: all)')
+    parser.add_argument('--seed', type=int, default=42, help='Seed of the synthetic profiles (default: 42)')
+    parser.add_argument('--output', default=None,
+                        help='Results JSON path (default: benchmarks/results/<timestamp>.json)')
+    parser.add_argument('--compare', default=None, help='Results JSON of an earlier run to compare against')
+    parser.add_argument('--no_memory', action='store_true',
+                        help='Skip the peak memory pass (about halves the run time)')
+    args = parser.parse_args()
+
+    if any(rows < 1 for rows in args.rows):
+        parser.error("--rows values must be positive")
+    if args.compare and not os.path.exists(args.compare):
+        parser.error(f"--compare file not found: {args.compare}")
+
+    # Load the gazetteer pipeline and skill matcher before timing anything
+    with contextlib.redirect_stdout(io.StringIO()):
+        batch_cleaner.get_nlp('gazetteer')
+    detect_skills("Python")
+
+    generator = SyntheticProfiles(seed=args.seed)
+    results = []
+    print(f"{'stage':<22}{'rows':>9}{'items/s':>13}{'p50 (us)':>11}{'p99 (us)':>11}{'peak (MB)':>11}")
+    for rows in args.rows:
+        items = generator.items(rows)
+        for name in args.stages:
+            result = run_stage(ALL_STAGES[name], items, measure_memory=not args.no_memory)
+            results.append(result)
+            print_result(result)
+
+    output = args.output or os.path.join(RESULTS_DIR, time.strftime('%Y%m%d-%H%M%S') + ".json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({'environment': environment(), 'seed': args.seed, 'batch_rows': BATCH_ROWS,
+                   'results': results}, f, ensure_ascii=False, indent=2)
+    print(f"\n[INFO] Results saved to {output}")
+
+    if args.compare:
+        compare(results, args.compare)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,122 @@
+"""Deterministic synthetic LinkedIn-style search results for offline benchmarks."""
+import random
+import unicodedata
+from typing import Dict, Iterator, List
+
+
+FAMILY_NAMES = ['Nguyễn', 'Trần', 'Lê', 'Phạm', 'Hoàng', 'Huỳnh', 'Phan', 'Vũ', 'Võ', 'Đặng', 'Bùi', 'Đỗ']
+MIDDLE_NAMES = ['Văn', 'Thị', 'Minh', 'Quốc', 'Thanh', 'Ngọc', 'Đức', 'Hoàng', 'Anh', 'Thu']
+GIVEN_NAMES = ['An', 'Bình', 'Châu', 'Dũng', 'Hà', 'Hải', 'Hương', 'Huy', 'Khánh', 'Lan', 'Linh', 'Long',
+               'Mai', 'Nam', 'Phúc', 'Quân', 'Sơn', 'Tâm', 'Thảo', 'Trang', 'Tuấn', 'Việt']
+ENGLISH_NAMES = ['David', 'Kevin', 'Tony', 'Jenny', 'Linda', 'Peter', 'Henry', 'Vivian']
+
+SENIORITY = ['', '', 'Senior ', 'Junior ', 'Lead ', 'Principal ']
+ROLES = ['Data Engineer', 'Software Engineer', 'Backend Developer', 'Frontend Developer', 'Data Scientist',
+         'Data Analyst', 'Business Analyst', 'DevOps Engineer', 'Product Manager', 'QA Engineer',
+         'Machine Learning Engineer', 'Solution Architect', 'Mobile Developer', 'Marketing Specialist']
+VI_ROLES = ['Kỹ sư dữ liệu', 'Lập trình viên', 'Chuyên viên phân tích', 'Trưởng nhóm kỹ thuật', 'Kế toán']
+COMPANIES = ['FPT Software', 'Viettel', 'VNG Corporation', 'Shopee', 'MoMo', 'Tiki', 'VinAI', 'Techcombank',
+             'Grab', 'KMS Technology', 'NashTech', 'Axon Active', 'Zalo', 'VPBank', 'Be Group']
+SCHOOLS = ['Đại học Bách khoa Hà Nội', 'University of Science', 'Đại học Quốc gia TP.HCM', 'FPT University',
+           'RMIT University Vietnam', 'Đại học Kinh tế Quốc dân', 'Hanoi University of Science and Technology']
+DEGREES = ['Bachelor of Computer Science', 'Kỹ sư Công nghệ thông tin', 'Master of Data Science',
+           'Cử nhân Khoa học máy tính', 'Bachelor of Business Administration']
+LOCATIONS = ['Hà Nội, Việt Nam', 'Ho Chi Minh City, Vietnam', 'Hanoi, Vietnam', 'Đà Nẵng, Việt Nam',
+             'Thành phố Hồ Chí Minh', 'Singapore', 'HCM', 'Vietnam']
+SKILLS = ['Python', 'SQL', 'Java', 'Spark', 'AWS', 'Docker', 'Kubernetes', 'React', 'Node.js', 'Go',
+          'machine learning', 'Airflow', 'Kafka', 'Power BI', 'Tableau', 'C++', 'C#', '.NET', 'TensorFlow',
+          'PostgreSQL', 'MongoDB', 'Git', 'Excel', 'Scrum']
+FILLER_EN = ['Passionate about building reliable data platforms.', 'Experienced in leading cross-functional teams.',
+             'Open to new opportunities.', 'I enjoy mentoring junior engineers.',
+             'Focused on scalable systems and clean code.']
+FILLER_VI = ['Đam mê xây dựng hệ thống dữ liệu.', 'Có kinh nghiệm làm việc nhóm và quản lý dự án.',
+             'Luôn học hỏi công nghệ mới.', 'Mong muốn tìm kiếm cơ hội mới.']
+
+
+def _slug(text: str) -> str:
+    """Ascii profile slug, as LinkedIn builds it from a name."""
+    ascii_text = unicodedata.normalize('NFKD', text.replace('Đ', 'D').replace('đ', 'd'))
+    ascii_text = ascii_text.encode('ascii', 'ignore').decode('ascii')
+    return '-'.join(ascii_text.lower().split())
+
+
+class SyntheticProfiles:
+    """
+    Generates search result items ('title', 'snippet', 'link') shaped like Custom
+    Search results for LinkedIn profiles: Vietnamese and English names, titles,
+    companies, schools, locations and skills, with a share of repeated profiles
+    (the same result found by several queries). The same seed always yields the
+    same items.
+    """
+
+    def __init__(self, seed: int = 42, duplicate_rate: float = 0.1, vietnamese_rate: float = 0.5):
+        """
+        Args:
+            seed: Random seed
+            duplicate_rate: Share of items repeating an earlier item
+            vietnamese_rate: Share of snippets written in Vietnamese
+        """
+        self.seed = seed
+        self.duplicate_rate = duplicate_rate
+        self.vietnamese_rate = vietnamese_rate
+
+    def _name(self, rng: random.Random) -> str:
+        name = f"{rng.choice(FAMILY_NAMES)} {rng.choice(MIDDLE_NAMES)} {rng.choice(GIVEN_NAMES)}"
+        if rng.random() < 0.1:
+            name = f"{rng.choice(ENGLISH_NAMES)} {name}"
+        return name
+
+    def _snippet(self, rng: random.Random, role: str, company: str) -> str:
+        skills = ', '.join(rng.sample(SKILLS, rng.randint(0, 5)))
+        location = rng.choice(LOCATIONS)
+        if rng.random() < self.vietnamese_rate:
+            parts = [location, f"{rng.choice(VI_ROLES)} tại {company}",
+                     f"Học vấn: {rng.choice(DEGREES)}, {rng.choice(SCHOOLS)}", rng.choice(FILLER_VI)]
+            if skills:
+                parts.append(f"Kỹ năng: {skills}")
+        else:
+            parts = [location, f"{role} at {company}", rng.choice(FILLER_EN),
+                     f"{rng.choice(DEGREES)} at {rng.choice(SCHOOLS)}"]
+            if skills:
+                parts.append(f"Skills: {skills}")
+        rng.shuffle(parts)
+        return ' · '.join(parts)
+
+    def item(self, rng: random.Random, index: int) -> Dict[str, str]:
+        """One new search result item."""
+        name = self._name(rng)
+        role = rng.choice(SENIORITY) + rng.choice(ROLES)
+        company = rng.choice(COMPANIES)
+        separator = rng.choice([' - ', ' - ', ' | '])
+        title = f"{name}{separator}{role} - {company} | LinkedIn"
+        host = rng.choice(['vn.linkedin.com', 'www.linkedin.com', 'linkedin.com'])
+        link = f"https://{host}/in/{_slug(name)}-{index:x}"
+        return {'title': title, 'snippet': self._snippet(rng, role, company), 'link': link}
+
+    def iter_items(self, count: int) -> Iterator[Dict[str, str]]:
+        """
+        Yield `count` items.
+
+        Args:
+            count: Number of items
+
+        Yields:
+            Search result item dictionaries
+        """
+        rng = random.Random(self.seed)
+        recent: List[Dict[str, str]] = []
+        for index in range(count):
+            if recent and rng.random() < self.duplicate_rate:
+                yield dict(rng.choice(recent))
+                continue
+            item = self.item(rng, index)
+            # Duplicates come from a bounded window, as repeats come from overlapping queries
+            if len(recent) < 1000:
+                recent.append(item)
+            else:
+                recent[rng.randrange(1000)] = item
+            yield item
+
+    def items(self, count: int) -> List[Dict[str, str]]:
+        """`count` items as a list."""
+        return list(self.iter_items(count))
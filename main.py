@@ -1,14 +1,26 @@
 """CV Collector CLI - Collect public CV/Profile data using Google Custom Search API."""
 import argparse
+import os
 import sys
+import tempfile
+import time
 from tqdm import tqdm
 
-from utils.search_google import search_profiles
-from utils.parser import parse_profile
-from utils.writer import save_to_csv, get_output_path
-import os
-import pandas as pd
+from utils.search_google import (iter_search_pages, iter_search_pages_concurrent, generate_query_variations,
+                                 get_api_endpoint, set_api_endpoint, set_transport, TRANSPORTS)
+from utils.parser import parse_profiles
+from utils.writer import CSVStreamWriter, compact_csv, get_output_path
+from utils.parquet_store import export_profiles
+from utils.search_cache import SearchCache
+from utils.url_index import GlobalURLIndex
 from utils.multi_api_key import APIManager
+from utils.rate_limiter import RateLimiter
+from utils.quota_ledger import QuotaLedger
+from utils.query_scheduler import QueryScheduler
+from utils.checkpoint import SearchCheckpoint, checkpoint_path
+from utils.metrics import MetricsExporter, get_metrics
+
+DEFAULT_DATA_DIR = "data_collected"
 
 
 def main():
@@ -22,6 +34,9 @@ Examples:
   python main.py --industry "Data Engineer" --count 50 --api_key "AIza..." --cx "1a2b3c..."
   python main.py --industry "Frontend Developer" --count 30 --api_key "YOUR_KEY" --cx "YOUR_CX" --delay 3
   python main.py --industry "Data Engineer" --count 50 --api_key "YOUR_KEY" --cx "YOUR_CX" --overwrite
+  python main.py --industry "Data Engineer" --count 1000 --use_multi_keys --concurrent
+  python main.py --batch_file industries.txt --use_multi_keys
+  python main.py --industry "Data Engineer" --use_multi_keys --resume
   
 Note: By default, new profiles are automatically merged with existing profiles.csv (duplicates filtered by URL).
 Use --overwrite flag to replace existing file instead.
@@ -31,8 +46,22 @@ Use --overwrite flag to replace existing file instead.
     parser.add_argument(
         '--industry',
         type=str,
-        required=True,
-        help='Industry/profession name (e.g., "Data Engineer", "Frontend Developer")'
+        default=None,
+        help='Industry/profession name (e.g., "Data Engineer", "Frontend Developer"). Required unless --batch_file is used'
+    )
+    
+    parser.add_argument(
+        '--batch_file',
+        type=str,
+        default=None,
+        help='Collect several industries in one run. One "Industry,count" per line (count defaults to --count)'
+    )
+    
+    parser.add_argument(
+        '--batch_round',
+        type=int,
+        default=50,
+        help='Batch mode: profiles collected per industry before moving on to the next one (default: 50)'
     )
     
     parser.add_argument(
@@ -66,7 +95,147 @@ Use --overwrite flag to replace existing file instead.
         '--delay',
         type=float,
         default=2.0,
-        help='Delay between API requests in seconds (default: 2.0, to avoid rate limits)'
+        help='Initial delay between requests of the same API key in seconds (default: 2.0). '
+             'Each key then adapts its own pace to observed rate limits'
+    )
+    
+    parser.add_argument(
+        '--max_qps',
+        type=float,
+        default=1.5,
+        help='Upper bound for the adaptive request rate of each API key (default: 1.5 requests/second)'
+    )
+    
+    parser.add_argument(
+        '--daily_quota',
+        type=int,
+        default=100,
+        help='Daily request quota per API key, tracked across runs in <data_dir>/.quota_ledger.sqlite (default: 100)'
+    )
+    
+    parser.add_argument(
+        '--concurrent',
+        action='store_true',
+        help='Query all key/CX pairs from .api_keys_multi.txt in parallel (requires --use_multi_keys)'
+    )
+    
+    parser.add_argument(
+        '--scheduler',
+        choices=['bandit', 'shuffle'],
+        default='shuffle',
+        help='How to pick the next query page: "shuffle" walks variations in random order, "bandit" favours '
+             'variations with high historical yield (stats in <data_dir>/.query_stats.sqlite) (default: shuffle)'
+    )
+    
+    parser.add_argument(
+        '--query_report',
+        action='store_true',
+        help='Print the historical new-profile yield of each query variation for --industry and exit'
+    )
+    
+    parser.add_argument(
+        '--no_cache',
+        action='store_true',
+        help='Disable the on-disk search result cache (<data_dir>/.search_cache.sqlite)'
+    )
+    
+    parser.add_argument(
+        '--cache_ttl',
+        type=float,
+        default=72.0,
+        help='Hours before a cached result page expires (default: 72)'
+    )
+    
+    parser.add_argument(
+        '--cache_max_entries',
+        type=int,
+        default=50000,
+        help='Maximum number of cached result pages kept on disk (default: 50000)'
+    )
+    
+    parser.add_argument(
+        '--api_endpoint',
+        default=None,
+        help='Send Custom Search requests to this base URL instead of Google, e.g. the local emulator '
+             '(python -m benchmarks.cse_emulator) (default: $CSE_API_ENDPOINT). Disables the search cache and '
+             'the persistent quota ledger, and --data_dir defaults to a new temporary directory'
+    )
+    
+    parser.add_argument(
+        '--transport',
+        choices=TRANSPORTS,
+        default=None,
+        help='How search requests are sent: googleapiclient or rest (direct GETs over a pooled requests session, '
+             'asking for gzip and only the result fields used; skips loading the discovery client) '
+             '(default: $CSE_TRANSPORT, else googleapiclient)'
+    )
+    
+    parser.add_argument(
+        '--data_dir',
+        default=None,
+        help='Directory for the industry folders (profiles.csv, checkpoints), the global URL index, the '
+             'query stats, the quota ledger and the search cache (default: data_collected, or a new '
+             'temporary directory with --api_endpoint)'
+    )
+    
+    parser.add_argument(
+        '--metrics_dir',
+        default=None,
+        help='Write run metrics here at the end of the run: run_metrics.json and cv_collector.prom '
+             '(Prometheus textfile collector format) (default: --data_dir)'
+    )
+    
+    parser.add_argument(
+        '--metrics_interval',
+        type=float,
+        default=0,
+        help='Also rewrite the metrics files every N seconds during the run (default: 0 = only at the end)'
+    )
+    
+    parser.add_argument(
+        '--no_metrics',
+        action='store_true',
+        help='Do not write run metrics files'
+    )
+    
+    parser.add_argument(
+        '--flush_every',
+        type=int,
+        default=50,
+        help='Write collected profiles to CSV at least every N rows (and every 2 seconds) (default: 50)'
+    )
+    
+    parser.add_argument(
+        '--compact',
+        action='store_true',
+        help='Rewrite profiles.csv of --industry (or every --batch_file industry) without duplicate URLs and exit'
+    )
+    
+    parser.add_argument(
+        '--parquet',
+        action='store_true',
+        help='After collecting, also write data_collected/<industry>/profiles.parquet '
+             '(typed columns, skills as a list, zstd) for analytics'
+    )
+    
+    parser.add_argument(
+        '--export_parquet',
+        action='store_true',
+        help='Write profiles.parquet from the existing profiles.csv of --industry (or every --batch_file industry) and exit'
+    )
+    
+    parser.add_argument(
+        '--resume',
+        action='store_true',
+        help='Continue an interrupted or quota-limited collection from its checkpoint '
+             '(data_collected/<industry>/.checkpoint.json): same target, query order and page position'
+    )
+    
+    parser.add_argument(
+        '--rebuild_url_index',
+        action='store_true',
+        help='Rebuild the cross-industry URL index (data_collected/.global_urls.idx) from every '
+             'profiles.csv before collecting, e.g. after editing or deleting CSV files by hand'
     )
     
     parser.add_argument(
@@ -86,6 +255,97 @@ Use --overwrite flag to replace existing file instead.
         print("[ERROR] Delay must be non-negative.")
         sys.exit(1)
     
+    if not args.industry and not args.batch_file:
+        print("[ERROR] --industry or --batch_file is required.")
+        sys.exit(1)
+    
+    if args.industry and args.batch_file:
+        print("[ERROR] Use either --industry or --batch_file, not both.")
+        sys.exit(1)
+    
+    if args.flush_every <= 0:
+        print("[ERROR] --flush_every must be greater than 0.")
+        sys.exit(1)
+    
+    if args.batch_round <= 0:
+        print("[ERROR] --batch_round must be greater than 0.")
+        sys.exit(1)
+    
+    if args.resume and args.overwrite:
+        print("[ERROR] Use either --resume or --overwrite, not both.")
+        sys.exit(1)
+    
+    batch = []
+    if args.batch_file:
+        try:
+            batch = load_batch_file(args.batch_file, args.count)
+        except FileNotFoundError:
+            print(f"[ERROR] Batch file not found: {args.batch_file}")
+            sys.exit(1)
+        if not batch:
+            print(f"[ERROR] No industries found in {args.batch_file}")
+            sys.exit(1)
+    
+    if args.compact or args.export_parquet or args.query_report:
+        # Maintenance commands work on collected data, never on a scratch directory
+        args.data_dir = args.data_dir or DEFAULT_DATA_DIR
+    
+    if args.compact:
+        for industry in ([industry for industry, _ in batch] or [args.industry]):
+            compact_csv(get_output_path(industry, args.data_dir))
+        sys.exit(0)
+    
+    if args.export_parquet:
+        for industry in ([industry for industry, _ in batch] or [args.industry]):
+            export_profiles(get_output_path(industry, args.data_dir))
+        sys.exit(0)
+    
+    if args.query_report:
+        for industry in ([industry for industry, _ in batch] or [args.industry]):
+            scheduler = open_scheduler(industry, args.data_dir)
+            scheduler.print_report()
+            scheduler.close()
+        sys.exit(0)
+    
+    if args.max_qps <= 0:
+        print("[ERROR] --max_qps must be greater than 0.")
+        sys.exit(1)
+    
+    if args.metrics_interval < 0:
+        print("[ERROR] --metrics_interval cannot be negative.")
+        sys.exit(1)
+    
+    if args.concurrent and not args.use_multi_keys:
+        print("[ERROR] --concurrent requires --use_multi_keys")
+        sys.exit(1)
+    
+    # Per-key token buckets, starting at the pace implied by --delay
+    rate_limiter = RateLimiter(
+        initial_rate=(1.0 / args.delay) if args.delay > 0 else args.max_qps,
+        max_rate=args.max_qps
+    )
+    
+    if args.transport:
+        set_transport(args.transport)
+    
+    if args.api_endpoint:
+        set_api_endpoint(args.api_endpoint)
+    
+    # Per-key usage persisted across runs; resets at Pacific midnight like Google's quota
+    endpoint = get_api_endpoint()  # --api_endpoint or $CSE_API_ENDPOINT
+    if endpoint:
+        # Emulated requests must not count against (or be cached as) real ones, and their
+        # synthetic profiles must not reach the real CSVs, URL index or query stats
+        args.no_cache = True
+        ledger = QuotaLedger(":memory:")
+        if args.data_dir is None:
+            args.data_dir = tempfile.mkdtemp(prefix="cv_collector_emulated_")
+        print(f"[INFO] Sending search requests to {endpoint}; data goes to {args.data_dir}")
+    else:
+        args.data_dir = args.data_dir or DEFAULT_DATA_DIR
+        ledger = QuotaLedger(os.path.join(args.data_dir, ".quota_ledger.sqlite"))
+    args.metrics_dir = args.metrics_dir or args.data_dir
+    
     # Handle API key and CX selection
     using_multi_cx = False
     if args.use_multi_keys:
@@ -97,17 +357,26 @@ Use --overwrite flag to replace existing file instead.
         # Use paired CXs only if fully aligned by length
         if cxs and len(cxs) == len(api_keys):
             using_multi_cx = True
-            api_manager = APIManager(api_keys, cxs)
+            api_manager = APIManager(api_keys, cxs, rate_limiter=rate_limiter, ledger=ledger,
+                                     daily_quota=args.daily_quota)
             print(f"[INFO] Using {len(api_keys)} API key/CX pairs for rotation")
         else:
-            api_manager = APIManager(api_keys)
+            api_manager = APIManager(api_keys, rate_limiter=rate_limiter, ledger=ledger,
+                                     daily_quota=args.daily_quota)
             print(f"[INFO] Using {len(api_keys)} API keys for rotation (single CX mode)")
-        api_key = api_manager.get_current_key()
     else:
         if not args.api_key:
             print("[ERROR] --api_key is required or use --use_multi_keys")
             sys.exit(1)
         api_key = args.api_key
+        # Single-key manager: no rotation, but the key still gets adaptive pacing
+        api_manager = APIManager([api_key], rate_limiter=rate_limiter, ledger=ledger,
+                                 daily_quota=args.daily_quota)
+    
+    remaining = sum(api_manager.get_remaining(i) for i in range(len(api_manager.api_keys)))
+    if remaining == 0:
+        print("[ERROR] All API keys have already used their daily quota. Try again after midnight Pacific time.")
+        sys.exit(1)
 
     # Validate CX presence when not using multi-CX
     if not using_multi_cx and not args.cx:
@@ -118,81 +387,297 @@ Use --overwrite flag to replace existing file instead.
     print("=" * 60)
     print("🚀 CV Collector CLI")
     print("=" * 60)
-    print(f"Industry: {args.industry}")
-    print(f"Target Count: {args.count}")
+    if args.batch_file:
+        print(f"Batch: {len(batch)} industries, {sum(c for _, c in batch)} profiles in total")
+    else:
+        print(f"Industry: {args.industry}")
+        print(f"Target Count: {args.count}")
     print(f"API Delay: {args.delay}s")
+    print(f"Quota left today: {remaining} requests across {len(api_manager.api_keys)} key(s)")
     print("=" * 60)
     print()
     
+    cache = None if args.no_cache else SearchCache(os.path.join(args.data_dir, ".search_cache.sqlite"),
+                                                       ttl_hours=args.cache_ttl, max_entries=args.cache_max_entries)
+    schedulers: dict[str, QueryScheduler] = {}
+    
+    # Canonical URLs saved for any industry, so quota is not spent on profiles we already have
+    url_index = GlobalURLIndex(os.path.join(args.data_dir, ".global_urls.idx"), base_dir=args.data_dir)
+    if args.rebuild_url_index:
+        url_index.rebuild()
+    print(f"[INFO] Loaded {len(url_index)} known profile URLs to skip duplicates during search.")
+    
+    exporter = None
+    if not args.no_metrics:
+        targets = dict(batch) if args.batch_file else {args.industry: args.count}
+        exporter = MetricsExporter(args.metrics_dir, interval=args.metrics_interval,
+                                   run_info={'targets': targets, 'keys': len(api_manager.api_keys),
+                                             'concurrent': args.concurrent}).start()
+    
     try:
-        # Prepare existing URLs to avoid wasting quota on duplicates across runs
-        output_path = get_output_path(args.industry)
-        existing_urls: set[str] = set()
-        try:
-            if os.path.exists(output_path):
-                df_existing = pd.read_csv(output_path, encoding='utf-8-sig')
-                if 'URL' in df_existing.columns:
-                    existing_urls = set(df_existing['URL'].dropna().astype(str).tolist())
-                    if existing_urls:
-                        print(f"[INFO] Loaded {len(existing_urls)} existing URLs to skip duplicates during search.")
-        except Exception as e:
-            print(f"[WARNING] Could not load existing URLs from CSV: {e}")
-
-        # Step 1: Search for profiles using Google API
-        print(f"[STEP 1/3] Searching profiles for '{args.industry}'...")
-        api_manager_to_pass = api_manager if args.use_multi_keys else None
-        results = search_profiles(
-            industry=args.industry,
-            count=args.count,
-            api_key=api_key,
-            cx=(api_manager.get_current_cx() if using_multi_cx else args.cx),
-            delay=args.delay,
-            api_manager=api_manager_to_pass,
-            existing_urls=existing_urls
-        )
-        
-        if not results:
-            print("[ERROR] No results found or search failed.")
-            sys.exit(1)
-        
-        print(f"[INFO] Found {len(results)} search results.")
-        print()
-        
-        # Step 2: Parse results
-        print(f"[STEP 2/3] Parsing profile information...")
-        profiles = []
-        
-        for item in tqdm(results, desc="Parsing profiles", unit="profile"):
-            try:
-                profile = parse_profile(item)
-                profiles.append(profile)
-            except Exception as e:
-                print(f"[WARNING] Failed to parse profile: {e}")
-                continue
-        
-        print(f"[INFO] Successfully parsed {len(profiles)} profiles.")
-        print()
-        
-        # Step 3: Save to CSV
-        print(f"[STEP 3/3] Saving to CSV...")
-        # output_path already resolved above
-        append_mode = not args.overwrite  # Default to append (not overwrite)
-        save_to_csv(profiles, output_path, append=append_mode)
+        if args.batch_file:
+            run_batch(batch, args, api_manager, cache, schedulers, url_index)
+        else:
+            output_path = get_output_path(args.industry, args.data_dir)
+            checkpoint = open_checkpoint(args.industry, args.count, args.resume, args.data_dir)
+            count = checkpoint.target - checkpoint.saved
+            if args.scheduler == 'bandit':
+                schedulers[args.industry] = open_scheduler(args.industry, args.data_dir)
+            saved = collect_industry(args.industry, count, args, api_manager, cache,
+                                     schedulers.get(args.industry), url_index, overwrite=args.overwrite,
+                                     checkpoint=checkpoint)
+            if not saved:
+                print("[ERROR] No results found or search failed.")
+                sys.exit(1)
+            
+            print()
+            print("=" * 60)
+            print("✅ Collection completed successfully!")
+            print(f"📁 Output file: {output_path}")
+            print("=" * 60)
         
-        print()
-        print("=" * 60)
-        print("✅ Collection completed successfully!")
-        print(f"📁 Output file: {output_path}")
-        print("=" * 60)
+        if args.parquet:
+            for industry in ([industry for industry, _ in batch] or [args.industry]):
+                export_profiles(get_output_path(industry, args.data_dir))
         
     except KeyboardInterrupt:
-        print("\n[INFO] Interrupted by user.")
+        print("\n[INFO] Interrupted by user. Profiles collected so far have been saved; continue with --resume.")
         sys.exit(0)
     except Exception as e:
         print(f"\n[ERROR] An error occurred: {e}")
         import traceback
         traceback.print_exc()
         sys.exit(1)
+    finally:
+        if exporter is not None:
+            exporter.stop()
+            print(f"[INFO] Run metrics written to {exporter.json_path} and {exporter.prom_path}")
+        ledger.close()
+        for scheduler in schedulers.values():
+            scheduler.close()
+        if cache is not None:
+            cache.report()
+            cache.close()
+
+
+def open_scheduler(industry, data_dir):
+    """
+    Open the bandit query scheduler of an industry, with its stats kept in data_dir.
+    
+    Args:
+        industry: Industry name
+        data_dir: Data directory of the run
+        
+    Returns:
+        QueryScheduler
+    """
+    return QueryScheduler(industry, generate_query_variations(industry),
+                          path=os.path.join(data_dir, ".query_stats.sqlite"))
+
+
+def open_checkpoint(industry, count, resume, data_dir=DEFAULT_DATA_DIR):
+    """
+    Create the checkpoint of an industry, loading the previous one when resuming.
+    
+    Args:
+        industry: Industry name
+        count: Target count for a fresh collection
+        resume: Whether to continue from an existing checkpoint
+        data_dir: Data directory of the run
+        
+    Returns:
+        SearchCheckpoint whose target and saved counts describe the collection
+    """
+    checkpoint = SearchCheckpoint(industry, checkpoint_path(industry, data_dir))
+    if resume and checkpoint.load():
+        print(f"[INFO] Resuming '{industry}': {checkpoint.saved}/{checkpoint.target} profiles saved, "
+              f"{len(checkpoint.pending)} unsaved profiles recovered.")
+    else:
+        if resume:
+            print(f"[INFO] No checkpoint found for '{industry}'. Starting a new collection.")
+        checkpoint.target = count
+    return checkpoint
+
+
+def load_batch_file(filepath, default_count):
+    """
+    Load industries and per-industry target counts for batch mode.
+    
+    Expected format (one industry per line, count optional):
+        Data Engineer,200
+        Frontend Developer,50
+        # comments and empty lines are ignored
+        
+    Args:
+        filepath: Path to the batch file
+        default_count: Count used for lines without one
+        
+    Returns:
+        List of (industry, count) tuples in file order
+    """
+    batch = []
+    with open(filepath, 'r', encoding='utf-8') as f:
+        for line_no, raw in enumerate(f, 1):
+            line = raw.strip()
+            if not line or line.startswith('#'):
+                continue
+            industry, _, count_str = line.partition(',')
+            industry = industry.strip()
+            try:
+                count = int(count_str) if count_str.strip() else default_count
+            except ValueError:
+                print(f"[WARNING] Invalid count on line {line_no} of {filepath}: {line!r}. Skipping.")
+                continue
+            if industry and count > 0:
+                batch.append((industry, count))
+    return batch
+
+
+def collect_industry(industry, count, args, api_manager, cache, scheduler, url_index, overwrite=False,
+                     checkpoint=None):
+    """
+    Search, parse and save up to `count` new profiles for one industry.
+    
+    The stages stream: each result page is parsed and handed to the CSV writer as soon
+    as it arrives, and the writer flushes in bounded batches, so a crash or Ctrl-C
+    keeps everything collected so far. With a checkpoint, rows recovered from an
+    interrupted run are written first, the search continues from the saved position and
+    the checkpoint is saved after every page; it is deleted once the industry's target
+    is reached or every query page has been tried.
+    
+    Args:
+        industry: Industry keyword
+        count: Number of new profiles to collect
+        args: Parsed CLI arguments (delay, cx, concurrent, flush_every, data_dir)
+        api_manager: Shared APIManager
+        cache: Optional SearchCache
+        scheduler: Optional QueryScheduler for this industry
+        url_index: GlobalURLIndex of profiles to skip; the writer adds the saved URLs
+        overwrite: Replace profiles.csv instead of appending
+        checkpoint: Optional SearchCheckpoint of this industry
+        
+    Returns:
+        Number of profiles saved
+    """
+    output_path = get_output_path(industry, args.data_dir)
+    recovered = checkpoint.pending if checkpoint is not None else []
+    total = count
+    # Recovered rows count towards the target
+    count = max(count - len(recovered), 0)
+    
+    # Stage 1: Search for profiles using Google API, page by page
+    print(f"[INFO] Searching, parsing and saving profiles for '{industry}'...")
+    if args.concurrent:
+        pages = iter_search_pages_concurrent(
+            industry=industry,
+            count=count,
+            api_manager=api_manager,
+            cx=args.cx,
+            delay=args.delay,
+            existing_urls=url_index,
+            cache=cache,
+            scheduler=scheduler,
+            checkpoint=checkpoint
+        )
+    else:
+        pages = iter_search_pages(
+            industry=industry,
+            count=count,
+            api_key=api_manager.get_current_key(),
+            cx=(api_manager.get_current_cx() or args.cx),
+            delay=args.delay,
+            api_manager=api_manager,
+            existing_urls=url_index,
+            cache=cache,
+            scheduler=scheduler,
+            checkpoint=checkpoint
+        )
+    
+    append_mode = not overwrite  # Default to append (not overwrite)
+    writer = CSVStreamWriter(output_path, append=append_mode, batch_size=args.flush_every,
+                             global_index=url_index)
+    try:
+        with writer, tqdm(total=total, desc="Collecting profiles", unit="profile") as progress:
+            if recovered:
+                # Rows parsed before the interruption but never written
+                writer.write(recovered)
+                writer.flush()
+                progress.update(len(recovered))
+            for page in (pages if count else ()):
+                # Stage 2: Parse this page
+                parse_started = time.perf_counter()
+                profiles = parse_profiles(page)
+                get_metrics().observe('parse_seconds', time.perf_counter() - parse_started)
+                # Stage 3: Hand to the writer (flushes in bounded batches)
+                writer.write(profiles)
+                progress.update(len(page))
+                if checkpoint is not None:
+                    checkpoint.save(pending=writer.pending)
+    finally:
+        # The writer has flushed by now, so nothing is pending any more
+        if checkpoint is not None:
+            checkpoint.saved += writer.rows_written
+            if checkpoint.saved >= checkpoint.target or checkpoint.finished:
+                checkpoint.clear()
+            else:
+                checkpoint.save(pending=[])
+    
+    return writer.rows_written
+
+
+def run_batch(batch, args, api_manager, cache, schedulers, url_index):
+    """
+    Collect several industries in one process with a shared key pool and dedup state.
+    
+    Industries are interleaved round-robin, at most --batch_round profiles each per round,
+    so the day's quota is spread across the whole batch instead of being spent on the
+    first entries. An industry drops out once it reaches its target or a round finds
+    nothing new; the batch stops when every key is out of quota.
+    
+    Args:
+        batch: List of (industry, count) tuples
+        args: Parsed CLI arguments
+        api_manager: Shared APIManager
+        cache: Optional SearchCache
+        schedulers: Dict filled with one QueryScheduler per industry (bandit mode)
+        url_index: GlobalURLIndex shared by every industry, so a profile saved
+            for one industry is not collected again for another
+    """
+    checkpoints = {industry: open_checkpoint(industry, count, args.resume, args.data_dir)
+                   for industry, count in batch}
+    remaining = {industry: cp.target - cp.saved for industry, cp in checkpoints.items() if cp.target > cp.saved}
+    collected = {industry: cp.saved for industry, cp in checkpoints.items()}
+    overwritten: set[str] = set()
+    
+    round_no = 0
+    while remaining:
+        round_no += 1
+        print(f"[INFO] Batch round {round_no}: {len(remaining)} industries pending")
+        for industry in list(remaining):
+            if not api_manager.get_healthy_indices():
+                print("[WARNING] All API keys are out of quota. Stopping batch.")
+                remaining.clear()
+                break
+            if args.scheduler == 'bandit' and industry not in schedulers:
+                schedulers[industry] = open_scheduler(industry, args.data_dir)
+            
+            target = min(remaining[industry], args.batch_round)
+            overwrite = args.overwrite and industry not in overwritten
+            saved = collect_industry(industry, target, args, api_manager, cache,
+                                     schedulers.get(industry), url_index, overwrite=overwrite,
+                                     checkpoint=checkpoints[industry])
+            overwritten.add(industry)
+            collected[industry] += saved
+            remaining[industry] -= saved
+            if remaining[industry] <= 0 or saved == 0 or checkpoints[industry].finished:
+                del remaining[industry]
+            print()
+    
+    print("=" * 60)
+    print("✅ Batch collection completed!")
+    for industry, _ in batch:
+        print(f"  - {industry}: {collected[industry]}/{checkpoints[industry].target} → {get_output_path(industry, args.data_dir)}")
+    print("=" * 60)
 
 
 if __name__ == '__main__':
@@ -0,0 +1,31 @@
+"""Skill matcher checks on known tricky texts."""
+import pytest
+
+from utils.skill_matcher import get_skill_matcher
+
+
+# One- and two-letter skills (R, C, Go) only match with context: R&D, Series C, Plan C
+# and Go-live yield nothing, while "Python, R" and "ngôn ngữ R" do.
+# Text -> expected skills, in order of first mention
+CASES = [
+    ("Head of R&D at a Series C fintech", ["Fintech"]),
+    ("Plan C: hire a QA lead", ["QA"]),
+    ("Vitamin C, Type C charger, USB-C", []),
+    ("C-level executive", []),
+    ("Go-live support for ERP", ["ERP"]),
+    ("Go ahead and apply", []),
+    ("Experience: R", []),
+    ("Python, R, SQL", ["Python", "R", "SQL"]),
+    ("Dùng Python và R để phân tích dữ liệu", ["Python", "R", "Analytics"]),
+    ("ngôn ngữ lập trình R", ["R"]),
+    ("R programming for statistics", ["R", "Statistics"]),
+    ("C/C++ embedded developer", ["C", "C++"]),
+    ("Go developer", ["Go"]),
+    ("Skills: Go, Docker, Kubernetes", ["Go", "Docker", "Kubernetes"]),
+    ("Q&A lead, AI and ML", ["AI", "Machine Learning"]),
+]
+
+
+@pytest.mark.parametrize("text, expected", CASES)
+def test_find(text, expected):
+    assert get_skill_matcher().find(text) == expected
@@ -0,0 +1,135 @@
+"""Resumable per-industry search checkpoints."""
+import json
+import os
+import threading
+import time
+from typing import Dict, List, Optional
+
+
+CHECKPOINT_VERSION = 1
+
+
+def checkpoint_path(industry: str, base_dir: str = "data_collected") -> str:
+    """
+    Get the checkpoint file path for an industry (next to its profiles.csv).
+
+    Args:
+        industry: Industry name
+        base_dir: Directory holding the industry folders
+
+    Returns:
+        Path to the checkpoint JSON file
+    """
+    return os.path.join(base_dir, industry, ".checkpoint.json")
+
+
+class SearchCheckpoint:
+    """
+    Search position and unsaved rows of one industry, persisted as a small JSON file.
+
+    The search generators keep the position up to date (query order, current query
+    and page, pages already fetched, queries without deeper pages); the collector
+    saves it together with the parsed rows still buffered by the CSV writer after
+    every result page. URLs already written are not stored: the global URL index
+    skips them on resume.
+    """
+
+    def __init__(self, industry: str, path: Optional[str] = None):
+        """
+        Args:
+            industry: Industry name
+            path: Checkpoint file path (defaults to checkpoint_path(industry))
+        """
+        self.industry = industry
+        self.path = path or checkpoint_path(industry)
+        self.target = 0  # Profiles wanted for the industry over the whole (resumed) collection
+        self.saved = 0  # Profiles written so far towards `target`
+        self.position: Dict = {}
+        self.pending: List[Dict[str, str]] = []
+        self.finished = False  # Set by the search when every query page has been tried
+        self._lock = threading.Lock()
+
+    def load(self) -> bool:
+        """
+        Load the checkpoint file if there is one.
+
+        Returns:
+            True if a usable checkpoint was loaded
+        """
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return False
+        except (OSError, ValueError) as e:
+            print(f"[WARNING] Ignoring unreadable checkpoint {self.path}: {e}")
+            return False
+        if data.get("version") != CHECKPOINT_VERSION or data.get("industry") != self.industry:
+            print(f"[WARNING] Ignoring checkpoint {self.path} written for another version or industry.")
+            return False
+        with self._lock:
+            self.target = data.get("target", 0)
+            self.saved = data.get("saved", 0)
+            self.position = data.get("position", {})
+            self.pending = data.get("pending", [])
+        return True
+
+    def get(self, field: str, default=None):
+        """Get a position field."""
+        with self._lock:
+            return self.position.get(field, default)
+
+    def update(self, **fields) -> None:
+        """Set position fields (called by the search, possibly from worker threads)."""
+        with self._lock:
+            self.position.update(fields)
+
+    def add_fetched(self, query: str, start: int) -> None:
+        """Record a result page that was fetched and processed."""
+        with self._lock:
+            self.position.setdefault("fetched", []).append([query, start])
+
+    def get_fetched(self) -> set:
+        """Get the fetched (query, start) pages as a set of tuples."""
+        with self._lock:
+            return {(query, start) for query, start in self.position.get("fetched", [])}
+
+    def save(self, pending: Optional[List[Dict[str, str]]] = None) -> None:
+        """
+        Write the checkpoint atomically (temp file + rename).
+
+        Args:
+            pending: Parsed rows not yet written to the CSV
+        """
+        with self._lock:
+            if pending is not None:
+                self.pending = list(pending)
+            data = {
+                "version": CHECKPOINT_VERSION,
+                "industry": self.industry,
+                "target": self.target,
+                "saved": self.saved,
+                "updated_at": time.time(),
+                "position": self.position,
+                "pending": self.pending,
+            }
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            tmp_path = self.path + ".tmp"
+            try:
+                with open(tmp_path, 'w', encoding='utf-8') as f:
+                    json.dump(data, f, ensure_ascii=False)
+                os.replace(tmp_path, self.path)
+            except OSError as e:
+                print(f"[WARNING] Could not save checkpoint {self.path}: {e}")
+
+    def clear(self) -> None:
+        """Delete the checkpoint file once the industry's collection is complete."""
+        with self._lock:
+            self.position = {}
+            self.pending = []
+            try:
+                os.remove(self.path)
+            except FileNotFoundError:
+                pass
@@ -0,0 +1,172 @@
+"""Direct REST client for the Custom Search JSON API (customsearch/v1) over pooled requests sessions."""
+import json
+import os
+import random
+import time
+
+import requests
+from googleapiclient.errors import HttpError
+from requests.adapters import HTTPAdapter
+
+
+DEFAULT_ENDPOINT = "https://customsearch.googleapis.com/"
+SEARCH_PATH = "customsearch/v1"
+# Partial response: only the result fields the parser reads (drops htmlTitle, pagemap, queries, ...)
+DEFAULT_FIELDS = "items(title,link,snippet)"
+# Google only gzips responses for user agents that mention gzip
+USER_AGENT = "cv-collector (gzip)"
+TIMEOUT = (10, 60)  # Connect, read (seconds)
+POOL_SIZE = 4
+
+
+def create_session(endpoint=None, pool_size=POOL_SIZE):
+    """
+    Create a keep-alive session for Custom Search requests to one endpoint.
+
+    Proxy and CA bundle settings are read from the environment once, here:
+    requests would otherwise re-scan os.environ on every request. Sessions are
+    not guaranteed thread-safe; use one per thread (see search_google.ServicePool).
+
+    Args:
+        endpoint: Base URL the session will talk to (default: Google's)
+        pool_size: Connections kept open per host
+
+    Returns:
+        requests.Session asking for gzip-compressed JSON
+    """
+    session = requests.Session()
+    # Retries are done by RestSearchRequest.execute(), with the API client's policy
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'Accept': 'application/json', 'Accept-Encoding': 'gzip', 'User-Agent': USER_AGENT})
+    session.proxies.update(requests.utils.get_environ_proxies(endpoint or DEFAULT_ENDPOINT))
+    session.verify = os.environ.get('REQUESTS_CA_BUNDLE') or os.environ.get('CURL_CA_BUNDLE') or True
+    session.trust_env = False
+    return session
+
+
+class _ErrorResponse(dict):
+    """Headers (lower-case names) with status and reason, as HttpError expects of an httplib2 response."""
+
+    def __init__(self, response):
+        super().__init__((name.lower(), value) for name, value in response.headers.items())
+        self.status = response.status_code
+        self.reason = response.reason
+
+
+def should_retry(status, content):
+    """
+    Whether a response is retried, with googleapiclient's policy: 5xx, 429, and
+    403 only for rateLimitExceeded / userRateLimitExceeded.
+
+    Args:
+        status: HTTP status
+        content: Response body bytes
+
+    Returns:
+        True to retry
+    """
+    if status >= 500 or status == 429:
+        return True
+    if status != 403 or not content:
+        return False
+    try:
+        errors = json.loads(content.decode('utf-8'))['error'].get('errors') or [{}]
+        reason = errors[0].get('reason')
+    except (UnicodeDecodeError, ValueError, KeyError, TypeError, AttributeError):
+        return False
+    return reason in ('userRateLimitExceeded', 'rateLimitExceeded')
+
+
+class RestSearchRequest:
+    """One cse.list request, executed like a googleapiclient HttpRequest."""
+
+    def __init__(self, session, url, params, timeout=TIMEOUT):
+        """
+        Args:
+            session: requests.Session to send it with
+            url: Full customsearch/v1 URL
+            params: Query string parameters (including the key)
+            timeout: requests timeout
+        """
+        self.session = session
+        self.url = url
+        self.params = params
+        self.timeout = timeout
+
+    def execute(self, num_retries=0):
+        """
+        Send the request, retrying connection errors and retryable statuses
+        (see should_retry) with the API client's randomized exponential backoff.
+
+        Args:
+            num_retries: Retries after the first attempt
+
+        Returns:
+            Parsed JSON response
+
+        Raises:
+            HttpError: For HTTP error statuses (googleapiclient's class, so
+                classify_http_error and get_retry_after work unchanged)
+            requests.RequestException: Connection errors after the last retry
+        """
+        response = None
+        for retry_num in range(num_retries + 1):
+            if retry_num > 0:
+                time.sleep(random.random() * 2 ** retry_num)
+            try:
+                response = self.session.get(self.url, params=self.params, timeout=self.timeout)
+            except (requests.ConnectionError, requests.Timeout):
+                if retry_num == num_retries:
+                    raise
+                continue
+            if not should_retry(response.status_code, response.content):
+                break
+        if response.status_code >= 300:
+            # The URI is reported without the query string, so the key never ends up in logs
+            raise HttpError(_ErrorResponse(response), response.content, uri=self.url)
+        return response.json()
+
+
+class RestCustomSearch:
+    """
+    Custom Search service object on top of a requests.Session, with the
+    interface the search code uses: service.cse().list(...).execute(num_retries=...).
+
+    Requests ask for a partial response (`fields`), compact JSON and gzip.
+    """
+
+    def __init__(self, api_key, session=None, endpoint=None, fields=DEFAULT_FIELDS, timeout=TIMEOUT):
+        """
+        Args:
+            api_key: Google API key
+            session: requests.Session (default: a new one from create_session(endpoint))
+            endpoint: Base URL (default: Google's)
+            fields: Partial response selector, or None for the full response
+            timeout: requests timeout
+        """
+        self.api_key = api_key
+        self.session = session or create_session(endpoint)
+        self.url = (endpoint or DEFAULT_ENDPOINT).rstrip('/') + '/' + SEARCH_PATH
+        self.fields = fields
+        self.timeout = timeout
+
+    def cse(self):
+        return self
+
+    def list(self, **params):
+        """
+        Build a search request.
+
+        Args:
+            **params: cse.list parameters (q, cx, start, num, ...)
+
+        Returns:
+            RestSearchRequest
+        """
+        query = {'key': self.api_key, 'alt': 'json', 'prettyPrint': 'false'}
+        if self.fields:
+            query['fields'] = self.fields
+        query.update((name, value) for name, value in params.items() if value is not None)
+        return RestSearchRequest(self.session, self.url, query, timeout=self.timeout)
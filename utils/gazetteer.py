@@ -0,0 +1,70 @@
+"""Rule-based organisation recognizer built from university and company name lists."""
+import hashlib
+import os
+from typing import List, Sequence
+
+
+GAZETTEER_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gazetteer")
+DEFAULT_GAZETTEER_FILES = [
+    os.path.join(GAZETTEER_DIR, "universities.txt"),
+    os.path.join(GAZETTEER_DIR, "companies.txt"),
+]
+
+
+def load_terms(path: str) -> List[str]:
+    """
+    Load names from a gazetteer file (one per line, '#' comments and blank lines ignored).
+
+    Args:
+        path: Text file path
+
+    Returns:
+        Names in file order, without duplicates
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        terms = [line.strip() for line in f]
+    return list(dict.fromkeys(t for t in terms if t and not t.startswith('#')))
+
+
+def gazetteer_fingerprint(paths: Sequence[str] = DEFAULT_GAZETTEER_FILES) -> str:
+    """
+    Hash the gazetteer files, so cached results are dropped when the lists change.
+
+    Args:
+        paths: Gazetteer file paths
+
+    Returns:
+        First 8 hex chars of the combined SHA-256
+    """
+    digest = hashlib.sha256()
+    for path in paths:
+        with open(path, 'rb') as f:
+            digest.update(f.read())
+    return digest.hexdigest()[:8]
+
+
+def build_gazetteer_nlp(paths: Sequence[str] = DEFAULT_GAZETTEER_FILES, lang: str = "en"):
+    """
+    Build a spaCy pipeline whose only component tags gazetteer names as ORG entities.
+
+    It uses a blank tokenizer (no statistical model) and an EntityRuler, which
+    compiles all names into a single PhraseMatcher on lowercased tokens. Overlapping
+    matches resolve to the longest name, so docs look like the statistical
+    pipeline's and doc.ents can be used the same way.
+
+    Args:
+        paths: Gazetteer file paths
+        lang: Language of the blank tokenizer
+
+    Returns:
+        spaCy Language object
+    """
+    import spacy
+
+    nlp = spacy.blank(lang)
+    ruler = nlp.add_pipe("entity_ruler", config={"phrase_matcher_attr": "LOWER"})
+    patterns = []
+    for path in paths:
+        patterns.extend({"label": "ORG", "pattern": term} for term in load_terms(path))
+    ruler.add_patterns(patterns)
+    return nlp
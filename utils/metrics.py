@@ -0,0 +1,253 @@
+"""Run metrics (counters, gauges, histograms) exported as JSON and Prometheus textfiles."""
+import bisect
+import json
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+PREFIX = "cv_collector_"
+JSON_FILE = "run_metrics.json"
+PROM_FILE = "cv_collector.prom"
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+PAGE_YIELD_BUCKETS = (0, 1, 2, 3, 5, 7, 10)
+
+# name -> (type, help, histogram buckets)
+METRICS = {
+    'run_start_timestamp_seconds': ('gauge', 'Unix time the run started', None),
+    'run_duration_seconds': ('gauge', 'Seconds since the run started, at the last flush', None),
+    'run_completed': ('gauge', '1 once the run has finished, 0 in periodic flushes', None),
+    'search_requests_total': ('counter', 'Custom Search requests by key and outcome '
+                              '(ok, cache_hit, rate_limit, daily_limit, bad_cx, http_error, network_error)', None),
+    'search_request_seconds': ('histogram', 'Time in flight of Custom Search requests (including retries inside the API client), by key', LATENCY_BUCKETS),
+    'search_wait_seconds_total': ('counter', 'Seconds the search slept, by reason (rate_limiter, delay, backoff)',
+                                  None),
+    'search_pages_total': ('counter', 'Result pages processed, by query variation', None),
+    'search_new_profiles_total': ('counter', 'New profiles found, by query variation', None),
+    'search_page_new_profiles': ('histogram', 'New profiles per result page', PAGE_YIELD_BUCKETS),
+    'parse_seconds': ('histogram', 'Time to parse one page of results', LATENCY_BUCKETS),
+    'api_key_usage': ('gauge', "Requests charged to each key today, including other runs", None),
+    'api_key_remaining': ('gauge', 'Requests left today for each key', None),
+    'api_key_rotations_total': ('counter', 'Switches to another API key', None),
+    'api_key_disabled_total': ('counter', 'Keys taken out of rotation, by key and reason', None),
+    'csv_write_seconds': ('histogram', 'Time to write a batch of profiles to CSV, by industry', LATENCY_BUCKETS),
+    'csv_rows_written_total': ('counter', 'Profiles written to CSV, by industry', None),
+    'csv_duplicates_skipped_total': ('counter', 'Profiles not written because their URL was already in the file, '
+                                     'by industry', None),
+}
+
+
+def key_label(index: Optional[int]) -> str:
+    """Label of an API key: its 1-based position (never the key itself)."""
+    return str(index + 1) if index is not None else "-"
+
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+def _write_atomic(path: str, text: str) -> None:
+    """Write a file via a temp file + rename (the textfile collector must never see a partial file)."""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    tmp_path = path + ".tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(tmp_path, path)
+
+
+class MetricsRegistry:
+    """
+    Thread-safe store of the METRICS, each with any number of label sets.
+
+    Recording is a dict update under a lock, so instrumented code always records;
+    nothing is written to disk unless an exporter is started.
+    """
+
+    def __init__(self):
+        self._values: Dict[str, Dict[tuple, float]] = {}
+        self._histograms: Dict[str, Dict[tuple, list]] = {}
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _labels(labels: Dict[str, object]) -> tuple:
+        return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+    def inc(self, name: str, amount: float = 1, **labels) -> None:
+        """Add to a counter."""
+        key = self._labels(labels)
+        with self._lock:
+            series = self._values.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def set(self, name: str, value: float, **labels) -> None:
+        """Set a gauge."""
+        key = self._labels(labels)
+        with self._lock:
+            self._values.setdefault(name, {})[key] = value
+
+    def observe(self, name: str, value: float, **labels) -> None:
+        """Record one observation in a histogram."""
+        buckets = METRICS[name][2]
+        key = self._labels(labels)
+        with self._lock:
+            series = self._histograms.setdefault(name, {})
+            state = series.get(key)
+            if state is None:
+                state = series[key] = [[0] * (len(buckets) + 1), 0.0, 0]
+            state[0][bisect.bisect_left(buckets, value)] += 1
+            state[1] += value
+            state[2] += 1
+
+    def get(self, name: str, **labels) -> float:
+        """Current value of a counter or gauge (0 if never recorded)."""
+        with self._lock:
+            return self._values.get(name, {}).get(self._labels(labels), 0)
+
+    def reset(self) -> None:
+        """Forget all recorded values."""
+        with self._lock:
+            self._values.clear()
+            self._histograms.clear()
+
+    def to_dict(self) -> Dict:
+        """
+        All recorded metrics as plain data.
+
+        Returns:
+            Dict mapping metric name (with PREFIX) to its type, help and samples;
+            histogram samples have cumulative bucket counts, sum and count
+        """
+        result = {}
+        with self._lock:
+            for name, (kind, help_text, buckets) in METRICS.items():
+                if kind == 'histogram':
+                    series = self._histograms.get(name)
+                    if not series:
+                        continue
+                    samples = []
+                    for labels, (counts, total, count) in sorted(series.items()):
+                        cumulative, running = {}, 0
+                        for bound, bucket_count in zip(list(buckets) + [float('inf')], counts):
+                            running += bucket_count
+                            cumulative['+Inf' if bound == float('inf') else str(bound)] = running
+                        samples.append({'labels': dict(labels), 'buckets': cumulative, 'sum': total, 'count': count})
+                else:
+                    series = self._values.get(name)
+                    if not series:
+                        continue
+                    samples = [{'labels': dict(labels), 'value': value} for labels, value in sorted(series.items())]
+                result[PREFIX + name] = {'type': kind, 'help': help_text, 'samples': samples}
+        return result
+
+    def to_prometheus(self) -> str:
+        """All recorded metrics in the Prometheus text exposition format."""
+        lines = []
+        for name, metric in self.to_dict().items():
+            lines.append(f"# HELP {name} {metric['help']}")
+            lines.append(f"# TYPE {name} {metric['type']}")
+            for sample in metric['samples']:
+                labels = tuple(sample['labels'].items())
+                if metric['type'] == 'histogram':
+                    for bound, count in sample['buckets'].items():
+                        lines.append(f"{name}_bucket{_format_labels(labels, ('le', bound))} {count}")
+                    lines.append(f"{name}_sum{_format_labels(labels)} {_format_value(sample['sum'])}")
+                    lines.append(f"{name}_count{_format_labels(labels)} {sample['count']}")
+                else:
+                    lines.append(f"{name}{_format_labels(labels)} {_format_value(sample['value'])}")
+        return '\n'.join(lines) + '\n'
+
+
+_registry = MetricsRegistry()
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Get the registry shared by the search, key rotation and CSV writer code.
+
+    Returns:
+        Shared MetricsRegistry
+    """
+    return _registry
+
+
+class MetricsExporter:
+    """
+    Writes a registry as JSON and as a Prometheus textfile-collector file, at the
+    end of the run and optionally every `interval` seconds while it runs.
+    """
+
+    def __init__(self, directory: str, registry: Optional[MetricsRegistry] = None, interval: float = 0,
+                 run_info: Optional[Dict] = None):
+        """
+        Args:
+            directory: Directory for run_metrics.json and cv_collector.prom (e.g. node_exporter's
+                --collector.textfile.directory)
+            registry: Registry to export (default: the shared one)
+            interval: Seconds between periodic flushes (0 = only at the end)
+            run_info: Extra details stored in the JSON file (industries, targets, ...)
+        """
+        self.registry = registry or get_metrics()
+        self.json_path = os.path.join(directory, JSON_FILE)
+        self.prom_path = os.path.join(directory, PROM_FILE)
+        self.interval = interval
+        self.run_info = run_info or {}
+        self.started_at = time.time()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> "MetricsExporter":
+        """Record the run start and begin periodic flushes (if an interval is set)."""
+        self.registry.set('run_start_timestamp_seconds', self.started_at)
+        self.registry.set('run_completed', 0)
+        if self.interval > 0:
+            self._thread = threading.Thread(target=self._run, name="metrics-flush", daemon=True)
+            self._thread.start()
+        return self
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def flush(self, completed: bool = False) -> None:
+        """
+        Write both files now.
+
+        Args:
+            completed: Mark the run as finished
+        """
+        now = time.time()
+        self.registry.set('run_duration_seconds', now - self.started_at)
+        if completed:
+            self.registry.set('run_completed', 1)
+        data = {'run': dict(self.run_info, started_at=self.started_at, written_at=now, completed=completed),
+                'metrics': self.registry.to_dict()}
+        try:
+            _write_atomic(self.json_path, json.dumps(data, ensure_ascii=False, indent=2))
+            _write_atomic(self.prom_path, self.registry.to_prometheus())
+        except OSError as e:
+            print(f"[WARNING] Could not write metrics to {os.path.dirname(self.json_path) or '.'}: {e}")
+
+    def stop(self) -> None:
+        """Stop periodic flushes and write the final metrics."""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+        self.flush(completed=True)
+
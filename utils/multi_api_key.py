@@ -1,35 +1,150 @@
 """Multi API key rotation to avoid rate limits."""
 import random
-from typing import List, Dict, Optional, Union
+import threading
+from typing import List, Dict, Optional, Tuple
+
+from utils.metrics import get_metrics, key_label
 
 
 class APIManager:
     """Manages multiple API keys (and optional CXs) for rotation."""
 
-    def __init__(self, api_keys: List[str], cxs: List[str] | None = None):
+    def __init__(self, api_keys: List[str], cxs: List[str] | None = None, rate_limiter=None,
+                 ledger=None, daily_quota: int = 100):
         """
         Initialize API Manager with multiple keys and optional CXs.
 
         Args:
             api_keys: List of API key strings
             cxs: Optional list of CX strings paired by index with api_keys
+            rate_limiter: Optional RateLimiter pacing each key by index
+            ledger: Optional QuotaLedger persisting daily usage across runs
+            daily_quota: Daily request quota per key
         """
         self.api_keys = api_keys
         self.cxs = cxs if cxs and len(cxs) == len(api_keys) else None
-        # Start at a random index to distribute usage across runs
-        self.current_index = random.randint(0, len(self.api_keys) - 1) if self.api_keys else 0
         self.key_usage = {key: 0 for key in api_keys}  # Track usage per key
-        self.daily_quota = 100  # Google Custom Search API daily quota per key
+        self.daily_quota = daily_quota  # Google Custom Search API daily quota per key
+        self.rate_limiter = rate_limiter
+        self.ledger = ledger
+        # Indices of key/CX pairs disabled for this run (bad CX, daily limit hit)
+        self.unhealthy: set[int] = set()
+        # Re-entrant lock so the manager can be shared by concurrent search workers
+        self._lock = threading.RLock()
+        self.refresh_usage()
+        # Start at the key with the most remaining quota (random among ties)
+        best_index = self._pick_best_index(healthy_only=False)
+        self.current_index = best_index if best_index is not None else 0
+        
+    def refresh_usage(self) -> None:
+        """Reload today's per-key usage from the ledger (includes other runs)."""
+        if self.ledger is None:
+            self._record_usage()
+            return
+        with self._lock:
+            for key in self.api_keys:
+                usage = self.ledger.get_usage(key)
+                self.key_usage[key] = self.daily_quota if usage["exhausted"] else usage["requests"]
+            self._record_usage()
+
+    def _record_usage(self, index: Optional[int] = None) -> None:
+        """Update the usage gauges of one key (default: all keys)."""
+        metrics = get_metrics()
+        with self._lock:
+            for i in (range(len(self.api_keys)) if index is None else [index]):
+                usage = self.key_usage[self.api_keys[i]]
+                metrics.set('api_key_usage', usage, key=key_label(i))
+                metrics.set('api_key_remaining', max(0, self.daily_quota - usage), key=key_label(i))
+
+    def get_remaining(self, index: int) -> int:
+        """
+        Get the remaining daily quota of a key.
+
+        Args:
+            index: Index of the key
+
+        Returns:
+            Remaining requests (never negative)
+        """
+        with self._lock:
+            return max(0, self.daily_quota - self.key_usage[self.api_keys[index]])
+
+    def _pick_best_index(self, exclude: Optional[int] = None, healthy_only: bool = True) -> Optional[int]:
+        """Index with the most remaining quota, random among ties (None if no candidate)."""
+        with self._lock:
+            candidates = [
+                i for i in range(len(self.api_keys))
+                if i != exclude and (not healthy_only or self.is_healthy(i))
+            ]
+            if not candidates:
+                return None
+            best = max(self.get_remaining(i) for i in candidates)
+            return random.choice([i for i in candidates if self.get_remaining(i) == best])
         
     def get_current_key(self) -> str:
         """Get the current API key."""
-        return self.api_keys[self.current_index]
+        with self._lock:
+            return self.api_keys[self.current_index]
     
     def get_current_cx(self) -> Optional[str]:
         """Get the current CX if provided."""
         if self.cxs is None:
             return None
-        return self.cxs[self.current_index]
+        with self._lock:
+            return self.cxs[self.current_index]
+
+    def get_pair(self, index: int) -> Tuple[str, Optional[str]]:
+        """
+        Get the API key and CX (if any) at a given index.
+
+        Args:
+            index: Index of the key/CX pair
+
+        Returns:
+            Tuple of (api_key, cx)
+        """
+        cx = self.cxs[index] if self.cxs is not None else None
+        return self.api_keys[index], cx
+
+    def is_healthy(self, index: int) -> bool:
+        """
+        Check whether a key/CX pair can still be used in this run.
+
+        Args:
+            index: Index of the key/CX pair
+
+        Returns:
+            True if the pair is not disabled and still has quota
+        """
+        with self._lock:
+            key = self.api_keys[index]
+            return index not in self.unhealthy and self.key_usage[key] < self.daily_quota
+
+    def get_healthy_indices(self) -> List[int]:
+        """
+        Get indices of all key/CX pairs that can still be used.
+
+        Returns:
+            List of indices, in file order
+        """
+        with self._lock:
+            return [i for i in range(len(self.api_keys)) if self.is_healthy(i)]
+
+    def mark_unhealthy(self, index: int, reason: str = "") -> None:
+        """
+        Disable a key/CX pair for the rest of this run.
+
+        Args:
+            index: Index of the key/CX pair
+            reason: Optional reason shown in the log
+        """
+        with self._lock:
+            if index in self.unhealthy:
+                return
+            self.unhealthy.add(index)
+            get_metrics().inc('api_key_disabled_total', key=key_label(index), reason=reason or "unknown")
+            suffix = f" ({reason})" if reason else ""
+            print(f"[WARNING] Disabled API key {index + 1}/{len(self.api_keys)}{suffix}")
     
     def rotate_key(self, forced: bool = False) -> bool:
         """
@@ -41,37 +156,61 @@ class APIManager:
         Returns:
             True if rotation was successful, False if no more valid keys available
         """
-        initial_index = self.current_index
-        
-        # Try rotating through all keys
-        for _ in range(len(self.api_keys)):
-            self.current_index = (self.current_index + 1) % len(self.api_keys)
-            current_key = self.api_keys[self.current_index]
+        with self._lock:
+            # Pick up usage recorded by parallel runs before choosing
+            self.refresh_usage()
             
-            # Check if the new key has available quota
-            if forced or self.key_usage[current_key] < self.daily_quota:
-                print(f"[INFO] Rotated to API key {self.current_index + 1}/{len(self.api_keys)}")
-                return True
-                
-            # If we've tried all keys and came back to start
-            if self.current_index == initial_index:
+            # Switch to the other key with the most remaining quota
+            next_index = self._pick_best_index(exclude=self.current_index, healthy_only=not forced)
+            if next_index is None:
                 print("[WARNING] All API keys have reached their daily quota")
                 return False
-                
-        return False
+            
+            self.current_index = next_index
+            get_metrics().inc('api_key_rotations_total')
+            print(f"[INFO] Rotated to API key {self.current_index + 1}/{len(self.api_keys)} "
+                  f"({self.get_remaining(self.current_index)} requests left today)")
+            return True
     
-    def increment_usage(self) -> bool:
+    def increment_usage(self, index: Optional[int] = None) -> bool:
         """
-        Increment usage counter for current key.
+        Increment usage counter for a key.
         
+        Args:
+            index: Index of the key to charge, defaults to the current key
+            
         Returns:
             True if key still has quota, False if quota exceeded
         """
-        current_key = self.api_keys[self.current_index]
-        self.key_usage[current_key] += 1
-        
-        # Return True if still within quota
-        return self.key_usage[current_key] < self.daily_quota
+        with self._lock:
+            if index is None:
+                index = self.current_index
+            key = self.api_keys[index]
+            if self.ledger is not None:
+                # Ledger total also counts requests made by parallel runs today
+                _, cx = self.get_pair(index)
+                self.key_usage[key] = self.ledger.record(key, cx)
+            else:
+                self.key_usage[key] += 1
+            self._record_usage(index)
+            
+            # Return True if still within quota
+            return self.key_usage[key] < self.daily_quota
+
+    def mark_exhausted(self, index: int) -> None:
+        """
+        Record that Google reported a key's daily limit as reached, for this and later runs.
+
+        Args:
+            index: Index of the key
+        """
+        with self._lock:
+            key, cx = self.get_pair(index)
+            self.key_usage[key] = self.daily_quota
+            if self.ledger is not None:
+                self.ledger.mark_exhausted(key, cx)
+            self._record_usage(index)
+            self.mark_unhealthy(index, "daily limit")
     
     def get_usage_stats(self) -> Dict[str, Dict[str, int]]:
         """
@@ -81,12 +220,13 @@ class APIManager:
             Dict containing usage stats and quota info for each key
         """
         stats = {}
-        for i, key in enumerate(self.api_keys):
-            stats[f"key_{i+1}"] = {
-                "usage": self.key_usage[key],
-                "remaining": self.daily_quota - self.key_usage[key],
-                "total_quota": self.daily_quota
-            }
+        with self._lock:
+            for i, key in enumerate(self.api_keys):
+                stats[f"key_{i+1}"] = {
+                    "usage": self.key_usage[key],
+                    "remaining": self.daily_quota - self.key_usage[key],
+                    "total_quota": self.daily_quota
+                }
         return stats
     
     @staticmethod
@@ -193,22 +333,14 @@ class APIManager:
                     except ValueError:
                         continue
 
-<<<<<<< HEAD
             # Validate and assemble lists
             if not key_by_index:
                 print("[WARNING] No valid API keys found in file")
                 return [], []
                 
             # Sort indices for consistent ordering
-=======
-            # Assemble lists in ascending index order
-            print(f"[DEBUG] key_by_index: {key_by_index}")
-            print(f"[DEBUG] cx_by_index: {cx_by_index}")
->>>>>>> 04cfcfb986b4578528d7e239e1358d72058e6c6b
             indices = sorted(key_by_index.keys())
-            print(f"[DEBUG] indices: {indices}")
             api_keys = [key_by_index[i] for i in indices]
-<<<<<<< HEAD
             
             # Only include CXs if we have them for all keys
             cxs = []
@@ -219,13 +351,6 @@ class APIManager:
                     print("[WARNING] Incomplete CX pairs found - some keys missing CX values")
                     cxs = []
                 
-=======
-            cxs = [cx_by_index[i] if i in cx_by_index else None for i in indices]
-            # Log nếu thiếu CX ở đâu đó
-            if None in cxs:
-                missing = [i for i, v in zip(indices, cxs) if v is None]
-                print(f"[WARNING] Missing CX for index: {missing}")
->>>>>>> 04cfcfb986b4578528d7e239e1358d72058e6c6b
             return api_keys, cxs
             
         except FileNotFoundError:
@@ -0,0 +1,222 @@
+"""Persistent cache of batch_cleaner extraction results and cleaned input files."""
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Iterable, Optional, Tuple
+
+
+def text_hash(text: str) -> str:
+    """
+    Hash an About text for cache lookups.
+
+    Args:
+        text: About text
+
+    Returns:
+        32-char hex digest
+    """
+    return hashlib.blake2b(text.encode('utf-8'), digest_size=16).hexdigest()
+
+
+def file_hash(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Hash a file's content in chunks.
+
+    Args:
+        path: File path
+        chunk_size: Bytes read at a time
+
+    Returns:
+        32-char hex digest
+    """
+    digest = hashlib.blake2b(digest_size=16)
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class ExtractionCache:
+    """
+    SQLite cache keyed on (About text hash, extractor version), plus the state of
+    each cleaned profiles.csv (mtime, size, content hash, extractor version and the
+    output it was cleaned into) so unchanged folders are skipped.
+    """
+
+    def __init__(self, path: str, version: str):
+        """
+        Open (or create) the cache.
+
+        Args:
+            path: SQLite file path
+            version: Extractor version (engine and logic version); results of other versions are ignored
+        """
+        self.path = path
+        self.version = version
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS results (
+                   text_hash TEXT NOT NULL,
+                   version TEXT NOT NULL,
+                   education TEXT,
+                   experience TEXT,
+                   PRIMARY KEY (text_hash, version)
+               )"""
+        )
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS files (
+                   path TEXT PRIMARY KEY,
+                   mtime REAL NOT NULL,
+                   size INTEGER NOT NULL,
+                   content_hash TEXT NOT NULL,
+                   version TEXT NOT NULL,
+                   cleaned_at REAL NOT NULL,
+                   output TEXT NOT NULL DEFAULT '',
+                   parquet INTEGER NOT NULL DEFAULT 0
+               )"""
+        )
+        # Caches created before the output columns existed: their file records never match an output
+        columns = {row[1] for row in self._conn.execute("PRAGMA table_info(files)")}
+        if 'output' not in columns:
+            self._conn.execute("ALTER TABLE files ADD COLUMN output TEXT NOT NULL DEFAULT ''")
+        if 'parquet' not in columns:
+            self._conn.execute("ALTER TABLE files ADD COLUMN parquet INTEGER NOT NULL DEFAULT 0")
+        self._conn.commit()
+
+    def get_many(self, hashes: Iterable[str]) -> Dict[str, Tuple[Optional[str], Optional[str]]]:
+        """
+        Look up cached results.
+
+        Args:
+            hashes: Text hashes
+
+        Returns:
+            Dict mapping each cached hash to (education, experience)
+        """
+        hashes = list(dict.fromkeys(hashes))
+        found = {}
+        with self._lock:
+            # Stay below SQLite's bound-parameter limit
+            for i in range(0, len(hashes), 500):
+                chunk = hashes[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT text_hash, education, experience FROM results "
+                    f"WHERE version=? AND text_hash IN ({','.join('?' * len(chunk))})",
+                    (self.version, *chunk)
+                ).fetchall()
+                found.update((h, (education, experience)) for h, education, experience in rows)
+            self.hits += len(found)
+            self.misses += len(hashes) - len(found)
+        return found
+
+    def put_many(self, results: Iterable[Tuple[str, Optional[str], Optional[str]]]) -> None:
+        """
+        Store results.
+
+        Args:
+            results: (text hash, education, experience) tuples
+        """
+        with self._lock:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?)",
+                ((h, self.version, education, experience) for h, education, experience in results)
+            )
+            self._conn.commit()
+
+    def _file_row(self, csv_path: str):
+        return self._conn.execute(
+            "SELECT mtime, size, content_hash, version, output, parquet FROM files WHERE path=?",
+            (os.path.abspath(csv_path),)
+        ).fetchone()
+
+    @staticmethod
+    def file_state(csv_path: str) -> Tuple[float, int, str]:
+        """
+        Snapshot a CSV before reading it, so rows appended while it is cleaned are picked up next run.
+
+        Args:
+            csv_path: Path to profiles.csv
+
+        Returns:
+            (mtime, size, content hash)
+        """
+        stat = os.stat(csv_path)
+        return stat.st_mtime, stat.st_size, file_hash(csv_path)
+
+    def file_unchanged(self, csv_path: str, output: str, parquet: bool = False) -> bool:
+        """
+        Check whether a CSV is unchanged since it was last cleaned into the same output
+        with this extractor version (engine and logic version).
+
+        The content hash is only computed when mtime or size differ.
+
+        Args:
+            csv_path: Path to profiles.csv
+            output: Output file name (e.g. cleaned_profiles.jsonl.gz), which encodes format and compression
+            parquet: Whether the Parquet copy is required too
+
+        Returns:
+            True if the file can be skipped
+        """
+        stat = os.stat(csv_path)
+        with self._lock:
+            row = self._file_row(csv_path)
+        if row is None or row[3] != self.version or row[4] != output or (parquet and not row[5]):
+            return False
+        mtime, size, content_hash, _, _, had_parquet = row
+        if mtime == stat.st_mtime and size == stat.st_size:
+            return True
+        if size != stat.st_size or file_hash(csv_path) != content_hash:
+            return False
+        # Touched but not modified: remember the new mtime to skip hashing next time
+        self.record_file(csv_path, (stat.st_mtime, stat.st_size, content_hash), output, bool(had_parquet))
+        return True
+
+    def file_version(self, csv_path: str) -> Optional[str]:
+        """
+        Get the extractor version a CSV was last cleaned with.
+
+        Args:
+            csv_path: Path to profiles.csv
+
+        Returns:
+            Version, or None if the file was never cleaned
+        """
+        with self._lock:
+            row = self._file_row(csv_path)
+        return row[3] if row else None
+
+    def record_file(self, csv_path: str, state: Tuple[float, int, str], output: str,
+                    parquet: bool = False) -> None:
+        """
+        Record that a CSV was cleaned into an output with the current extractor version.
+
+        Args:
+            csv_path: Path to profiles.csv
+            state: file_state() snapshot taken before the CSV was read
+            output: Output file name written (e.g. cleaned_profiles.json)
+            parquet: Whether the Parquet copy was written too
+        """
+        mtime, size, content_hash = state
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (os.path.abspath(csv_path), mtime, size, content_hash, self.version, time.time(),
+                 output, int(parquet))
+            )
+            self._conn.commit()
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,208 @@
+"""Parquet copies of collected and cleaned profiles, one file per industry folder."""
+import glob
+import os
+from typing import Iterable, List, Optional
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.dataset as ds
+import pyarrow.parquet as pq
+
+
+PROFILES_FILE = "profiles.parquet"
+CLEANED_FILE = "cleaned_profiles.parquet"
+
+# Low-cardinality text, stored dictionary-encoded (read back as pandas categoricals)
+CATEGORY = pa.dictionary(pa.int32(), pa.string())
+
+PROFILE_SCHEMA = pa.schema([
+    ('Name', pa.string()),
+    ('Title', CATEGORY),
+    ('Location', CATEGORY),
+    ('About', pa.string()),
+    ('Experience', pa.string()),
+    ('Education', pa.string()),
+    ('Skills', pa.list_(pa.string())),
+    ('URL', pa.string()),
+])
+
+# batch_cleaner output: the profile columns plus the extracted lists
+CLEANED_SCHEMA = pa.schema(list(PROFILE_SCHEMA) + [
+    ('education_extracted', pa.list_(pa.string())),
+    ('experience_extracted', pa.list_(pa.string())),
+    ('skills_extracted', pa.list_(pa.string())),
+])
+
+# Separator of list values in the CSV / JSON text columns
+LIST_SEPARATORS = {'Skills': ', ', 'education_extracted': '; ', 'experience_extracted': '; ',
+                   'skills_extracted': '; '}
+
+# Parquet dictionary encoding only where values repeat; unique text (URL, About) is stored plain
+DICTIONARY_COLUMNS = ['Title', 'Location', 'Experience', 'Education', 'Skills.list.element',
+                      'education_extracted.list.element', 'experience_extracted.list.element',
+                      'skills_extracted.list.element']
+
+# The industry is the name of the folder holding each file
+INDUSTRY_PARTITIONING = ds.DirectoryPartitioning(pa.schema([('industry', pa.string())]), segment_encoding='none')
+
+
+def _text(value) -> Optional[str]:
+    """CSV cell to string; '-', empty and NaN cells are missing (None)."""
+    if not isinstance(value, str) or value in ('', '-'):
+        return None
+    return value
+
+
+def _split(value, separator: str) -> Optional[List[str]]:
+    """'a, b' cell to ['a', 'b']; missing cells are None."""
+    text = _text(value)
+    return [item for item in text.split(separator) if item] if text is not None else None
+
+
+def to_table(df: pd.DataFrame, schema: pa.Schema = PROFILE_SCHEMA) -> pa.Table:
+    """
+    Convert a profiles DataFrame (CSV text columns) to a typed Arrow table.
+
+    Missing columns become nulls and extra columns are dropped, so every file
+    of a dataset has exactly `schema`.
+
+    Args:
+        df: Profiles as read from profiles.csv, optionally with the batch_cleaner columns
+        schema: PROFILE_SCHEMA or CLEANED_SCHEMA
+
+    Returns:
+        Arrow table with `schema`
+    """
+    columns = {}
+    for field in schema:
+        values = df[field.name].tolist() if field.name in df.columns else [None] * len(df)
+        if pa.types.is_list(field.type):
+            separator = LIST_SEPARATORS[field.name]
+            columns[field.name] = [_split(value, separator) for value in values]
+        else:
+            columns[field.name] = [_text(value) for value in values]
+    return pa.Table.from_pydict(columns, schema=schema)
+
+
+class ParquetFileWriter:
+    """
+    Writes a zstd-compressed Parquet file one DataFrame chunk (row group) at a time.
+
+    Rows go to a temporary file that replaces `path` on close(), so readers never
+    see a half-written file.
+    """
+
+    def __init__(self, path: str, schema: pa.Schema = PROFILE_SCHEMA):
+        """
+        Args:
+            path: Output .parquet path
+            schema: PROFILE_SCHEMA or CLEANED_SCHEMA
+        """
+        self.path = path
+        self.schema = schema
+        self.tmp_path = path + '.tmp'
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        use_dictionary = [name for name in DICTIONARY_COLUMNS if name.split('.')[0] in schema.names]
+        self._writer = pq.ParquetWriter(self.tmp_path, schema, compression='zstd', use_dictionary=use_dictionary)
+
+    def write(self, df: pd.DataFrame) -> None:
+        """Append a chunk of profiles (CSV text columns) as a row group."""
+        self._writer.write_table(to_table(df, self.schema))
+
+    def close(self) -> None:
+        """Finish the file and move it into place."""
+        self._writer.close()
+        os.replace(self.tmp_path, self.path)
+
+    def abort(self) -> None:
+        """Discard the partial file, keeping any previous one."""
+        self._writer.close()
+        try:
+            os.remove(self.tmp_path)
+        except FileNotFoundError:
+            pass
+
+
+def write_table(df: pd.DataFrame, path: str, schema: pa.Schema = PROFILE_SCHEMA) -> None:
+    """
+    Write profiles as one Parquet file, replacing it atomically.
+
+    Args:
+        df: Profiles (CSV text columns)
+        path: Output .parquet path
+        schema: PROFILE_SCHEMA or CLEANED_SCHEMA
+    """
+    writer = ParquetFileWriter(path, schema)
+    try:
+        writer.write(df)
+    except Exception:
+        writer.abort()
+        raise
+    writer.close()
+
+
+def export_profiles(csv_path: str) -> Optional[str]:
+    """
+    Write profiles.parquet next to a profiles.csv.
+
+    Args:
+        csv_path: Path to the industry's profiles.csv
+
+    Returns:
+        Path of the Parquet file, or None if the CSV does not exist
+    """
+    if not os.path.exists(csv_path):
+        print(f"[WARNING] File not found: {csv_path}")
+        return None
+    df = pd.read_csv(csv_path, encoding='utf-8-sig', dtype=str, keep_default_na=False)
+    path = os.path.join(os.path.dirname(csv_path), PROFILES_FILE)
+    write_table(df, path, PROFILE_SCHEMA)
+    print(f"[INFO] Exported {len(df)} profiles to {path}")
+    return path
+
+
+def export_cleaned(df: pd.DataFrame, industry_dir: str) -> str:
+    """
+    Write cleaned_profiles.parquet for a batch_cleaner result.
+
+    Args:
+        df: Cleaned profiles with education_extracted, experience_extracted and skills_extracted
+        industry_dir: Industry folder
+
+    Returns:
+        Path of the Parquet file
+    """
+    path = os.path.join(industry_dir, CLEANED_FILE)
+    write_table(df, path, CLEANED_SCHEMA)
+    return path
+
+
+def read_profiles(base_dir: str = "data_collected", columns: Optional[List[str]] = None,
+                  industries: Optional[Iterable[str]] = None, cleaned: bool = False) -> pd.DataFrame:
+    """
+    Load profiles of every (or some) industries from their Parquet files.
+
+    Only the requested columns are read from disk. The `industry` column comes
+    from the folder names and can be requested like any other column.
+
+    Args:
+        base_dir: Directory holding the industry folders
+        columns: Columns to load (default: all, plus `industry`)
+        industries: Only load these industries
+        cleaned: Read cleaned_profiles.parquet instead of profiles.parquet
+
+    Returns:
+        DataFrame with one row per profile
+    """
+    schema = CLEANED_SCHEMA if cleaned else PROFILE_SCHEMA
+    filename = CLEANED_FILE if cleaned else PROFILES_FILE
+    paths = sorted(glob.glob(os.path.join(glob.escape(base_dir), '*', filename)))
+    full_schema = schema.append(pa.field('industry', pa.string()))
+    if not paths:
+        return full_schema.empty_table().select(columns or full_schema.names).to_pandas()
+    dataset = ds.dataset(paths, schema=full_schema, format='parquet', partitioning=INDUSTRY_PARTITIONING,
+                         partition_base_dir=base_dir)
+    row_filter = ds.field('industry').isin(list(industries)) if industries is not None else None
+    return dataset.to_table(columns=columns, filter=row_filter).to_pandas()
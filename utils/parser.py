@@ -1,6 +1,9 @@
 """Data parsing utilities for profile information extraction."""
 import re
 from typing import Dict, List
+from urllib.parse import unquote, urlsplit
+
+from utils.skill_matcher import get_skill_matcher
 
 
 # Common domain patterns
@@ -12,16 +15,31 @@ DOMAIN_PATTERNS = {
     'behance.net': 'Behance'
 }
 
-# Common skills keywords
-SKILL_KEYWORDS = [
-    'Python', 'Java', 'JavaScript', 'SQL', 'R', 'Scala', 'Go', 'C++', 'C#',
-    'Machine Learning', 'Deep Learning', 'AI', 'Data Science', 'Analytics',
-    'TensorFlow', 'PyTorch', 'Scikit-learn', 'Pandas', 'NumPy',
-    'Apache Spark', 'Hadoop', 'Kafka', 'Airflow', 'Docker', 'Kubernetes',
-    'AWS', 'Azure', 'GCP', 'Tableau', 'Power BI', 'Excel',
-    'React', 'Vue', 'Angular', 'Node.js', 'Django', 'Flask',
-    'Git', 'Jira', 'Agile', 'CI/CD'
+# Any LinkedIn subdomain other than www (vn., uk., m., ...)
+LINKEDIN_SUBDOMAIN_PATTERN = re.compile(r'://(?!www\.)[a-z0-9-]+\.linkedin\.com', re.IGNORECASE)
+# Legacy public profile URLs: /pub/<name>/<a>/<b>/<c>
+LINKEDIN_PUB_PATTERN = re.compile(r'^/pub/([^/]+)/([0-9a-z]{1,3})/([0-9a-z]{1,3})/([0-9a-z]{1,3})(?:/|$)')
+# Trailing locale segment: /in/<slug>/en, /in/<slug>/vi-vn
+LINKEDIN_LOCALE_SUFFIX = re.compile(r'^(/in/[^/]+)/[a-z]{2}(?:[-_][a-z]{2})?$')
+# Sites where the first path segment is the profile (github.com/<user>/<repo> belongs to <user>)
+PROFILE_FIRST_SEGMENT_DOMAINS = ('github.com', 'behance.net')
+
+# Name at the start of a title: "Name - Title", "Name | Title", "Firstname Lastname ..."
+NAME_PATTERNS = [
+    re.compile(r'^([^-|]+?)(?: - | \| )'),
+    re.compile(r'^(.*?) - (.*?) \|'),
+    re.compile(r'^([A-Z][a-z]+ [A-Z][a-z]+)(?:\s|$)'),
+]
+# Job titles like "Senior Data Engineer", or the company after "at"
+TITLE_PATTERNS = [
+    re.compile(r'([A-Z][a-zA-Z\s&]+(?:Engineer|Developer|Scientist|Analyst|Architect|Manager|Director|Lead|Specialist))'),
+    re.compile(r'at\s+([A-Z][a-zA-Z\s]+?)(?:\s|$|,|\.)'),
 ]
+LOCATION_PATTERN = re.compile(r'(Vietnam|Ho Chi Minh|Hanoi|HCM|HN|Đà Nẵng)', re.IGNORECASE)
+
+
+# Column order of parsed profiles (same as the CSV)
+PROFILE_FIELDS = ['Name', 'Title', 'Location', 'About', 'Experience', 'Education', 'Skills', 'URL']
 
 
 def parse_name_from_title(title: str) -> str:
@@ -35,14 +53,8 @@ def parse_name_from_title(title: str) -> str:
         Extracted name or empty string
     """
     # Common patterns: "Name - Title" or "Name | Title"
-    patterns = [
-        r'^([^-|]+?)(?: - | \| )',
-        r'^(.*?) - (.*?) \|',
-        r'^([A-Z][a-z]+ [A-Z][a-z]+)(?:\s|$)',
-    ]
-    
-    for pattern in patterns:
-        match = re.match(pattern, title.strip())
+    for pattern in NAME_PATTERNS:
+        match = pattern.match(title.strip())
         if match:
             name = match.group(1).strip()
             # Basic validation: should have at least 2 words
@@ -63,13 +75,8 @@ def parse_title_from_string(text: str) -> str:
         Extracted job title
     """
     # Look for patterns like "Data Engineer at Company" or "Senior Developer"
-    patterns = [
-        r'([A-Z][a-zA-Z\s&]+(?:Engineer|Developer|Scientist|Analyst|Architect|Manager|Director|Lead|Specialist))',
-        r'at\s+([A-Z][a-zA-Z\s]+?)(?:\s|$|,|\.)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, text)
+    for pattern in TITLE_PATTERNS:
+        match = pattern.search(text)
         if match:
             return match.group(1).strip()
     
@@ -78,22 +85,19 @@ def parse_title_from_string(text: str) -> str:
 
 def detect_skills(text: str) -> List[str]:
     """
-    Extract skills from text based on common keywords.
+    Extract skills from text using the skill taxonomy (gazetteer/skills.txt).
+    
+    Skills are matched on whole words, including synonyms (e.g. "Golang" -> Go,
+    "sklearn" -> Scikit-learn), so short names like R or Go no longer match inside
+    other words.
     
     Args:
         text: Snippet or description text
         
     Returns:
-        List of detected skills
+        List of detected skills (canonical names, in order of first mention)
     """
-    found_skills = []
-    text_lower = text.lower()
-    
-    for skill in SKILL_KEYWORDS:
-        if skill.lower() in text_lower:
-            found_skills.append(skill)
-    
-    return found_skills
+    return get_skill_matcher().find(text)
 
 
 def parse_location_from_snippet(snippet: str) -> str:
@@ -107,8 +111,7 @@ def parse_location_from_snippet(snippet: str) -> str:
         Extracted location or empty string
     """
     # Look for location patterns
-    location_pattern = r'(Vietnam|Ho Chi Minh|Hanoi|HCM|HN|Đà Nẵng)'
-    match = re.search(location_pattern, snippet, re.IGNORECASE)
+    match = LOCATION_PATTERN.search(snippet)
     
     if match:
         return match.group(1)
@@ -147,23 +150,80 @@ def normalize_linkedin_url(url: str) -> str:
     if not url or url == '-':
         return url
     
-    # Convert vn.linkedin.com, hk.linkedin.com, etc to www.linkedin.com
+    # Convert vn.linkedin.com, hk.linkedin.com, m.linkedin.com, etc to www.linkedin.com
     if 'linkedin.com' in url:
-        url = url.replace('vn.linkedin.com', 'www.linkedin.com')
-        url = url.replace('hk.linkedin.com', 'www.linkedin.com')
-        url = url.replace('ca.linkedin.com', 'www.linkedin.com')
-        url = url.replace('sg.linkedin.com', 'www.linkedin.com')
-        url = url.replace('us.linkedin.com', 'www.linkedin.com')
-        url = url.replace('uk.linkedin.com', 'www.linkedin.com')
-        # Add more if needed
+        url = LINKEDIN_SUBDOMAIN_PATTERN.sub('://www.linkedin.com', url)
         
         # Decode URL-encoded characters (Vietnamese characters)
-        from urllib.parse import unquote
         url = unquote(url)
     
     return url
 
 
+def canonical_profile_url(url: str) -> str:
+    """
+    Build a canonical dedup key for a profile URL.
+    
+    The same profile found under different URL forms maps to one key:
+    scheme, query string, fragment, trailing slash and case are dropped,
+    every *.linkedin.com subdomain collapses to linkedin.com, locale suffixes
+    (/in/<slug>/en) are removed and legacy /pub/<name>/<a>/<b>/<c> URLs are
+    rewritten to the /in/<name>-<c><b><a> form. GitHub and Behance URLs reduce
+    to the user segment; Kaggle and other sites keep their path.
+    The key is not meant for display (use normalize_linkedin_url for that).
+    
+    Args:
+        url: Profile URL, with or without scheme
+        
+    Returns:
+        Canonical key such as 'linkedin.com/in/nguyen-van-a', or '' for empty input
+    """
+    if not url or url == '-':
+        return ''
+    
+    text = unquote(url.strip())
+    if '://' not in text:
+        text = 'https://' + text
+    try:
+        parts = urlsplit(text)
+    except ValueError:
+        return text.lower()
+    host = (parts.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    path = re.sub(r'/{2,}', '/', parts.path).rstrip('/').lower()
+    
+    if host == 'linkedin.com' or host.endswith('.linkedin.com'):
+        pub = LINKEDIN_PUB_PATTERN.match(path)
+        if pub:
+            name, a, b, c = pub.groups()
+            path = f"/in/{name}-{c.zfill(3)}{b.zfill(3)}{a.zfill(2)}"
+        path = LINKEDIN_LOCALE_SUFFIX.sub(r'\1', path)
+        return 'linkedin.com' + path
+    
+    for domain in PROFILE_FIRST_SEGMENT_DOMAINS:
+        if host == domain or host.endswith('.' + domain):
+            segments = [segment for segment in path.split('/') if segment]
+            return domain + ('/' + segments[0] if segments else '')
+    
+    if host.endswith('.kaggle.com'):
+        host = 'kaggle.com'
+    return host + path
+
+
+def _name_from_title(title: str) -> str:
+    """Name from a result title, falling back to the text before the first separator."""
+    name = parse_name_from_title(title)
+    
+    # If name is empty, try to extract from title differently
+    if not name and title:
+        # Try to get first part of title
+        name = title.split(' - ')[0].split(' | ')[0].strip()
+        if len(name.split()) < 2 or len(name) < 5:
+            name = ""
+    return name
+
+
 def parse_profile(item: Dict[str, str]) -> Dict[str, str]:
     """
     Parse a single profile item from search results.
@@ -179,18 +239,11 @@ def parse_profile(item: Dict[str, str]) -> Dict[str, str]:
     link = item.get('link', '')
     
     # Extract information
-    name = parse_name_from_title(title)
+    name = _name_from_title(title)
     job_title = parse_title_from_string(title + ' ' + snippet)
     location = parse_location_from_snippet(snippet)
     skills = detect_skills(title + ' ' + snippet)
     
-    # If name is empty, try to extract from title differently
-    if not name and title:
-        # Try to get first part of title
-        name = title.split(' - ')[0].split(' | ')[0].strip()
-        if len(name.split()) < 2 or len(name) < 5:
-            name = ""
-    
     # If job_title is empty, try to get from snippet
     if not job_title and snippet:
         job_title = parse_title_from_string(snippet)
@@ -212,3 +265,15 @@ def parse_profile(item: Dict[str, str]) -> Dict[str, str]:
         'URL': normalized_link
     }
 
+
+def parse_profiles(items: List[Dict[str, str]]) -> List[Dict[str, str]]:
+    """
+    Parse a page (or any batch) of search result items.
+    
+    Args:
+        items: List of dictionaries with 'title', 'snippet', 'link'
+        
+    Returns:
+        Parsed profiles (see parse_profile()), in item order
+    """
+    return [parse_profile(item) for item in items]
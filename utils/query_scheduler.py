@@ -0,0 +1,218 @@
+"""Yield-driven query scheduling (UCB bandit over query variation and page depth)."""
+import math
+import os
+import random
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+
+DEFAULT_STATS_PATH = os.path.join("data_collected", ".query_stats.sqlite")
+
+# Valid `start` offsets for num=10 (the Custom Search API serves at most 100 results per query)
+PAGE_STARTS = list(range(1, 92, 10))
+
+
+class QueryScheduler:
+    """
+    Picks the next (query, start) page with an upper-confidence-bound policy.
+
+    Each (query variation, page offset) is an arm whose reward is the share of
+    new profile URLs on the page. Statistics are persisted per industry so later
+    runs start from what earlier runs learned. An unseen page inherits the mean
+    reward of the previous page of the same query as its prior, and only becomes
+    eligible once that previous page has been fetched and was not the last one.
+    """
+
+    def __init__(self, industry: str, queries: List[str], path: str = DEFAULT_STATS_PATH,
+                 page_size: int = 10, exploration: float = 0.5):
+        """
+        Load (or create) statistics for an industry.
+
+        Args:
+            industry: Industry the queries belong to
+            queries: Query variations to schedule
+            path: SQLite file path
+            page_size: Results per page (num)
+            exploration: Weight of the UCB exploration bonus
+        """
+        self.industry = industry
+        self.queries = list(queries)
+        self.page_size = page_size
+        self.exploration = exploration
+        self.page_starts = [s for s in PAGE_STARTS if s + page_size - 1 <= 100]
+        # Arms handed out during this run (fetched or in flight); a page is never fetched twice per run
+        self.taken: set[Tuple[str, int]] = set()
+        # Arms seen this run, including pages served from the search cache (which are not reward pulls)
+        self.seen: set[Tuple[str, int]] = set()
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS arms (
+                   industry TEXT NOT NULL,
+                   query TEXT NOT NULL,
+                   start INTEGER NOT NULL,
+                   pulls INTEGER NOT NULL DEFAULT 0,
+                   new_urls INTEGER NOT NULL DEFAULT 0,
+                   last_page INTEGER NOT NULL DEFAULT 0,
+                   updated_at REAL NOT NULL,
+                   PRIMARY KEY (industry, query, start)
+               )"""
+        )
+        self._conn.commit()
+
+        # (query, start) -> [pulls, new_urls, last_page]
+        self.stats: Dict[Tuple[str, int], List[int]] = {}
+        rows = self._conn.execute(
+            "SELECT query, start, pulls, new_urls, last_page FROM arms WHERE industry=?",
+            (industry,)
+        ).fetchall()
+        for query, start, pulls, new_urls, last_page in rows:
+            self.stats[(query, start)] = [pulls, new_urls, last_page]
+
+    def _mean(self, query: str, start: int) -> float:
+        """Posterior mean reward of an arm, using the previous page as prior (lock held)."""
+        if start == self.page_starts[0]:
+            prior = 1.0  # Optimistic: first pages are always worth one look
+        else:
+            prior = self._mean(query, start - self.page_size)
+        pulls, new_urls, _ = self.stats.get((query, start), (0, 0, 0))
+        return (new_urls / self.page_size + prior) / (pulls + 1)
+
+    def _eligible(self, query: str, start: int) -> bool:
+        """Whether an arm may be pulled now (lock held)."""
+        if (query, start) in self.taken:
+            return False
+        if start == self.page_starts[0]:
+            return True
+        parent_arm = (query, start - self.page_size)
+        parent = self.stats.get(parent_arm)
+        # Deeper pages only after the previous page was seen and was not the last one
+        return (parent is not None and (parent[0] > 0 or parent_arm in self.seen)
+                and not parent[2])
+
+    def next_arm(self) -> Optional[Tuple[str, int]]:
+        """
+        Choose the next page to fetch and reserve it for the caller.
+
+        Returns:
+            (query, start) tuple, or None when every eligible page was already taken
+        """
+        with self._lock:
+            total_pulls = sum(s[0] for s in self.stats.values())
+            best, best_score = None, -1.0
+            for query in self.queries:
+                for start in self.page_starts:
+                    if not self._eligible(query, start):
+                        continue
+                    pulls = self.stats.get((query, start), (0, 0, 0))[0]
+                    bonus = self.exploration * math.sqrt(math.log(total_pulls + 1) / (pulls + 1))
+                    # Tiny jitter breaks ties without favouring list order
+                    score = self._mean(query, start) + bonus + random.random() * 1e-6
+                    if score > best_score:
+                        best, best_score = (query, start), score
+            if best is not None:
+                self.taken.add(best)
+            return best
+
+    def release(self, query: str, start: int) -> None:
+        """
+        Give back a reserved page that could not be fetched (e.g. rate limited) so it can be retried.
+
+        Args:
+            query: Query string
+            start: Result offset
+        """
+        with self._lock:
+            self.taken.discard((query, start))
+
+    def record(self, query: str, start: int, new_count: int, items_returned: int,
+               from_cache: bool = False) -> None:
+        """
+        Record the outcome of a fetched page and persist it.
+
+        A page served from the search cache cost no quota, so it is not counted
+        as a pull: it only marks the page as seen (unlocking the next page) and
+        updates whether it was the last one.
+
+        Args:
+            query: Query string
+            start: Result offset
+            new_count: Number of previously unseen profile URLs on the page
+            items_returned: Number of items the API (or cache) returned
+            from_cache: Whether the page came from the search cache
+        """
+        last_page = 1 if items_returned < self.page_size else 0
+        with self._lock:
+            self.taken.add((query, start))
+            self.seen.add((query, start))
+            arm = self.stats.setdefault((query, start), [0, 0, 0])
+            if from_cache:
+                arm[2] = last_page
+                self._conn.execute(
+                    """INSERT INTO arms (industry, query, start, pulls, new_urls, last_page, updated_at)
+                       VALUES (?, ?, ?, 0, 0, ?, ?)
+                       ON CONFLICT (industry, query, start) DO UPDATE SET
+                           last_page = excluded.last_page, updated_at = excluded.updated_at""",
+                    (self.industry, query, start, last_page, time.time())
+                )
+                self._conn.commit()
+                return
+            arm[0] += 1
+            arm[1] += new_count
+            arm[2] = last_page
+            self._conn.execute(
+                """INSERT INTO arms (industry, query, start, pulls, new_urls, last_page, updated_at)
+                   VALUES (?, ?, ?, 1, ?, ?, ?)
+                   ON CONFLICT (industry, query, start) DO UPDATE SET
+                       pulls = pulls + 1, new_urls = new_urls + excluded.new_urls,
+                       last_page = excluded.last_page, updated_at = excluded.updated_at""",
+                (self.industry, query, start, new_count, last_page, time.time())
+            )
+            self._conn.commit()
+
+    def get_report(self) -> List[Dict]:
+        """
+        Get the historical yield of each query variation for this industry.
+
+        Returns:
+            List of dicts (query, pulls, new_urls, yield_per_request, best_start),
+            sorted by yield per request, best first
+        """
+        with self._lock:
+            by_query: Dict[str, Dict] = {}
+            for (query, start), (pulls, new_urls, _) in self.stats.items():
+                row = by_query.setdefault(query, {"query": query, "pulls": 0, "new_urls": 0,
+                                                  "best_start": start, "_best": -1.0})
+                row["pulls"] += pulls
+                row["new_urls"] += new_urls
+                page_yield = new_urls / pulls if pulls else 0.0
+                if page_yield > row["_best"]:
+                    row["best_start"], row["_best"] = start, page_yield
+        report = []
+        for row in by_query.values():
+            row.pop("_best")
+            row["yield_per_request"] = round(row["new_urls"] / row["pulls"], 2) if row["pulls"] else 0.0
+            report.append(row)
+        return sorted(report, key=lambda r: r["yield_per_request"], reverse=True)
+
+    def print_report(self) -> None:
+        """Print the historical yield of each query variation."""
+        report = self.get_report()
+        if not report:
+            print(f"[INFO] No query statistics recorded yet for '{self.industry}'.")
+            return
+        print(f"[INFO] Historical query yield for '{self.industry}' (new profiles per request):")
+        for row in report:
+            print(f"  {row['yield_per_request']:5.2f}  ({row['new_urls']:4d} new / {row['pulls']:3d} requests, "
+                  f"best start={row['best_start']:2d})  {row['query']}")
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,162 @@
+"""Persistent per-key daily quota ledger shared across runs and processes."""
+import datetime
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, Optional
+
+
+DEFAULT_LEDGER_PATH = os.path.join("data_collected", ".quota_ledger.sqlite")
+
+# Google resets Custom Search quotas at midnight Pacific time
+try:
+    from zoneinfo import ZoneInfo
+    QUOTA_TIMEZONE = ZoneInfo("America/Los_Angeles")
+except Exception:
+    # No tz database available: fall back to PST (may be an hour off during DST)
+    QUOTA_TIMEZONE = datetime.timezone(datetime.timedelta(hours=-8))
+
+
+def quota_day(now: Optional[datetime.datetime] = None) -> str:
+    """
+    Get the current Google quota day (Pacific date) as YYYY-MM-DD.
+
+    Args:
+        now: Optional timezone-aware datetime, defaults to now
+
+    Returns:
+        Quota day string
+    """
+    now = now or datetime.datetime.now(datetime.timezone.utc)
+    return now.astimezone(QUOTA_TIMEZONE).date().isoformat()
+
+
+def key_fingerprint(api_key: str) -> str:
+    """
+    Get a short, non-reversible identifier for an API key so raw keys never hit disk.
+
+    Args:
+        api_key: API key string
+
+    Returns:
+        First 16 hex chars of the SHA-256 of the key
+    """
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()[:16]
+
+
+class QuotaLedger:
+    """SQLite ledger of requests per (quota day, key, CX)."""
+
+    def __init__(self, path: str = DEFAULT_LEDGER_PATH, keep_days: int = 7):
+        """
+        Open (or create) the ledger.
+
+        Args:
+            path: SQLite file path
+            keep_days: Days of history kept; older rows are pruned on open
+        """
+        self.path = path
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # timeout lets parallel runs wait for each other's write locks
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS usage (
+                   day TEXT NOT NULL,
+                   key_id TEXT NOT NULL,
+                   cx TEXT NOT NULL,
+                   requests INTEGER NOT NULL DEFAULT 0,
+                   exhausted INTEGER NOT NULL DEFAULT 0,
+                   PRIMARY KEY (day, key_id, cx)
+               )"""
+        )
+        cutoff = (datetime.date.fromisoformat(quota_day()) - datetime.timedelta(days=keep_days)).isoformat()
+        self._conn.execute("DELETE FROM usage WHERE day < ?", (cutoff,))
+
+    def record(self, api_key: str, cx: Optional[str] = None, n: int = 1) -> int:
+        """
+        Atomically add requests for a key/CX on the current quota day.
+
+        Args:
+            api_key: API key that made the requests
+            cx: Search engine ID used
+            n: Number of requests
+
+        Returns:
+            Total requests made with this key today, across all CXs and processes
+        """
+        day = quota_day()
+        key_id = key_fingerprint(api_key)
+        with self._lock:
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute(
+                    """INSERT INTO usage (day, key_id, cx, requests) VALUES (?, ?, ?, ?)
+                       ON CONFLICT (day, key_id, cx) DO UPDATE SET requests = requests + excluded.requests""",
+                    (day, key_id, cx or "", n)
+                )
+                total = self._conn.execute(
+                    "SELECT COALESCE(SUM(requests), 0) FROM usage WHERE day=? AND key_id=?",
+                    (day, key_id)
+                ).fetchone()[0]
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return total
+
+    def mark_exhausted(self, api_key: str, cx: Optional[str] = None) -> None:
+        """
+        Record that Google reported the key's daily limit as reached.
+
+        Args:
+            api_key: API key that hit its daily limit
+            cx: Search engine ID used
+        """
+        with self._lock:
+            self._conn.execute(
+                """INSERT INTO usage (day, key_id, cx, exhausted) VALUES (?, ?, ?, 1)
+                   ON CONFLICT (day, key_id, cx) DO UPDATE SET exhausted = 1""",
+                (quota_day(), key_fingerprint(api_key), cx or "")
+            )
+
+    def get_usage(self, api_key: str) -> Dict[str, int]:
+        """
+        Get today's usage for a key.
+
+        Args:
+            api_key: API key string
+
+        Returns:
+            Dict with 'requests' (summed over CXs) and 'exhausted' (0/1)
+        """
+        with self._lock:
+            requests, exhausted = self._conn.execute(
+                "SELECT COALESCE(SUM(requests), 0), COALESCE(MAX(exhausted), 0) FROM usage WHERE day=? AND key_id=?",
+                (quota_day(), key_fingerprint(api_key))
+            ).fetchone()
+        return {"requests": requests, "exhausted": exhausted}
+
+    def get_cx_usage(self) -> Dict[str, int]:
+        """
+        Get today's requests per CX across all keys.
+
+        Returns:
+            Dict mapping CX to request count
+        """
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT cx, SUM(requests) FROM usage WHERE day=? GROUP BY cx",
+                (quota_day(),)
+            ).fetchall()
+        return {cx: requests for cx, requests in rows}
+
+    def close(self) -> None:
+        """Close the database."""
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,141 @@
+"""Per-key token-bucket rate limiting with adaptive (AIMD) pacing."""
+import threading
+import time
+from typing import Dict, Optional
+
+
+class TokenBucket:
+    """Token bucket for a single API key."""
+
+    def __init__(self, rate: float, capacity: float = 1.0):
+        """
+        Args:
+            rate: Refill rate in requests per second
+            capacity: Maximum burst size
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0  # Cooldown after a rate limit (monotonic time)
+        self.consecutive_limits = 0
+
+    def refill(self, now: float) -> None:
+        """Add tokens accrued since the last update."""
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+
+    def reserve(self, now: float) -> float:
+        """
+        Take one token, going into debt if none are available.
+
+        Returns:
+            Seconds the caller must wait before sending the request
+        """
+        self.refill(now)
+        self.tokens -= 1
+        wait = -self.tokens / self.rate if self.tokens < 0 else 0.0
+        return max(wait, self.blocked_until - now)
+
+
+class RateLimiter:
+    """
+    Gives each API key its own token bucket and adapts its rate to observed 429s.
+
+    Rates follow additive increase / multiplicative decrease: every successful
+    request raises the key's rate by `increase` (up to `max_rate`), every rate
+    limit multiplies it by `decrease` and puts the key on a cooldown that honours
+    Retry-After when the server sends it.
+    """
+
+    def __init__(self, initial_rate: float = 0.5, min_rate: float = 0.05, max_rate: float = 1.5,
+                 increase: float = 0.05, decrease: float = 0.5, max_cooldown: float = 60.0):
+        """
+        Args:
+            initial_rate: Starting requests per second for each key
+            min_rate: Lower bound for a key's rate
+            max_rate: Upper bound for a key's rate (Custom Search allows ~100 requests/minute per key)
+            increase: Rate added after each successful request
+            decrease: Factor applied to the rate after a rate limit
+            max_cooldown: Upper bound for a cooldown without Retry-After
+        """
+        self.initial_rate = min(max(initial_rate, min_rate), max_rate)
+        self.min_rate = min_rate
+        self.max_rate = max_rate
+        self.increase = increase
+        self.decrease = decrease
+        self.max_cooldown = max_cooldown
+        self._buckets: Dict[int, TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, key_index: int) -> TokenBucket:
+        """Get or create the bucket for a key (lock held)."""
+        bucket = self._buckets.get(key_index)
+        if bucket is None:
+            bucket = TokenBucket(self.initial_rate)
+            self._buckets[key_index] = bucket
+        return bucket
+
+    def acquire(self, key_index: int, stop_event: Optional[threading.Event] = None) -> float:
+        """
+        Block until the key may send its next request.
+
+        Args:
+            key_index: Index of the API key
+            stop_event: Optional event that interrupts the wait when set
+
+        Returns:
+            Seconds spent waiting
+        """
+        with self._lock:
+            wait = self._bucket(key_index).reserve(time.monotonic())
+        if wait > 0:
+            if stop_event is not None:
+                stop_event.wait(wait)
+            else:
+                time.sleep(wait)
+        return wait
+
+    def on_success(self, key_index: int) -> None:
+        """Additive increase after a successful request."""
+        with self._lock:
+            bucket = self._bucket(key_index)
+            bucket.refill(time.monotonic())
+            bucket.rate = min(self.max_rate, bucket.rate + self.increase)
+            bucket.consecutive_limits = 0
+
+    def on_rate_limited(self, key_index: int, retry_after: Optional[float] = None) -> float:
+        """
+        Multiplicative decrease and cooldown after a 429/403 rate limit.
+
+        Args:
+            key_index: Index of the API key
+            retry_after: Seconds from the Retry-After header, if present
+
+        Returns:
+            Cooldown in seconds before the key may be used again
+        """
+        with self._lock:
+            now = time.monotonic()
+            bucket = self._bucket(key_index)
+            bucket.refill(now)
+            bucket.rate = max(self.min_rate, bucket.rate * self.decrease)
+            bucket.tokens = min(bucket.tokens, 0.0)
+            bucket.consecutive_limits += 1
+            if retry_after is not None:
+                cooldown = retry_after
+            else:
+                # Exponential cooldown for repeated limits on the same key
+                cooldown = min(self.max_cooldown, (1.0 / bucket.rate) * 2 ** (bucket.consecutive_limits - 1))
+            bucket.blocked_until = max(bucket.blocked_until, now + cooldown)
+        return cooldown
+
+    def get_rates(self) -> Dict[str, float]:
+        """
+        Get the current rate of every key seen so far.
+
+        Returns:
+            Dict mapping key label to requests per second
+        """
+        with self._lock:
+            return {f"key_{i + 1}": round(b.rate, 3) for i, b in sorted(self._buckets.items())}
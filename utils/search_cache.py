@@ -0,0 +1,161 @@
+"""Persistent on-disk cache for Google Custom Search result pages."""
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, Optional
+
+
+DEFAULT_CACHE_PATH = os.path.join("data_collected", ".search_cache.sqlite")
+
+
+class SearchCache:
+    """SQLite-backed cache of result pages keyed on (normalized query, cx, start, num)."""
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, ttl_hours: float = 72,
+                 max_entries: int = 50000):
+        """
+        Open (or create) the cache database.
+
+        Args:
+            path: SQLite file path
+            ttl_hours: Entries older than this are treated as misses and evicted
+            max_entries: Maximum number of pages kept; least recently used are evicted first
+        """
+        self.path = path
+        self.ttl_seconds = ttl_hours * 3600
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._puts = 0
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        # Shared by concurrent search workers; access is serialized by self._lock
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            """CREATE TABLE IF NOT EXISTS pages (
+                   query TEXT NOT NULL,
+                   cx TEXT NOT NULL,
+                   start INTEGER NOT NULL,
+                   num INTEGER NOT NULL,
+                   response TEXT NOT NULL,
+                   created_at REAL NOT NULL,
+                   accessed_at REAL NOT NULL,
+                   PRIMARY KEY (query, cx, start, num)
+               )"""
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_accessed ON pages (accessed_at)")
+        self._conn.commit()
+
+    @staticmethod
+    def normalize_query(query: str) -> str:
+        """
+        Normalize a query for cache lookups (case and whitespace insensitive).
+
+        Args:
+            query: Raw query string
+
+        Returns:
+            Normalized query
+        """
+        return " ".join(query.lower().split())
+
+    def get(self, query: str, cx: Optional[str], start: int, num: int = 10) -> Optional[Dict]:
+        """
+        Look up a cached result page.
+
+        Args:
+            query: Query string
+            cx: Search engine ID
+            start: Result offset
+            num: Page size
+
+        Returns:
+            Cached response dict, or None on miss/expiry
+        """
+        key = (self.normalize_query(query), cx or "", start, num)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, created_at FROM pages WHERE query=? AND cx=? AND start=? AND num=?",
+                key
+            ).fetchone()
+            if row is None or now - row[1] > self.ttl_seconds:
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE pages SET accessed_at=? WHERE query=? AND cx=? AND start=? AND num=?",
+                (now, *key)
+            )
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(row[0])
+
+    def put(self, query: str, cx: Optional[str], start: int, response: Dict, num: int = 10) -> None:
+        """
+        Store a result page. Only the fields the collector uses are kept.
+
+        Args:
+            query: Query string
+            cx: Search engine ID
+            start: Result offset
+            response: Raw API response
+            num: Page size
+        """
+        items = [
+            {"title": item.get("title", ""), "snippet": item.get("snippet", ""), "link": item.get("link", "")}
+            for item in response.get("items", [])
+        ]
+        payload = json.dumps({"items": items}, ensure_ascii=False)
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (self.normalize_query(query), cx or "", start, num, payload, now, now)
+            )
+            self._conn.commit()
+            self._puts += 1
+            if self._puts % 50 == 0:
+                self._evict()
+
+    def _evict(self) -> None:
+        """Drop expired entries, then least recently used ones above max_entries (lock held)."""
+        cutoff = time.time() - self.ttl_seconds
+        self._conn.execute("DELETE FROM pages WHERE created_at < ?", (cutoff,))
+        self._conn.execute(
+            """DELETE FROM pages WHERE rowid IN (
+                   SELECT rowid FROM pages ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+               )""",
+            (self.max_entries,)
+        )
+        self._conn.commit()
+
+    def get_stats(self) -> Dict[str, int]:
+        """
+        Get hit/miss counters for this run.
+
+        Returns:
+            Dict with hits, misses and current number of cached pages
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+        return {"hits": self.hits, "misses": self.misses, "entries": entries}
+
+    def report(self) -> None:
+        """Print hit/miss counts for this run."""
+        stats = self.get_stats()
+        lookups = stats["hits"] + stats["misses"]
+        hit_rate = (stats["hits"] / lookups * 100) if lookups else 0.0
+        print(f"[INFO] Search cache: {stats['hits']} hits, {stats['misses']} misses "
+              f"({hit_rate:.0f}% hit rate, {stats['entries']} pages cached)")
+
+    def close(self) -> None:
+        """Evict stale entries and close the database."""
+        with self._lock:
+            self._evict()
+            self._conn.close()
@@ -1,9 +1,184 @@
 """Google Custom Search API integration for profile searching."""
+import functools
+import json
+import os
 import time
 import random
-from googleapiclient.discovery import build
+import queue
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from googleapiclient.errors import HttpError
 
+from utils.cse_rest import RestCustomSearch, create_session
+from utils.metrics import get_metrics, key_label
+from utils.parser import canonical_profile_url
+from utils.query_scheduler import PAGE_STARTS
+
+
+# Custom Search endpoint override, e.g. a local emulator (benchmarks/cse_emulator.py); None uses Google's
+API_ENDPOINT = os.environ.get("CSE_API_ENDPOINT") or None
+
+# How requests are sent: 'googleapiclient' (discovery-based client over httplib2) or
+# 'rest' (utils.cse_rest: direct GETs over a requests.Session, with a partial response)
+TRANSPORTS = ('googleapiclient', 'rest')
+TRANSPORT = os.environ.get("CSE_TRANSPORT") or 'googleapiclient'
+
+# Concurrent search: attempts per page after unexpected errors before it is given up,
+# and consecutive unexpected errors before a key/CX pair is retired
+MAX_PAGE_ATTEMPTS = 3
+MAX_CONSECUTIVE_ERRORS = 10
+
+
+def set_api_endpoint(endpoint):
+    """
+    Send Custom Search requests to another endpoint (None restores Google's).
+    
+    Args:
+        endpoint: Base URL such as "http://127.0.0.1:8765/", or None
+    """
+    global API_ENDPOINT
+    API_ENDPOINT = endpoint or None
+
+
+def get_api_endpoint():
+    """
+    Get the endpoint requests are sent to: set_api_endpoint() or $CSE_API_ENDPOINT.
+    
+    Returns:
+        Base URL, or None for Google's
+    """
+    return API_ENDPOINT
+
+
+def set_transport(transport):
+    """
+    Choose how Custom Search requests are sent (see TRANSPORTS).
+    
+    Args:
+        transport: 'googleapiclient' or 'rest'
+        
+    Raises:
+        ValueError: For an unknown transport
+    """
+    global TRANSPORT
+    if transport not in TRANSPORTS:
+        raise ValueError(f"Unknown transport {transport!r} (expected one of {', '.join(TRANSPORTS)})")
+    TRANSPORT = transport
+
+
+@functools.lru_cache(maxsize=1)
+def _discovery_document():
+    """customsearch v1 discovery document bundled with the client, parsed once per process."""
+    from googleapiclient import discovery_cache
+
+    document = discovery_cache.get_static_doc("customsearch", "v1")
+    return json.loads(document) if document else None
+
+
+def build_service(api_key, http=None):
+    """
+    Build a googleapiclient Custom Search service object for a key.
+    
+    Uses the discovery document bundled with the client (no network request,
+    parsed once) and API_ENDPOINT when set. The discovery client is imported
+    here, so runs using the 'rest' transport never load it. Prefer
+    get_service(), which reuses service objects and connections.
+    
+    Args:
+        api_key: Google API key
+        http: Optional httplib2.Http transport (default: a new one)
+        
+    Returns:
+        googleapiclient Resource for customsearch v1
+    """
+    from googleapiclient.discovery import build, build_from_document
+    from googleapiclient.http import build_http
+
+    client_options = {"api_endpoint": API_ENDPOINT} if API_ENDPOINT else None
+    document = _discovery_document()
+    if document is None:
+        return build("customsearch", "v1", developerKey=api_key, http=http, client_options=client_options,
+                     static_discovery=True)
+    return build_from_document(document, developerKey=api_key, http=http or build_http(),
+                               client_options=client_options)
+
+
+class ServicePool:
+    """
+    Prebuilt service objects per API key, so rotating keys is a dictionary lookup.
+    
+    Service objects and their HTTP transports (httplib2.Http, requests.Session)
+    are not thread-safe, so every thread has its own pool: one keep-alive
+    transport (per endpoint for requests sessions) shared by all the keys the
+    thread uses, so connections survive key rotation, and one service object per
+    (key, endpoint, transport).
+    """
+    
+    def __init__(self):
+        self._local = threading.local()
+    
+    def _thread_pool(self):
+        local = self._local
+        if not hasattr(local, 'services'):
+            local.http = None
+            local.sessions = {}
+            local.services = {}
+        return local
+    
+    def _build(self, local, api_key):
+        if TRANSPORT == 'rest':
+            session = local.sessions.get(API_ENDPOINT)
+            if session is None:
+                session = local.sessions[API_ENDPOINT] = create_session(API_ENDPOINT)
+            return RestCustomSearch(api_key, session=session, endpoint=API_ENDPOINT)
+        if local.http is None:
+            from googleapiclient.http import build_http
+            local.http = build_http()
+        return build_service(api_key, http=local.http)
+    
+    def get(self, api_key):
+        """
+        Get the calling thread's service object for a key, building it on first use.
+        
+        Args:
+            api_key: Google API key
+            
+        Returns:
+            Service object of the selected TRANSPORT (googleapiclient Resource or RestCustomSearch)
+        """
+        local = self._thread_pool()
+        pool_key = (api_key, API_ENDPOINT, TRANSPORT)
+        service = local.services.get(pool_key)
+        if service is None:
+            service = local.services[pool_key] = self._build(local, api_key)
+        return service
+    
+    def prebuild(self, api_keys):
+        """
+        Build the calling thread's service objects for several keys up front.
+        
+        Args:
+            api_keys: Google API keys
+        """
+        for api_key in api_keys:
+            self.get(api_key)
+
+
+_service_pool = ServicePool()
+
+
+def get_service(api_key):
+    """
+    Get a pooled service object for a key (see ServicePool).
+    
+    Args:
+        api_key: Google API key
+        
+    Returns:
+        Service object of the selected TRANSPORT (googleapiclient Resource or RestCustomSearch)
+    """
+    return _service_pool.get(api_key)
+
 
 def generate_query_variations(industry):
     """
@@ -58,10 +233,235 @@ def generate_query_variations(industry):
     return variations
 
 
-def search_profiles(industry, count, api_key, cx, delay=2, api_manager=None, existing_urls=None):
+def _sleep(seconds, reason, event=None):
+    """
+    Sleep (or wait on `event`, returning early when it is set), counting the time in the run metrics.
+    
+    Args:
+        seconds: Time to wait
+        reason: Metrics label: 'delay' (fixed pacing) or 'backoff' (after an error)
+        event: Optional threading.Event that ends the wait when set
+    """
+    started = time.monotonic()
+    if event is not None:
+        event.wait(seconds)
+    else:
+        time.sleep(seconds)
+    get_metrics().inc('search_wait_seconds_total', time.monotonic() - started, reason=reason)
+
+
+def _acquire(limiter, index, stop_event=None):
+    """Wait for a key's rate limiter, counting the time in the run metrics."""
+    waited = limiter.acquire(index, stop_event)
+    if waited > 0:
+        get_metrics().inc('search_wait_seconds_total', waited, reason='rate_limiter')
+
+
+def _record_page(query, new_profiles_count):
+    """Count a processed result page and its new-profile yield in the run metrics."""
+    metrics = get_metrics()
+    metrics.inc('search_pages_total', query=query)
+    metrics.inc('search_new_profiles_total', new_profiles_count, query=query)
+    metrics.observe('search_page_new_profiles', new_profiles_count)
+
+
+def execute_request(request, max_exec_retries=3):
+    """
+    Execute a Custom Search request with retries on transient network errors.
+    
+    Args:
+        request: googleapiclient HttpRequest or RestSearchRequest (service.cse().list(...))
+        max_exec_retries: Built-in retries passed to request.execute()
+        
+    Returns:
+        Parsed JSON response
+        
+    Raises:
+        HttpError: For HTTP errors, so callers can apply rate limit/backoff logic
+    """
+    attempt = 0
+    while True:
+        try:
+            return request.execute(num_retries=max_exec_retries)
+        except HttpError:
+            # Bubble up HttpError for proper rate limit/backoff logic
+            raise
+        except Exception as e:
+            # Handle transient connection resets (e.g., WinError 10054) or network hiccups
+            err_msg = str(e)
+            if "10054" in err_msg or "Connection aborted" in err_msg or "reset" in err_msg.lower():
+                attempt += 1
+                if attempt <= 3:
+                    wait_s = min(10 * attempt, 30)
+                    print(f"[WARNING] Transient network error (attempt {attempt}/3). Waiting {wait_s}s and retrying...")
+                    _sleep(wait_s, 'backoff')
+                    continue
+            # Non-transient or exhausted retries
+            raise
+
+
+def fetch_page(service, query, cx, start, num=10, cache=None, pace=None, key=None):
+    """
+    Fetch one result page, serving it from the cache when possible.
+    
+    Args:
+        service: Custom Search service object
+        query: Query string
+        cx: Search engine ID
+        start: Result offset
+        num: Page size
+        cache: Optional SearchCache
+        pace: Optional callable invoked right before a real (non-cached) request,
+            e.g. to wait for the key's rate limiter
+        key: Index of the API key, for the run metrics
+        
+    Returns:
+        Tuple of (response dict, True if served from cache)
+    """
+    metrics = get_metrics()
+    if cache is not None:
+        cached = cache.get(query, cx, start, num)
+        if cached is not None:
+            metrics.inc('search_requests_total', key=key_label(key), outcome='cache_hit')
+            return cached, True
+
+    if pace is not None:
+        pace()
+    request = service.cse().list(q=query, cx=cx, start=start, num=num)
+    outcome = 'ok'
+    started = time.perf_counter()
+    try:
+        res = execute_request(request)
+    except HttpError as e:
+        outcome = classify_http_error(e)
+        if outcome == 'other':
+            outcome = 'http_error'
+        raise
+    except Exception:
+        outcome = 'network_error'
+        raise
+    finally:
+        metrics.observe('search_request_seconds', time.perf_counter() - started, key=key_label(key))
+        metrics.inc('search_requests_total', key=key_label(key), outcome=outcome)
+    if cache is not None:
+        cache.put(query, cx, start, res, num)
+    return res, False
+
+
+def get_retry_after(error):
+    """
+    Read the Retry-After header (in seconds) from an HttpError, if present.
+    
+    Args:
+        error: HttpError raised by the API client
+        
+    Returns:
+        Seconds to wait, or None
+    """
+    resp = getattr(error, 'resp', None)
+    if not resp:
+        return None
+    try:
+        value = resp.get('retry-after') or resp.get('Retry-After')
+        return float(value) if value is not None else None
+    except (TypeError, ValueError, AttributeError):
+        return None
+
+
+def classify_http_error(error):
+    """
+    Classify a Custom Search HttpError.
+    
+    Args:
+        error: HttpError raised by the API client
+        
+    Returns:
+        'daily_limit' for exhausted daily quota, 'rate_limit' for 429/403 rate limits,
+        'bad_cx' for 404 on an invalid CX, otherwise 'other'
+    """
+    resp = getattr(error, 'resp', None)
+    status = resp.status if resp else None
+    content_str = getattr(error, 'content', b'')
+    try:
+        content_text = content_str.decode('utf-8') if isinstance(content_str, (bytes, bytearray)) else str(content_str)
+    except Exception:
+        content_text = str(content_str)
+    content_text = content_text.lower()
+
+    if status in (403, 429) and any(s in content_text for s in ['daily limit', 'queries per day']):
+        return 'daily_limit'
+    if status == 429 or (status == 403 and any(s in content_text for s in [
+        'rate limit', 'user rate limit', 'quota', 'limit exceeded'
+    ])):
+        return 'rate_limit'
+    if status == 404 and any(s in content_text for s in [
+        'requested entity was not found', 'notfound', 'cx', 'search engine id'
+    ]):
+        return 'bad_cx'
+    return 'other'
+
+
+def _add_unique_items(items, seen_urls, results, count, existing_urls=()):
+    """
+    Append items whose profile was not seen yet, up to `count` results.
+    
+    URLs are compared by their canonical form, so locale subdomains, tracking
+    parameters and legacy LinkedIn /pub/ links of the same profile count once.
+    
+    Args:
+        items: Raw items from a result page
+        seen_urls: Set of canonical URL keys collected in this run (updated in place)
+        results: Result list (updated in place)
+        count: Target number of results
+        existing_urls: URLs saved by earlier runs; only membership is checked
+            (a set of canonical keys or a GlobalURLIndex, which is never copied)
+        
+    Returns:
+        Number of new profiles added
+    """
+    new_profiles_count = 0
+    for item in items:
+        if len(results) >= count:
+            break
+        url = item.get("link", "")
+        key = canonical_profile_url(url)
+        if key not in seen_urls and key not in existing_urls:
+            seen_urls.add(key)
+            results.append({
+                "title": item.get("title", ""),
+                "snippet": item.get("snippet", ""),
+                "link": url
+            })
+            new_profiles_count += 1
+    return new_profiles_count
+
+
+def search_profiles(industry, count, api_key, cx, delay=2, api_manager=None, existing_urls=None, cache=None,
+                    scheduler=None):
     """
     Search for profiles using Google Custom Search API.
     
+    Collects every page from iter_search_pages() into one list; see that function
+    for the arguments.
+    
+    Returns:
+        List of profile dictionaries with title, snippet, and link
+    """
+    results = []
+    for page in iter_search_pages(industry, count, api_key, cx, delay=delay, api_manager=api_manager,
+                                  existing_urls=existing_urls, cache=cache, scheduler=scheduler):
+        results.extend(page)
+    return results
+
+
+def iter_search_pages(industry, count, api_key, cx, delay=2, api_manager=None, existing_urls=None, cache=None,
+                      scheduler=None, checkpoint=None):
+    """
+    Search for profiles using Google Custom Search API, yielding new profiles page by page.
+    
+    With a checkpoint, the search continues from the position it holds (if any) and keeps
+    it up to date before each page is yielded, so an interrupted run can be resumed.
+    
     Args:
         industry: Industry keyword to search for
         count: Number of profiles to collect
@@ -69,20 +469,30 @@ def search_profiles(industry, count, api_key, cx, delay=2, api_manager=None, exi
         cx: Search engine ID
         delay: Delay between requests in seconds
         api_manager: Optional APIManager for key rotation
+        existing_urls: URLs to skip (e.g. already saved in profiles.csv)
+        cache: Optional SearchCache; cached pages are served without spending quota
+        scheduler: Optional QueryScheduler choosing the next (query, start) by historical yield
+        checkpoint: Optional SearchCheckpoint to resume from and keep updated
         
-    Returns:
-        List of profile dictionaries with title, snippet, and link
+    Yields:
+        List of new profile dictionaries (title, snippet, link) from each result page
     """
     current_api_key = api_key
     current_cx = cx
     
+    if api_manager and not api_manager.get_healthy_indices():
+        print("[ERROR] All API keys have already used their daily quota.")
+        return
+    
     try:
-        service = build("customsearch", "v1", developerKey=current_api_key)
+        # Every key's service object up front: rotation below only looks them up
+        _service_pool.prebuild(api_manager.api_keys if api_manager else [])
+        service = get_service(current_api_key)
     except Exception as e:
         print(f"[ERROR] Failed to build Google API service: {e}")
-        return []
+        return
     
-    results = []
+    collected = 0
     start = 1
     max_results_per_query = 10
     
@@ -90,78 +500,110 @@ def search_profiles(industry, count, api_key, cx, delay=2, api_manager=None, exi
     query_variations = generate_query_variations(industry)
     # Shuffle order each run to increase variety across runs
     random.shuffle(query_variations)
-    print(f"[INFO] Searching for '{industry}' profiles with {len(query_variations)} query variations...")
     
     query_index = 0
     # Track seen URLs to avoid duplicates within and across runs
-    seen_urls = set(existing_urls or [])
+    seen_urls = set()
+    existing_urls = existing_urls if existing_urls is not None else ()
     
     # Switch queries frequently to get variety
     queries_per_variation = random.randint(1, 3)  # Randomize pages per variation
     
-    while len(results) < count and query_index < len(query_variations):
+    if checkpoint is not None:
+        saved_order = checkpoint.get("query_variations")
+        if saved_order and sorted(saved_order) == sorted(query_variations):
+            query_variations = saved_order
+            query_index = checkpoint.get("query_index", 0)
+            start = checkpoint.get("start", 1)
+            queries_per_variation = checkpoint.get("queries_per_variation", queries_per_variation)
+            if scheduler is not None:
+                scheduler.taken.update(checkpoint.get_fetched())
+            print(f"[INFO] Continuing search at query variation {query_index + 1}/{len(query_variations)}, start={start}")
+        checkpoint.update(query_variations=query_variations, query_index=query_index, start=start,
+                          queries_per_variation=queries_per_variation)
+    print(f"[INFO] Searching for '{industry}' profiles with {len(query_variations)} query variations...")
+    
+    # Per-key token buckets replace the fixed delay when the APIManager has a rate limiter
+    limiter = getattr(api_manager, 'rate_limiter', None)
+    pace = (lambda: _acquire(limiter, api_manager.current_index)) if limiter else None
+    if limiter:
+        delay = 0
+    
+    out_of_quota = False
+    # Page reserved from the scheduler; kept across retries (e.g. after a rate limit)
+    arm = None
+    
+    while collected < count and not out_of_quota and (scheduler or query_index < len(query_variations)):
         try:
-            # Use different query variations to find different profiles
-            query = query_variations[query_index % len(query_variations)]
+            if scheduler is not None:
+                if arm is None:
+                    arm = scheduler.next_arm()
+                    if arm is None:
+                        print("[INFO] Query scheduler has no more pages to try.")
+                        if checkpoint is not None:
+                            checkpoint.finished = True
+                        break
+                query, start = arm
+            else:
+                # Use different query variations to find different profiles
+                query = query_variations[query_index % len(query_variations)]
             
-            # Execute request with retries and transient error handling
-            request = service.cse().list(
-                q=query,
-                cx=current_cx,
-                start=start,
-                num=max_results_per_query
-            )
-
-            # Built-in retries for Http errors
-            max_exec_retries = 3
-            attempt = 0
-            while True:
-                try:
-                    res = request.execute(num_retries=max_exec_retries)
-                    break
-                except HttpError as e:
-                    # Bubble up HttpError (handled below) for proper rate limit/backoff logic
-                    raise e
-                except Exception as e:
-                    # Handle transient connection resets (e.g., WinError 10054) or network hiccups
-                    err_msg = str(e)
-                    if "10054" in err_msg or "Connection aborted" in err_msg or "reset" in err_msg.lower():
-                        attempt += 1
-                        if attempt <= 3:
-                            wait_s = min(10 * attempt, 30)
-                            print(f"[WARNING] Transient network error (attempt {attempt}/3). Waiting {wait_s}s and retrying...")
-                            time.sleep(wait_s)
-                            continue
-                    # Non-transient or exhausted retries
-                    raise
+            # Execute request (or serve it from cache) with retries and transient error handling
+            res, from_cache = fetch_page(service, query, current_cx, start, max_results_per_query, cache, pace,
+                                         key=api_manager.current_index if api_manager else None)
+            if limiter and not from_cache:
+                limiter.on_success(api_manager.current_index)
+            
+            # Charge the key; move off it once today's quota is spent (ledger-aware)
+            if api_manager and not from_cache and not api_manager.increment_usage():
+                print(f"[INFO] API key {api_manager.current_index + 1} has used its daily quota.")
+                if len(api_manager.api_keys) > 1 and api_manager.rotate_key():
+                    current_api_key = api_manager.get_current_key()
+                    service = get_service(current_api_key)
+                    cx_value = api_manager.get_current_cx()
+                    if cx_value:
+                        current_cx = cx_value
+                else:
+                    # Keep this page, then stop
+                    out_of_quota = True
             
             items = res.get("items", [])
             
+            if scheduler is not None:
+                page = []
+                new_profiles_count = _add_unique_items(items, seen_urls, page, count - collected, existing_urls)
+                collected += new_profiles_count
+                _record_page(query, new_profiles_count)
+                # Cached pages cost no quota: they unlock the next page but are not reward pulls
+                scheduler.record(query, start, new_profiles_count, len(items), from_cache=from_cache)
+                if checkpoint is not None:
+                    checkpoint.add_fetched(query, start)
+                arm = None
+                print(f"[INFO] Found {collected}/{count} profiles (+{new_profiles_count} new, start={start}: {query[:50]}...)")
+                if page:
+                    yield page
+                if delay > 0 and not from_cache:
+                    _sleep(delay, 'delay')
+                continue
+            
             if not items or len(items) < max_results_per_query:
+                _record_page(query, 0)
                 print(f"[INFO] No more results for this query. Trying next variation...")
                 query_index += 1
                 start = random.choice([1, 11, 21, 31])
+                if checkpoint is not None:
+                    checkpoint.update(query_index=query_index, start=start)
                 
                 # Don't sleep if switching query, just continue
                 continue
             
             # Add items only if they're unique
-            new_profiles_count = 0
-            for item in items:
-                url = item.get("link", "")
-                if url not in seen_urls:
-                    seen_urls.add(url)
-                    results.append({
-                        "title": item.get("title", ""),
-                        "snippet": item.get("snippet", ""),
-                        "link": url
-                    })
-                    new_profiles_count += 1
-                    
-                    if len(results) >= count:
-                        break
+            page = []
+            new_profiles_count = _add_unique_items(items, seen_urls, page, count - collected, existing_urls)
+            collected += new_profiles_count
+            _record_page(query, new_profiles_count)
             
-            print(f"[INFO] Found {len(results)}/{count} profiles (+{new_profiles_count} new from this query: {query[:50]}...)")
+            print(f"[INFO] Found {collected}/{count} profiles (+{new_profiles_count} new from this query: {query[:50]}...)")
             
             # Switch queries more frequently to get variety
             if new_profiles_count == 0 or start > (queries_per_variation * max_results_per_query):
@@ -170,35 +612,43 @@ def search_profiles(industry, count, api_key, cx, delay=2, api_manager=None, exi
                 start = random.choice([1, 11, 21, 31])
                 print(f"[INFO] Switching to query variation {query_index}/{len(query_variations)}")
                 # Small delay before switching queries
-                if delay > 0:
-                    time.sleep(delay / 2)
+                if delay > 0 and not from_cache:
+                    _sleep(delay / 2, 'delay')
                 
-            # Avoid hitting rate limits
-            if delay > 0:
-                time.sleep(delay)
+            # Avoid hitting rate limits (cached pages cost nothing)
+            if delay > 0 and not from_cache:
+                _sleep(delay, 'delay')
             
             start += max_results_per_query
             
+            # Position of the next page is recorded before this page is handed on
+            if checkpoint is not None:
+                checkpoint.update(query_index=query_index, start=start)
+            if page:
+                yield page
+            
         except HttpError as e:
-            status = getattr(e, 'resp', None).status if getattr(e, 'resp', None) else None
-            content_str = getattr(e, 'content', b'')
-            try:
-                content_text = content_str.decode('utf-8') if isinstance(content_str, (bytes, bytearray)) else str(content_str)
-            except Exception:
-                content_text = str(content_str)
+            error_kind = classify_http_error(e)
 
             # Handle rate/quota limits: 429 or 403 with limit messages
-            if status == 429 or (status == 403 and any(s in content_text.lower() for s in [
-                'rate limit', 'user rate limit', 'daily limit', 'quota', 'limit exceeded'
-            ])):
+            if error_kind in ('rate_limit', 'daily_limit'):
                 print("[WARNING] Rate limit exceeded for current API key.")
                 
+                if limiter:
+                    cooldown = limiter.on_rate_limited(api_manager.current_index, get_retry_after(e))
+                    print(f"[INFO] Key {api_manager.current_index + 1} cooling down for {cooldown:.1f}s")
+                if error_kind == 'daily_limit' and api_manager:
+                    api_manager.mark_exhausted(api_manager.current_index)
+                    if not api_manager.get_healthy_indices():
+                        print("[ERROR] All API keys have reached their daily limit.")
+                        break
+                
                 # Try rotate to next key if api_manager provided
                 if api_manager and len(api_manager.api_keys) > 1:
                     print("[INFO] Rotating to next API key...")
                     api_manager.rotate_key()
                     current_api_key = api_manager.get_current_key()
-                    service = build("customsearch", "v1", developerKey=current_api_key)
+                    service = get_service(current_api_key)
                     # If APIManager has paired CXs, rotate CX as well
                     try:
                         current_cx_candidate = getattr(api_manager, 'get_current_cx', None)
@@ -208,28 +658,37 @@ def search_profiles(industry, count, api_key, cx, delay=2, api_manager=None, exi
                                 current_cx = cx_value
                     except Exception:
                         pass
+                    if limiter:
+                        # The new key's bucket decides how long to wait
+                        continue
                     print("[INFO] Waiting 60 seconds before retry with new key...")
-                    time.sleep(60)
+                    _sleep(60, 'backoff')
+                    continue
+                elif limiter:
+                    # Next acquire() waits out this key's cooldown
                     continue
                 else:
                     print("[WARNING] Rate limit exceeded. Waiting 60 seconds...")
-                    time.sleep(60)
+                    _sleep(60, 'backoff')
                 
                 # Increase delay after hitting rate limit
                 delay = min(delay * 1.5, 10)  # Cap at maximum 10 seconds
                 print(f"[INFO] Increasing delay to {delay:.1f} seconds to avoid rate limits...")
                 continue
             # Handle invalid CX (404 requested entity not found)
-            elif status == 404 and any(s in content_text.lower() for s in [
-                'requested entity was not found', 'notfound', 'cx', 'search engine id'
-            ]):
+            elif error_kind == 'bad_cx':
                 print("[WARNING] CX appears invalid or not accessible (404 Not Found).")
                 # Try rotate to next pair if available
                 if api_manager and len(api_manager.api_keys) > 1:
+                    # Retire the pair, or rotation can keep coming back to it
+                    api_manager.mark_unhealthy(api_manager.current_index, "bad cx")
+                    if not api_manager.get_healthy_indices():
+                        print("[ERROR] No usable API key/CX pair left.")
+                        break
                     print("[INFO] Rotating to next API key/CX pair due to CX 404...")
                     api_manager.rotate_key()
                     current_api_key = api_manager.get_current_key()
-                    service = build("customsearch", "v1", developerKey=current_api_key)
+                    service = get_service(current_api_key)
                     try:
                         cx_value = api_manager.get_current_cx()
                         if cx_value:
@@ -237,7 +696,7 @@ def search_profiles(industry, count, api_key, cx, delay=2, api_manager=None, exi
                     except Exception:
                         pass
                     # Small wait before retry
-                    time.sleep(5)
+                    _sleep(5, 'backoff')
                     continue
                 else:
                     print("[ERROR] No alternate CX available. Please verify your CX in Programmable Search Engine and that Custom Search API is enabled for this key.")
@@ -249,6 +708,276 @@ def search_profiles(industry, count, api_key, cx, delay=2, api_manager=None, exi
             print(f"[ERROR] Search failed: {e}")
             break
     
-    print(f"[INFO] Successfully collected {len(results)} profiles.")
-    return results
+    if checkpoint is not None and not scheduler and query_index >= len(query_variations):
+        checkpoint.finished = True
+    print(f"[INFO] Successfully collected {collected} profiles.")
+
+
+
+class _SchedulerTasks:
+    """Queue-like view of a QueryScheduler for the concurrent workers."""
+
+    def __init__(self, scheduler):
+        self.scheduler = scheduler
+
+    def get_nowait(self):
+        arm = self.scheduler.next_arm()
+        if arm is None:
+            raise queue.Empty
+        return arm
+
+    def put(self, arm):
+        # A page handed back after a failed request becomes available again
+        self.scheduler.release(*arm)
+
+
+class _ConcurrentSearchState:
+    """Dedup state and output page queue shared by concurrent search workers."""
 
+    def __init__(self, count, existing_urls=None, checkpoint=None):
+        self.count = count
+        self.checkpoint = checkpoint
+        self.collected = 0
+        # Pages of new profiles, consumed by iter_search_pages_concurrent()
+        self.pages = queue.Queue()
+        self.seen_urls = set()
+        self.existing_urls = existing_urls if existing_urls is not None else ()
+        # Query -> smallest `start` that returned a short page (deeper pages are skipped)
+        self.exhausted = dict(checkpoint.get("exhausted", {})) if checkpoint is not None else {}
+        # (query, start) -> failed attempts (unexpected errors only)
+        self.failures = {}
+        self.done = threading.Event()
+        self._lock = threading.Lock()
+
+    def record_failure(self, query, start):
+        """Count a failed attempt at a page; returns the attempts so far."""
+        with self._lock:
+            attempts = self.failures[(query, start)] = self.failures.get((query, start), 0) + 1
+            return attempts
+
+    def is_exhausted(self, query, start):
+        with self._lock:
+            return query in self.exhausted and start > self.exhausted[query]
+
+    def mark_exhausted(self, query, start):
+        with self._lock:
+            self.exhausted[query] = min(start, self.exhausted.get(query, start))
+            if self.checkpoint is not None:
+                self.checkpoint.update(exhausted=dict(self.exhausted))
+
+    def add_items(self, items, query, start):
+        """Publish unseen items of a fetched page atomically; returns the number of new profiles."""
+        with self._lock:
+            page = []
+            new_profiles_count = _add_unique_items(items, self.seen_urls, page, self.count - self.collected,
+                                                   self.existing_urls)
+            self.collected += new_profiles_count
+            if self.checkpoint is not None:
+                self.checkpoint.add_fetched(query, start)
+            if page:
+                self.pages.put(page)
+            if self.collected >= self.count:
+                self.done.set()
+        return new_profiles_count
+
+
+def _concurrent_worker(index, api_manager, default_cx, tasks, state, delay, cache=None, scheduler=None):
+    """
+    Worker bound to one key/CX pair: pulls (query, start) pages until the queue is empty,
+    the target count is reached or the pair becomes unusable.
+    """
+    api_key, cx = api_manager.get_pair(index)
+    cx = cx or default_cx
+    label = f"key {index + 1}"
+    max_results_per_query = 10
+    limiter = getattr(api_manager, 'rate_limiter', None)
+    # With a limiter, cooldowns grow per 429, so allow more attempts before retiring the key
+    max_consecutive_rate_limits = 6 if limiter else 3
+    consecutive_rate_limits = 0
+    consecutive_errors = 0
+    pace = (lambda: _acquire(limiter, index, state.done)) if limiter else None
+
+    try:
+        # Service objects (and their HTTP transports) are not thread-safe: the pool is per worker thread
+        service = get_service(api_key)
+    except Exception as e:
+        api_manager.mark_unhealthy(index, f"failed to build service: {e}")
+        return
+
+    while not state.done.is_set():
+        if not api_manager.is_healthy(index):
+            return
+        try:
+            query, start = tasks.get_nowait()
+        except queue.Empty:
+            return
+        if state.is_exhausted(query, start):
+            continue
+
+        try:
+            res, from_cache = fetch_page(service, query, cx, start, max_results_per_query, cache, pace, key=index)
+        except HttpError as e:
+            error_kind = classify_http_error(e)
+            if error_kind == 'rate_limit':
+                # Only this key backs off; other workers keep going
+                tasks.put((query, start))
+                consecutive_rate_limits += 1
+                if consecutive_rate_limits >= max_consecutive_rate_limits:
+                    api_manager.mark_unhealthy(index, "repeated rate limits")
+                    return
+                if limiter:
+                    cooldown = limiter.on_rate_limited(index, get_retry_after(e))
+                    print(f"[WARNING] Rate limit exceeded for {label}. Cooling down for {cooldown:.1f}s...")
+                else:
+                    print(f"[WARNING] Rate limit exceeded for {label}. Pausing this key for 60 seconds...")
+                    _sleep(60, 'backoff', state.done)
+                continue
+            if error_kind == 'daily_limit':
+                tasks.put((query, start))
+                api_manager.mark_exhausted(index)
+                return
+            if error_kind == 'bad_cx':
+                tasks.put((query, start))
+                api_manager.mark_unhealthy(index, "bad cx")
+                return
+            print(f"[ERROR] HTTP Error ({label}): {e}")
+            failed = True
+        except Exception as e:
+            print(f"[ERROR] Search failed ({label}): {e}")
+            failed = True
+        else:
+            failed = False
+        if failed:
+            # Unexpected error: hand the page back (to any worker) a few times before giving it up
+            if state.record_failure(query, start) < MAX_PAGE_ATTEMPTS:
+                tasks.put((query, start))
+            else:
+                print(f"[WARNING] Giving up on start={start} of '{query[:50]}' after {MAX_PAGE_ATTEMPTS} failed attempts.")
+            consecutive_errors += 1
+            if consecutive_errors >= MAX_CONSECUTIVE_ERRORS:
+                api_manager.mark_unhealthy(index, "repeated errors")
+                return
+            continue
+
+        consecutive_rate_limits = 0
+        consecutive_errors = 0
+        if not from_cache:
+            api_manager.increment_usage(index)
+            if limiter:
+                limiter.on_success(index)
+        items = res.get("items", [])
+        if len(items) < max_results_per_query:
+            state.mark_exhausted(query, start)
+
+        new_profiles_count = state.add_items(items, query, start)
+        _record_page(query, new_profiles_count)
+        if scheduler is not None:
+            scheduler.record(query, start, new_profiles_count, len(items), from_cache=from_cache)
+        print(f"[INFO] Found {state.collected}/{state.count} profiles (+{new_profiles_count} new via {label}, start={start}: {query[:50]}...)")
+
+        # Per-key pacing: each worker waits between its own requests
+        if delay > 0 and not from_cache and not limiter:
+            _sleep(delay, 'delay', state.done)
+
+
+def iter_search_pages_concurrent(industry, count, api_manager, cx=None, delay=2, existing_urls=None, cache=None,
+                                   scheduler=None, checkpoint=None):
+    """
+    Search for profiles by fanning query pages out across every healthy key/CX pair at once,
+    yielding new profiles page by page as soon as any worker finishes a page.
+    
+    Each key/CX pair gets its own worker thread and service object, paced by `delay`
+    independently of the other keys. Deduplication against `existing_urls` and across
+    workers is exact: URLs are checked and recorded under a single lock.
+    
+    Args:
+        industry: Industry keyword to search for
+        count: Number of profiles to collect
+        api_manager: APIManager holding the key/CX pairs
+        cx: Search engine ID used for keys without a paired CX
+        delay: Delay between requests of the same key in seconds
+        existing_urls: URLs to skip (e.g. already saved in profiles.csv)
+        cache: Optional SearchCache shared by all workers
+        scheduler: Optional QueryScheduler; workers pull pages from it instead of a fixed queue
+        checkpoint: Optional SearchCheckpoint; pages it lists as fetched are skipped and
+            every page fetched now is added to it
+        
+    Yields:
+        List of new profile dictionaries (title, snippet, link) from each result page,
+        in the order workers finish them
+    """
+    indices = api_manager.get_healthy_indices()
+    if not indices:
+        print("[ERROR] No healthy API keys available.")
+        return
+
+    query_variations = generate_query_variations(industry)
+    random.shuffle(query_variations)
+    fetched = set()
+    if checkpoint is not None:
+        saved_order = checkpoint.get("query_variations")
+        if saved_order and sorted(saved_order) == sorted(query_variations):
+            query_variations = saved_order
+            fetched = checkpoint.get_fetched()
+            print(f"[INFO] Continuing search: {len(fetched)} pages already fetched")
+        checkpoint.update(query_variations=query_variations)
+
+    if scheduler is not None:
+        scheduler.taken.update(fetched)
+        tasks = _SchedulerTasks(scheduler)
+    else:
+        # Breadth-first: first page of every variation before going deeper
+        tasks = queue.Queue()
+        for start in PAGE_STARTS:
+            for query in query_variations:
+                if (query, start) not in fetched:
+                    tasks.put((query, start))
+
+    print(f"[INFO] Searching for '{industry}' profiles with {len(query_variations)} query variations "
+          f"across {len(indices)} API keys concurrently...")
+
+    state = _ConcurrentSearchState(count, existing_urls, checkpoint)
+    executor = ThreadPoolExecutor(max_workers=len(indices), thread_name_prefix="cse")
+    futures = [
+        executor.submit(_concurrent_worker, index, api_manager, cx, tasks, state, delay, cache, scheduler)
+        for index in indices
+    ]
+    try:
+        while True:
+            try:
+                page = state.pages.get(timeout=0.5)
+            except queue.Empty:
+                # Workers finish when the target is reached, tasks run out or their key is unusable
+                if all(future.done() for future in futures) and state.pages.empty():
+                    break
+                continue
+            yield page
+        for future in futures:
+            future.result()  # Surface unexpected worker errors
+        # Every page tried, not stopped by the target or unusable keys
+        if checkpoint is not None and state.collected < count and api_manager.get_healthy_indices():
+            checkpoint.finished = True
+    finally:
+        # Also runs on Ctrl-C or when the consumer stops early: let workers wind down
+        state.done.set()
+        executor.shutdown(wait=True)
+
+    print(f"[INFO] Successfully collected {state.collected} profiles.")
+
+
+def search_profiles_concurrent(industry, count, api_manager, cx=None, delay=2, existing_urls=None, cache=None,
+                               scheduler=None):
+    """
+    Search for profiles by fanning query pages out across every healthy key/CX pair at once.
+    
+    Collects every page from iter_search_pages_concurrent() into one list; see that
+    function for the arguments.
+    
+    Returns:
+        List of profile dictionaries with title, snippet, and link
+    """
+    results = []
+    for page in iter_search_pages_concurrent(industry, count, api_manager, cx=cx, delay=delay,
+                                             existing_urls=existing_urls, cache=cache, scheduler=scheduler):
+        results.extend(page)
+    return results
@@ -0,0 +1,234 @@
+"""Skill detection with a matcher compiled once from a skill taxonomy file."""
+import os
+import re
+from typing import Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+
+DEFAULT_TAXONOMY_PATH = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "gazetteer", "skills.txt"
+)
+
+# Tokens keep the characters that are part of skill names: C++, C#, Node.js, .NET, CI/CD splits into CI + CD.
+# '&' joins letters into one token, so R&D or Q&A never yield R or Q
+TOKEN_PATTERN = re.compile(r'\.?\w[\w+#]*(?:[.&]\w[\w+#]*)*')
+
+# Names this short (R, Go, AI, C) are ordinary words in lower case, so they match case-sensitively
+CASE_SENSITIVE_MAX_LEN = 2
+
+# Of those, letters and capitalized words (R, C, Go; not acronyms like AI or QA) are also labels and
+# sentence words ("Series C", "Go ahead"): they only count with context, i.e. another skill or a
+# language cue at most CONTEXT_WINDOW tokens away, and never after/before a label word
+CONTEXT_WINDOW = 2
+LANGUAGE_CUES = frozenset({
+    'language', 'languages', 'lang', 'programming', 'programmer', 'developer', 'dev', 'code', 'coding',
+    'ngôn', 'ngữ', 'trình',
+})
+EXCLUDED_BEFORE = frozenset({
+    'series', 'plan', 'type', 'vitamin', 'grade', 'class', 'part', 'section', 'option', 'phase', 'level',
+    'round', 'tier', 'usb', 'hạng', 'loại', 'bằng', 'khối',
+})
+EXCLUDED_AFTER = frozenset({'level', 'suite', 'live', 'to', 'ahead'})
+
+
+def needs_context(name: str) -> bool:
+    """
+    Whether a skill name only counts with context (see CONTEXT_WINDOW).
+
+    Args:
+        name: Skill name or synonym as written in the taxonomy
+
+    Returns:
+        True for one- or two-letter names other than all-caps acronyms
+    """
+    return len(name) <= CASE_SENSITIVE_MAX_LEN and name.isalpha() and not (len(name) > 1 and name.isupper())
+
+
+def tokenize(text: str) -> List[str]:
+    """
+    Split text into skill-matching tokens.
+
+    Args:
+        text: Input text
+
+    Returns:
+        Tokens in text order
+    """
+    return TOKEN_PATTERN.findall(text)
+
+
+def load_taxonomy(path: str) -> Dict[str, List[str]]:
+    """
+    Load a skill taxonomy file.
+
+    Each line is "Canonical Name | synonym | synonym ..."; '#' comments and
+    blank lines are ignored.
+
+    Args:
+        path: Taxonomy file path
+
+    Returns:
+        Dict mapping canonical name to its synonyms, in file order
+    """
+    taxonomy: Dict[str, List[str]] = {}
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            line = line.strip()
+            if not line or line.startswith('#'):
+                continue
+            names = [name.strip() for name in line.split('|') if name.strip()]
+            taxonomy.setdefault(names[0], []).extend(names[1:])
+    return taxonomy
+
+
+class SkillMatcher:
+    """
+    Finds skills by whole-token phrase lookup.
+
+    Every name and synonym is tokenized once into a key of its lowercased tokens
+    (or exact tokens for very short names). Matching walks the text's tokens and
+    looks up the n-grams starting at each token, longest first, in one dict, so
+    the cost per text depends on its length and the longest name, not on the
+    size of the taxonomy. Only tokens that start some name are tried, each up to
+    the length of the longest name starting with it.
+    """
+
+    def __init__(self, taxonomy: Dict[str, Iterable[str]]):
+        """
+        Args:
+            taxonomy: Dict mapping canonical skill name to synonyms
+        """
+        self.phrases: Dict[Tuple[str, ...], str] = {}
+        self.exact_phrases: Dict[Tuple[str, ...], str] = {}
+        self.max_tokens = 1
+        # First token -> token count of the longest name starting with it
+        self.starts: Dict[str, int] = {}
+        self.exact_starts: Dict[str, int] = {}
+        # Tokens that are whole names needing context (one-token matches of them are checked)
+        self.context_tokens: Set[str] = set()
+        for canonical, synonyms in taxonomy.items():
+            for name in [canonical, *synonyms]:
+                tokens = tuple(tokenize(name))
+                if not tokens:
+                    continue
+                if len(name) <= CASE_SENSITIVE_MAX_LEN:
+                    self.exact_phrases.setdefault(tokens, canonical)
+                    if len(tokens) == 1 and needs_context(name):
+                        self.context_tokens.add(tokens[0])
+                    starts, first = self.exact_starts, tokens[0]
+                else:
+                    tokens = tuple(t.lower() for t in tokens)
+                    self.phrases.setdefault(tokens, canonical)
+                    starts, first = self.starts, tokens[0]
+                starts[first] = max(starts.get(first, 0), len(tokens))
+                self.max_tokens = max(self.max_tokens, len(tokens))
+        self.skill_count = len(taxonomy)
+
+    @classmethod
+    def from_file(cls, path: str = DEFAULT_TAXONOMY_PATH) -> "SkillMatcher":
+        """
+        Build a matcher from a taxonomy file.
+
+        Args:
+            path: Taxonomy file path
+
+        Returns:
+            SkillMatcher
+        """
+        return cls(load_taxonomy(path))
+
+    def __len__(self) -> int:
+        return self.skill_count
+
+    def _matches(self, tokens: List[str], lowered: List[str], candidates: Iterable[int]) -> Iterator[Tuple[int, int, str]]:
+        """
+        Longest match at each candidate token, skipping tokens inside an earlier match.
+
+        Args:
+            tokens: Tokens of the text
+            lowered: The same tokens lowercased
+            candidates: Indices of tokens that start some name, ascending
+
+        Yields:
+            (token index, token count, canonical skill name) in text order
+        """
+        starts, exact_starts = self.starts, self.exact_starts
+        phrases, exact_phrases = self.phrases, self.exact_phrases
+        count = len(tokens)
+        end = 0  # Tokens before this index are part of an earlier match
+        for i in candidates:
+            if i < end:
+                continue
+            longest = max(starts.get(lowered[i], 0), exact_starts.get(tokens[i], 0))
+            for n in range(min(longest, count - i), 0, -1):
+                skill = phrases.get(tuple(lowered[i:i + n])) or exact_phrases.get(tuple(tokens[i:i + n]))
+                if skill:
+                    yield i, n, skill
+                    end = i + n
+                    break
+
+    def _in_context(self, matches: List[Tuple[int, int, str]], tokens: List[str],
+                    lowered: List[str]) -> List[Tuple[int, int, str]]:
+        """
+        Drop the matches of context-dependent names that have no context (see CONTEXT_WINDOW).
+
+        Args:
+            matches: (token index, token count, skill) in text order
+            tokens: Tokens of the text
+            lowered: The same tokens lowercased
+
+        Returns:
+            The matches kept
+        """
+        flags = [n == 1 and tokens[i] in self.context_tokens for i, n, _ in matches]
+        kept = []
+        for (i, n, skill), flagged in zip(matches, flags):
+            if flagged:
+                if (i > 0 and lowered[i - 1] in EXCLUDED_BEFORE) or \
+                        (i + 1 < len(tokens) and lowered[i + 1] in EXCLUDED_AFTER):
+                    continue
+                # Tokens at most CONTEXT_WINDOW tokens before or after the match
+                near = range(max(0, i - CONTEXT_WINDOW), min(len(tokens), i + n + CONTEXT_WINDOW))
+                has_neighbour = any(j < near.stop and j + m > near.start
+                                    for (j, m, _), other_flagged in zip(matches, flags) if not other_flagged)
+                if not has_neighbour and not any(lowered[k] in LANGUAGE_CUES for k in near):
+                    continue
+            kept.append((i, n, skill))
+        return kept
+
+    def find(self, text: str) -> List[str]:
+        """
+        Find the skills mentioned in a text.
+
+        Args:
+            text: Snippet or description text
+
+        Returns:
+            Canonical skill names in order of first mention, without duplicates
+        """
+        tokens = tokenize(text) if text else []
+        if not tokens:
+            return []
+        # One C-level lower() for all tokens (the separator is neither a token character nor cased)
+        lowered = '\0'.join(tokens).lower().split('\0')
+        starts, exact_starts = self.starts, self.exact_starts
+        candidates = [i for i, t in enumerate(lowered) if t in starts or tokens[i] in exact_starts]
+        matches = list(self._matches(tokens, lowered, candidates))
+        if any(n == 1 and tokens[i] in self.context_tokens for i, n, _ in matches):
+            matches = self._in_context(matches, tokens, lowered)
+        return list(dict.fromkeys(skill for _, _, skill in matches))
+
+
+_default_matcher: Optional[SkillMatcher] = None
+
+
+def get_skill_matcher() -> SkillMatcher:
+    """
+    Get the matcher for the default taxonomy, compiled on first use.
+
+    Returns:
+        Shared SkillMatcher
+    """
+    global _default_matcher
+    if _default_matcher is None:
+        _default_matcher = SkillMatcher.from_file(DEFAULT_TAXONOMY_PATH)
+    return _default_matcher
@@ -0,0 +1,286 @@
+"""Compact on-disk URL hash index kept next to a profiles CSV."""
+import csv
+import glob
+import hashlib
+import os
+import threading
+from array import array
+from typing import Iterable, List
+
+import numpy as np
+
+from utils.parser import canonical_profile_url
+
+
+MAGIC = b'URLIDX01'
+HEADER_SIZE = 16  # magic + size of the CSV the index matches
+
+DEFAULT_GLOBAL_INDEX_PATH = os.path.join("data_collected", ".global_urls.idx")
+
+
+def hash_url(url: str) -> int:
+    """
+    Hash a URL to a 64-bit integer.
+
+    Args:
+        url: URL string
+
+    Returns:
+        Unsigned 64-bit hash
+    """
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+def _csv_url_hashes(csv_path: str, url_column: str = 'URL', canonical: bool = False) -> np.ndarray:
+    """
+    Hash the URL column of a CSV file, streaming its rows.
+
+    Args:
+        csv_path: Path to the CSV
+        url_column: Name of the URL column
+        canonical: Reduce URLs with canonical_profile_url() before hashing
+
+    Returns:
+        Unsorted uint64 array of hashes (may contain duplicates)
+    """
+    hashes = array('Q')
+    with open(csv_path, 'r', encoding='utf-8-sig', newline='') as f:
+        for row in csv.DictReader(f):
+            url = row.get(url_column) or ''
+            if canonical:
+                url = canonical_profile_url(url)
+            if url:
+                hashes.append(hash_url(url))
+    return np.frombuffer(hashes, dtype=np.uint64)
+
+
+class SortedURLHashSet:
+    """
+    Memory-compact set of URL hashes for very large URL streams.
+
+    Hashes live in a sorted NumPy uint64 array (8 bytes per URL, binary-search
+    lookups) plus a set of recent additions. The set is merged into the array
+    once it reaches a fraction of the array's size, so merges stay rare and each
+    one is a linear merge of two sorted runs.
+    """
+
+    MIN_PENDING = 4096  # Pending hashes always allowed before a merge
+    PENDING_FRACTION = 8  # Merge when pending exceeds 1/8 of the sorted array
+
+    def __init__(self):
+        self._sorted = np.empty(0, dtype=np.uint64)
+        self._pending: set[int] = set()
+
+    def __len__(self) -> int:
+        return len(self._sorted) + len(self._pending)
+
+    def __contains__(self, url) -> bool:
+        return isinstance(url, str) and self._has_hash(hash_url(url))
+
+    def _has_hash(self, value: int) -> bool:
+        if value in self._pending:
+            return True
+        pos = np.searchsorted(self._sorted, np.uint64(value))
+        return bool(pos < len(self._sorted) and self._sorted[pos] == value)
+
+    def _add_hashes(self, values: Iterable[int]) -> List[int]:
+        """Add hashes; returns the ones that were not in the set yet."""
+        new_hashes = []
+        for value in values:
+            if not self._has_hash(value):
+                self._pending.add(value)
+                new_hashes.append(value)
+        if len(self._pending) >= max(self.MIN_PENDING, len(self._sorted) // self.PENDING_FRACTION):
+            self._merge_pending()
+        return new_hashes
+
+    def _merge_pending(self) -> None:
+        """Fold pending hashes into the sorted array."""
+        pending = np.sort(np.fromiter(self._pending, dtype=np.uint64, count=len(self._pending)))
+        merged = np.concatenate((self._sorted, pending))
+        merged.sort(kind='stable')  # Timsort: linear on two sorted runs
+        self._sorted = merged
+        self._pending.clear()
+
+    def _reset(self, hashes: np.ndarray) -> None:
+        """Replace the contents with an array of hashes (any order, duplicates allowed)."""
+        self._sorted = np.unique(hashes.astype(np.uint64))
+        self._pending.clear()
+
+    def add(self, url: str) -> None:
+        """Add a URL."""
+        self._add_hashes([hash_url(url)])
+
+    def update(self, urls: Iterable[str]) -> None:
+        """Add several URLs."""
+        self._add_hashes(hash_url(url) for url in urls)
+
+
+class URLIndex(SortedURLHashSet):
+    """
+    URL hash index persisted as a sidecar file (profiles.urlidx next to profiles.csv).
+
+    The sidecar is a 16-byte header (magic + byte size of the CSV it describes)
+    followed by little-endian uint64 hashes, appended as rows are appended to
+    the CSV. If the CSV size no longer matches (edited by hand, crash between the
+    two writes), the index is rebuilt from the CSV's URL column.
+    """
+
+    def __init__(self, csv_path: str, url_column: str = 'URL', rebuild: bool = False):
+        """
+        Load or rebuild the index for a CSV file.
+
+        Args:
+            csv_path: Path to the profiles CSV
+            url_column: Name of the URL column
+            rebuild: Always rebuild from the CSV (e.g. after the CSV was rewritten)
+        """
+        super().__init__()
+        self.csv_path = csv_path
+        self.url_column = url_column
+        self.path = os.path.splitext(csv_path)[0] + '.urlidx'
+        if rebuild or not self._load():
+            self.rebuild()
+
+    def _csv_size(self) -> int:
+        return os.path.getsize(self.csv_path) if os.path.exists(self.csv_path) else 0
+
+    def _load(self) -> bool:
+        """Load the sidecar if it matches the CSV; returns False when a rebuild is needed."""
+        try:
+            with open(self.path, 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return False
+        if len(data) < HEADER_SIZE or data[:8] != MAGIC:
+            return False
+        if int.from_bytes(data[8:16], 'little') != self._csv_size():
+            return False
+        body = data[HEADER_SIZE:]
+        self._reset(np.frombuffer(body[:len(body) - len(body) % 8], dtype='<u8'))
+        return True
+
+    def _write(self, hashes: Iterable[int], mode: str) -> None:
+        """Write hashes (all of them for 'wb', new ones for 'r+b') and the current CSV size."""
+        values = np.fromiter(hashes, dtype=np.uint64).astype('<u8')
+        with open(self.path, mode) as f:
+            if mode == 'wb':
+                f.write(MAGIC + self._csv_size().to_bytes(8, 'little'))
+            f.seek(0, os.SEEK_END)
+            f.write(values.tobytes())
+            # Header last: a crash before this point leaves a size mismatch, forcing a rebuild
+            f.seek(8)
+            f.write(self._csv_size().to_bytes(8, 'little'))
+
+    def rebuild(self) -> None:
+        """Rebuild the index from the CSV's URL column (streamed, not loaded whole)."""
+        self._reset(np.empty(0, dtype=np.uint64))
+        if os.path.exists(self.csv_path):
+            try:
+                self._reset(_csv_url_hashes(self.csv_path, self.url_column))
+            except Exception as e:
+                print(f"[WARNING] Could not build URL index from {self.csv_path}: {e}")
+        try:
+            self._write(self._sorted, 'wb')
+        except OSError as e:
+            print(f"[WARNING] Could not write URL index {self.path}: {e}")
+
+    def record_appended(self, urls: Iterable[str]) -> None:
+        """
+        Record URLs that were just appended to the CSV.
+
+        Args:
+            urls: URLs of the appended rows
+        """
+        new_hashes = self._add_hashes(hash_url(url) for url in urls)
+        try:
+            if os.path.exists(self.path):
+                self._write(new_hashes, 'r+b')
+            else:
+                self._merge_pending()
+                self._write(self._sorted, 'wb')
+        except OSError as e:
+            print(f"[WARNING] Could not update URL index {self.path}: {e}")
+
+
+class GlobalURLIndex(SortedURLHashSet):
+    """
+    Cross-industry dedup index of canonical profile URLs, shared by every run.
+
+    URLs are reduced with canonical_profile_url() and stored as 64-bit hashes,
+    on disk as an append-only file of little-endian uint64 values. Parallel runs
+    can append to the same file; each run sees the others' additions the next
+    time it loads. All access is serialized with a lock.
+    """
+
+    def __init__(self, path: str = DEFAULT_GLOBAL_INDEX_PATH, base_dir: str = "data_collected"):
+        """
+        Load the index, building it from every <base_dir>/*/profiles.csv on first use.
+
+        Args:
+            path: Index file path
+            base_dir: Directory holding the industry folders
+        """
+        super().__init__()
+        self.path = path
+        self.base_dir = base_dir
+        self._lock = threading.Lock()
+        if os.path.exists(path):
+            self._reset(np.fromfile(path, dtype='<u8'))
+        else:
+            self.rebuild()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return super().__len__()
+
+    def __contains__(self, url) -> bool:
+        if not isinstance(url, str):
+            return False
+        value = hash_url(canonical_profile_url(url))
+        with self._lock:
+            return self._has_hash(value)
+
+    def update(self, urls: Iterable[str]) -> int:
+        """
+        Add URLs and persist the new ones.
+
+        Args:
+            urls: Profile URLs in any form (canonicalized here)
+
+        Returns:
+            Number of URLs that were not in the index yet
+        """
+        keys = {canonical_profile_url(url) for url in urls if isinstance(url, str)}
+        keys.discard('')
+        with self._lock:
+            new_hashes = self._add_hashes(hash_url(key) for key in keys)
+            if not new_hashes:
+                return 0
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, 'ab') as f:
+                f.write(np.array(new_hashes, dtype='<u8').tobytes())
+        return len(new_hashes)
+
+    def add(self, url: str) -> None:
+        """Add one URL."""
+        self.update([url])
+
+    def rebuild(self) -> None:
+        """Rebuild the index from the URL column of every industry's profiles.csv."""
+        parts = [np.empty(0, dtype=np.uint64)]
+        for csv_path in glob.glob(os.path.join(self.base_dir, '*', 'profiles.csv')):
+            try:
+                parts.append(_csv_url_hashes(csv_path, canonical=True))
+            except Exception as e:
+                print(f"[WARNING] Could not index URLs from {csv_path}: {e}")
+        with self._lock:
+            self._reset(np.concatenate(parts))
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._sorted.astype('<u8').tofile(self.path)
+            count = len(self._sorted)
+        print(f"[INFO] Built global URL index with {count} profiles from {self.base_dir}")
@@ -1,22 +1,28 @@
 """CSV writer utilities for saving profile data."""
+import csv
 import os
+import time
 import pandas as pd
 from pathlib import Path
-from typing import List, Dict
+from typing import List, Dict, Optional
 
+from utils.metrics import get_metrics
+from utils.parser import PROFILE_FIELDS
+from utils.url_index import GlobalURLIndex, URLIndex
 
-def create_directory(industry: str) -> str:
+
+def create_directory(industry: str, base_dir: str = "data_collected") -> str:
     """
     Create output directory for industry if it doesn't exist.
     
     Args:
         industry: Industry name
+        base_dir: Directory holding the industry folders
         
     Returns:
         Path to the created directory
     """
-    base_dir = Path("data_collected")
-    industry_dir = base_dir / industry
+    industry_dir = Path(base_dir) / industry
     
     # Create directory if it doesn't exist
     os.makedirs(industry_dir, exist_ok=True)
@@ -24,7 +30,12 @@ def create_directory(industry: str) -> str:
     return str(industry_dir)
 
 
-def save_to_csv(data: List[Dict[str, str]], filepath: str, append=False):
+def _industry_label(filepath: str) -> str:
+    """Metrics label of a profiles CSV: its industry folder name."""
+    return os.path.basename(os.path.dirname(os.path.abspath(filepath)))
+
+
+def save_to_csv(data: List[Dict[str, str]], filepath: str, append=False) -> List[Dict[str, str]]:
     """
     Save profile data to CSV file with UTF-8-SIG encoding.
     Automatically filters duplicates based on URL to prevent duplicate profiles.
@@ -33,13 +44,27 @@ def save_to_csv(data: List[Dict[str, str]], filepath: str, append=False):
         data: List of profile dictionaries
         filepath: Path to output CSV file
         append: If True, automatically append to existing file and filter duplicates.
+        
+    Returns:
+        The rows that were added (duplicates excluded)
     """
+    started = time.perf_counter()
+    try:
+        return _save_to_csv(data, filepath, append)
+    finally:
+        if data:
+            get_metrics().observe('csv_write_seconds', time.perf_counter() - started,
+                                  industry=_industry_label(filepath))
+
+
+def _save_to_csv(data: List[Dict[str, str]], filepath: str, append=False) -> List[Dict[str, str]]:
+    """save_to_csv() without the timing."""
     if not data:
         print("[WARNING] No data to save.")
-        return
+        return []
     
     # Define CSV columns
-    fieldnames = ['Name', 'Title', 'Location', 'About', 'Experience', 'Education', 'Skills', 'URL']
+    fieldnames = PROFILE_FIELDS
     
     # Create new DataFrame - ensure all columns exist
     df_new = pd.DataFrame(data)
@@ -49,6 +74,25 @@ def save_to_csv(data: List[Dict[str, str]], filepath: str, append=False):
             df_new[col] = '-'
     df_new = df_new[fieldnames]
     
+    # Append-only fast path: write only new rows, filtering duplicates with the URL index
+    if append and os.path.exists(filepath) and read_csv_header(filepath) == fieldnames:
+        try:
+            index = URLIndex(filepath)
+            added = append_rows(data, filepath, index)
+            duplicate_count = len(data) - len(added)
+            if not added:
+                print(f"[INFO] All {len(data)} profiles are duplicates (already in file). No new profiles added.")
+                print(f"[INFO] Total profiles in file: {len(index)} (unchanged)")
+                return added
+            if duplicate_count > 0:
+                print(f"[INFO] Found {duplicate_count} duplicate profiles (already in file), skipping them.")
+            print(f"[INFO] Added {len(added)} new profiles. Total profiles in file: {len(index)}")
+            print(f"\n✅ Saved {len(added)} new profiles.")
+            print(f"📁 File: {filepath}")
+            return added
+        except PermissionError as e:
+            print(f"\n[WARNING] Could not append to {filepath}: {e}. Falling back to a full rewrite.")
+    
     # Auto-append mode: append if file exists and append flag is True
     if append and os.path.exists(filepath):
         # Read existing data
@@ -59,20 +103,22 @@ def save_to_csv(data: List[Dict[str, str]], filepath: str, append=False):
             if 'URL' not in df_existing.columns:
                 print("[WARNING] Existing file doesn't have 'URL' column. Creating new file.")
                 df_to_save = df_new
+                added = df_new.to_dict('records')
             else:
                 # Get existing URLs
                 existing_urls = set(df_existing['URL'].tolist())
                 
-                # Count new profiles (not in existing data)
-                unique_new_profiles = df_new[~df_new['URL'].isin(existing_urls)]
+                # Count new profiles (not in existing data, first occurrence in this batch)
+                unique_new_profiles = df_new[~df_new['URL'].isin(existing_urls)].drop_duplicates(subset=['URL'])
                 duplicate_count = len(df_new) - len(unique_new_profiles)
                 
                 if len(unique_new_profiles) == 0:
+                    _record_written(filepath, 0, duplicate_count)
                     print(f"[INFO] All {len(df_new)} profiles are duplicates (already in file). No new profiles added.")
                     print(f"[INFO] Total profiles in file: {len(df_existing)} (unchanged)")
                     df_to_save = df_existing
                     # Skip saving since nothing changed
-                    return
+                    return []
                 else:
                     if duplicate_count > 0:
                         print(f"[INFO] Found {duplicate_count} duplicate profiles (already in file), skipping them.")
@@ -84,16 +130,22 @@ def save_to_csv(data: List[Dict[str, str]], filepath: str, append=False):
                     df_to_save = df_combined
                     
                     new_count = len(unique_new_profiles)
+                    added = unique_new_profiles.to_dict('records')
+                    _record_written(filepath, new_count, duplicate_count)
                     print(f"[INFO] Added {new_count} new profiles. Total profiles in file: {len(df_to_save)}")
             
         except Exception as e:
             print(f"[WARNING] Could not read existing file: {e}. Creating new file.")
             df_to_save = df_new
+            added = df_new.to_dict('records')
+            _record_written(filepath, len(df_new))
     else:
         # Overwrite mode or new file
         if os.path.exists(filepath):
             print(f"[INFO] Overwriting existing file: {filepath}")
         df_to_save = df_new
+        added = df_new.to_dict('records')
+        _record_written(filepath, len(df_new))
     
     # Try to save with multiple attempts and fallback options
     max_attempts = 3
@@ -104,11 +156,13 @@ def save_to_csv(data: List[Dict[str, str]], filepath: str, append=False):
         try:
             # Try to save with UTF-8-BOM encoding for Excel compatibility
             df_to_save.to_csv(filepath, index=False, encoding='utf-8-sig')
+            # File was rewritten: rebuild its URL index sidecar
+            URLIndex(filepath, rebuild=True)
             
             # Print final summary
             print(f"\n✅ Saved {len(df_to_save)} total profiles.")
             print(f"📁 File: {filepath}")
-            return  # Successfully saved
+            return added  # Successfully saved
             
         except PermissionError as e:
             attempts += 1
@@ -128,7 +182,7 @@ def save_to_csv(data: List[Dict[str, str]], filepath: str, append=False):
                     print(f"\n⚠️ Could not save to original location. File saved to: {temp_filepath}")
                     print("Please make sure the original file is not open in another program")
                     print("and you have write permissions to the directory.")
-                    return
+                    return added
                 except Exception as temp_err:
                     print(f"\n❌ Failed to save file: {str(e)}")
                     print("Please ensure:")
@@ -141,18 +195,231 @@ def save_to_csv(data: List[Dict[str, str]], filepath: str, append=False):
             raise
 
 
-def get_output_path(industry: str) -> str:
+def _record_written(filepath: str, written: int, duplicates: int = 0) -> None:
+    """Count rows written to and duplicates kept out of a CSV in the run metrics."""
+    metrics = get_metrics()
+    industry = _industry_label(filepath)
+    metrics.inc('csv_rows_written_total', written, industry=industry)
+    if duplicates:
+        metrics.inc('csv_duplicates_skipped_total', duplicates, industry=industry)
+
+
+def read_csv_header(filepath: str) -> List[str]:
+    """
+    Read the header row of a CSV file.
+    
+    Args:
+        filepath: Path to CSV file
+        
+    Returns:
+        List of column names (empty if the file is empty or unreadable)
+    """
+    try:
+        with open(filepath, 'r', encoding='utf-8-sig', newline='') as f:
+            return next(csv.reader(f), [])
+    except (OSError, UnicodeDecodeError, csv.Error):
+        return []
+
+
+def append_rows(rows: List[Dict[str, str]], filepath: str, index: Optional[URLIndex] = None,
+                write_header: bool = False) -> List[Dict[str, str]]:
+    """
+    Append profile rows to a CSV without reading or rewriting the existing file.
+    
+    Args:
+        rows: Profile dictionaries
+        filepath: Path to output CSV file
+        index: Optional URLIndex of the file; rows whose URL is already indexed are skipped,
+            and the index is updated with the appended URLs
+        write_header: Create/replace the file and write the header first
+        
+    Returns:
+        The rows that were actually written
+    """
+    new_rows = []
+    batch_urls = set()
+    for row in rows:
+        url = row.get('URL', '')
+        if index is not None and (url in index or url in batch_urls):
+            continue
+        batch_urls.add(url)
+        new_rows.append(row)
+    if not new_rows and not write_header:
+        return []
+    
+    # utf-8-sig only writes the BOM at the start of an empty file
+    with open(filepath, 'w' if write_header else 'a', encoding='utf-8-sig', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=PROFILE_FIELDS, restval='-', extrasaction='ignore',
+                                lineterminator=os.linesep)
+        if write_header:
+            writer.writeheader()
+        writer.writerows(new_rows)
+    
+    if index is not None:
+        index.record_appended(row.get('URL', '') for row in new_rows)
+    _record_written(filepath, len(new_rows), len(rows) - len(new_rows))
+    return new_rows
+
+
+def compact_csv(filepath: str) -> None:
+    """
+    Rewrite a profiles CSV without duplicate URLs and rebuild its URL index.
+    
+    Appends never rewrite the file, so run this when the file was edited by hand
+    or merged from several sources.
+    
+    Args:
+        filepath: Path to the profiles CSV
+    """
+    if not os.path.exists(filepath):
+        print(f"[WARNING] File not found: {filepath}")
+        return
+    
+    df = pd.read_csv(filepath, encoding='utf-8-sig')
+    before = len(df)
+    if 'URL' in df.columns:
+        df = df.drop_duplicates(subset=['URL'], keep='first')
+    
+    # Write to a temp file first so an interrupted compaction never truncates the data
+    tmp_path = filepath + '.tmp'
+    df.to_csv(tmp_path, index=False, encoding='utf-8-sig')
+    os.replace(tmp_path, filepath)
+    URLIndex(filepath, rebuild=True)
+    print(f"[INFO] Compacted {filepath}: {before} → {len(df)} rows ({before - len(df)} duplicates removed)")
+
+
+def get_output_path(industry: str, base_dir: str = "data_collected") -> str:
     """
     Get the output CSV file path for an industry.
     
     Args:
         industry: Industry name
+        base_dir: Directory holding the industry folders
         
     Returns:
         Full path to output CSV file
     """
-    directory = create_directory(industry)
+    directory = create_directory(industry, base_dir)
     filename = "profiles.csv"
     
     return os.path.join(directory, filename)
 
+
+
+class CSVStreamWriter:
+    """
+    Streaming writer stage: appends profile rows to a CSV in bounded batches.
+    
+    Rows are buffered and flushed when `batch_size` rows are pending or `flush_interval`
+    seconds have passed since the last flush, so memory stays flat and progress reaches
+    disk shortly after each result page. Rows are only ever appended; duplicates of URLs
+    already in the file are dropped using its URL index sidecar. Written URLs are also
+    recorded in the optional cross-industry GlobalURLIndex once they are on disk.
+    """
+
+    def __init__(self, filepath: str, append: bool = True, batch_size: int = 50, flush_interval: float = 2.0,
+                 global_index: Optional[GlobalURLIndex] = None):
+        """
+        Args:
+            filepath: Path to output CSV file
+            append: If False, the file is replaced on the first flush (or on close, if nothing was written)
+            batch_size: Maximum number of buffered rows
+            flush_interval: Maximum seconds between flushes while rows are pending
+            global_index: Optional global URL index updated after each flush
+        """
+        self.filepath = filepath
+        self.global_index = global_index
+        self.append = append
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.rows_written = 0
+        self._buffer: List[Dict[str, str]] = []
+        self._last_flush = time.monotonic()
+        self._started = False
+        self.index: Optional[URLIndex] = None
+        # Set when appending to a file with a different header: fall back to save_to_csv merging
+        self._merge_fallback = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+        return False
+
+    def write(self, profiles: List[Dict[str, str]]) -> None:
+        """
+        Buffer profiles, flushing when the batch is full or the interval has passed.
+        
+        Args:
+            profiles: Parsed profile dictionaries
+        """
+        self._buffer.extend(profiles)
+        if len(self._buffer) >= self.batch_size or time.monotonic() - self._last_flush >= self.flush_interval:
+            self.flush()
+
+    @property
+    def pending(self) -> List[Dict[str, str]]:
+        """Rows buffered but not yet written to disk."""
+        return list(self._buffer)
+
+    def _open_mode(self) -> str:
+        """Decide how the first flush opens the file."""
+        if not self.append or not os.path.exists(self.filepath) or os.path.getsize(self.filepath) == 0:
+            if os.path.exists(self.filepath) and not self.append:
+                print(f"[INFO] Overwriting existing file: {self.filepath}")
+            return 'w'
+        if read_csv_header(self.filepath) != PROFILE_FIELDS:
+            print("[WARNING] Existing file has different columns. Falling back to full merge on each flush.")
+            self._merge_fallback = True
+        return 'a'
+
+    def flush(self) -> None:
+        """Write all buffered rows to disk."""
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        
+        mode = 'a'
+        if not self._started:
+            mode = self._open_mode()
+            self._started = True
+        
+        rows, self._buffer = self._buffer, []
+        if self._merge_fallback:
+            written = save_to_csv(rows, self.filepath, append=True)
+            self.rows_written += len(written)
+            self._record_global(written)
+            return
+        
+        started = time.perf_counter()
+        if mode == 'w':
+            self._start_file()
+        elif self.index is None:
+            self.index = URLIndex(self.filepath)
+        written = append_rows(rows, self.filepath, self.index)
+        self.rows_written += len(written)
+        self._record_global(written)
+        get_metrics().observe('csv_write_seconds', time.perf_counter() - started,
+                              industry=_industry_label(self.filepath))
+
+    def _start_file(self) -> None:
+        """Create (or truncate) the file: header plus an empty index, so duplicates within this run are dropped too."""
+        append_rows([], self.filepath, write_header=True)
+        self.index = URLIndex(self.filepath, rebuild=True)
+
+    def _record_global(self, rows: List[Dict[str, str]]) -> None:
+        """Add the URLs of rows now on disk to the global index."""
+        if self.global_index is not None:
+            self.global_index.update(row.get('URL', '') for row in rows)
+
+    def close(self) -> None:
+        """Flush remaining rows; in overwrite mode, replace the file even if nothing was written."""
+        self.flush()
+        if not self._started and not self.append:
+            self._open_mode()
+            self._started = True
+            self._start_file()
+        if self.rows_written:
+            print(f"\n✅ Saved {self.rows_written} new profiles.")
+            print(f"📁 File: {self.filepath}")